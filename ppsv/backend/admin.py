@@ -1,7 +1,8 @@
 from django.contrib import admin
 
-from .models import Assignment
+from .models import Assignment, AssignmentJob
 
 # Register your models here.
 
 admin.site.register(Assignment)
+admin.site.register(AssignmentJob)
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class BackendConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'backend'
+
+    def ready(self):
+        # registers the receivers and the engines of the automatic assignment
+        from backend import signals  # noqa: F401
+        from backend.automatic_assignment import main  # noqa: F401
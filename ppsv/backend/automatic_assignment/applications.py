@@ -1,80 +1,79 @@
-import copy
+from itertools import compress
 
-from backend.automatic_assignment.dataclasses import TempApplication
-from backend.automatic_assignment.my_dict_list import MyDictList
-from backend.models import AcceptedApplications
-from base.models import TopicSelection, Topic, Term
+from backend.automatic_assignment.dataclasses import ApplicationSnapshot
 
-init_applications_for_topic = MyDictList()
-init_applications_for_group = MyDictList()
-
-
-def init_applications(override_assignments):
-    """inits the applications as is the stand of the database right now. this should be used for the whole automatic
-    assignment process and not be changed. If override_assignments is True all non-locked assignments could be
-    overwritten by the algorithm. init_assignments and init_applications needs to get the same bool."""
-    global init_applications_for_group
-    global init_applications_for_topic
-    init_applications_for_topic = MyDictList()
-    init_applications_for_group = MyDictList()
-    for topic in Topic.objects.filter(course__term=Term.get_active_term()):
-        init_applications_for_topic[topic.pk] = []
-    init_accepted_applications = []
-    for accepted_application in AcceptedApplications.objects.filter(
-            assignment__topic__course__term=Term.get_active_term()):
-        if (not override_assignments) or accepted_application.assignment.locked or accepted_application.locked:
-            init_accepted_applications.append(accepted_application.topic_selection.dict_key)
-    for application in TopicSelection.objects.filter(topic__course__term=Term.get_active_term(),collection_number__gt=0).order_by('priority'):
-        if application.dict_key not in init_accepted_applications:
-            temp_application = TempApplication(
-                id=application.pk,
-                size=application.group.size,
-                priority=application.priority,
-                topic_id=application.topic.pk,
-                collection_id=application.collection_number,
-                locked=False,
-                group_id=application.group.pk
-            )
-            init_applications_for_topic[application.topic.pk].append(temp_application)
-            if (application.group_id, application.collection_number) not in init_applications_for_group:
-                init_applications_for_group[(application.group_id, application.collection_number)] = []
-            init_applications_for_group[(application.group_id, application.collection_number)].append(temp_application)
+# translates the binary digits of a set of applications to selectors of itertools.compress
+BINARY_DIGITS = bytes.maketrans(b'01', b'\x00\x01')
 
 
 class Applications:
-    """Represents all applications for this iteration
-    :attr applications_for_topic: applications in a dictionary by topic
-    :type {}: the dictionary
-    :attr applications_for_topic: applications in a dictionary by group and collection number as a tuple
-    :type {}: the dictionary
+    """Represents all applications for this iteration. Only the flags of the open collections and the sets of the open
+    applications of every topic are copied from the problem, the applications themselves are addressed by their index.
+    :attr data: the snapshot of all applications
+    :type data: ApplicationSnapshot
+    :attr open_collections: 1 if the collection with this index is not satisfied yet, 0 otherwise
+    :type open_collections: bytearray
+    :attr open_collection_count: the number of collections that are not satisfied yet
+    :type open_collection_count: int
+    :attr open_topic_masks: the set of the applications of every topic whose collection is not satisfied yet, see
+    ApplicationSnapshot
+    :type open_topic_masks: list
     """
-    applications_for_topic: MyDictList
-    applications_for_group: MyDictList
+    data: ApplicationSnapshot
+    open_collections: bytearray
+    open_collection_count: int
+    open_topic_masks: list
 
-    def __init__(self):
-        self.applications_for_topic = copy.deepcopy(init_applications_for_topic)
-        self.applications_for_group = copy.deepcopy(init_applications_for_group)
+    def __init__(self, problem):
+        self.data = problem.application_data
+        self.open_collections = bytearray(b'\x01') * len(self.data.collection_keys)
+        self.open_collection_count = len(self.data.collection_keys)
+        self.open_topic_masks = list(self.data.topic_masks)
+
+    def __len__(self):
+        return len(self.data.ids)
 
     def accept(self, application):
         """If we accept we will also remove all applications from this group and collection"""
-        for application_for_group in self.applications_for_group[application.dict_key]:
-            self.applications_for_topic[application_for_group.topic_id].remove(application_for_group)
-        self.applications_for_group.remove(application.dict_key)
+        collection = self.data.collections[application]
+        if self.open_collections[collection]:
+            self.open_collections[collection] = 0
+            self.open_collection_count -= 1
+            for collection_application in self.data.applications_for_collection[collection]:
+                self.open_topic_masks[self.data.topics[collection_application]] &= \
+                    ~(1 << self.data.topic_positions[collection_application])
+
+    def release(self, application):
+        """Opens the collection of an accepted application again, so all of its applications are possible again"""
+        collection = self.data.collections[application]
+        if not self.open_collections[collection]:
+            self.open_collections[collection] = 1
+            self.open_collection_count += 1
+            for collection_application in self.data.applications_for_collection[collection]:
+                self.open_topic_masks[self.data.topics[collection_application]] |= \
+                    1 << self.data.topic_positions[collection_application]
 
-    def get_applications_for_topic(self, topic_id):
+    def get_applications_for_topic(self, topic):
         """returns all applications for a given topic
         :return: all applications for a given topic
         :rtype: []
         """
-        return self.applications_for_topic[topic_id]
+        return self.get_applications(topic, self.open_topic_masks[topic])
 
-    def get_applications_for_topic_with_max_size(self, topic_id, max_size):
+    def get_applications_for_topic_with_max_size(self, topic, max_size):
         """returns all applications for a given topic with a maximum of max_size members
-                :return: all applications for a given topic with a max_size
-                :rtype: []
-                """
-        applications = []
-        for application in self.get_applications_for_topic(topic_id):
-            if application.size <= max_size:
-                applications.append(application)
-        return applications
+        :return: all applications for a given topic with a max_size
+        :rtype: []
+        """
+        size_mask = 0
+        for size, mask in self.data.topic_size_masks[topic]:
+            if size > max_size:
+                break
+            size_mask = mask
+        return self.get_applications(topic, self.open_topic_masks[topic] & size_mask)
+
+    def get_applications(self, topic, mask):
+        """returns the applications of the set of applications of the topic, ordered like applications_for_topic"""
+        # the binary digits of the mask starting with the lowest bit, as bytes that are 0 or 1
+        selectors = bin(mask)[:1:-1].encode().translate(BINARY_DIGITS)
+        return list(compress(self.data.applications_for_topic[topic], selectors))
@@ -1,125 +1,99 @@
-import copy
+from array import array
 
-from backend.automatic_assignment.dataclasses import TempAssignment, TempApplication, TempTopic
-from backend.automatic_assignment.my_dict_list import MyDictList
-from backend.models import Assignment, AcceptedApplications
+from backend.automatic_assignment.dataclasses import TopicSnapshot
+from backend.models import Assignment
 from backend.pages.functions import get_score_for_not_assigned
-from base.models import Topic, Term, TopicSelection
-
-all_assignments = MyDictList()
-topic_data = MyDictList()
-
-
-def init_assignments(override_assignments):
-    """inits the assignments as is the stand of the database right now. this should be used for the whole automatic
-    assignment process and not be changed. If override_assignments is True all non-locked assignments could be
-    overwritten by the algorithm."""
-    global all_assignments
-    all_assignments = MyDictList()
-    for topic in Topic.objects.filter(course__term=Term.get_active_term()):
-        all_assignments[topic.pk] = []
-        topic_data[topic.pk] = TempTopic(
-            min_slot_size=topic.min_slot_size,
-            max_slot_size=topic.max_slot_size,
-            slots=topic.max_slots,
-            topic=topic
-        )
-    for assignment in Assignment.objects.filter(topic__course__term=Term.get_active_term()):
-        handled_locked_applications = []
-        if assignment.locked or not override_assignments:
-            if assignment.locked:
-                applications = []
-                for application in AcceptedApplications.objects.filter(assignment=assignment):
-                    handled_locked_applications.append(application.pk)
-                    applications.append(TempApplication(
-                        id=application.topic_selection.pk,
-                        priority=application.topic_selection.priority,
-                        topic_id=assignment.topic.pk,
-                        size=application.topic_selection.group.size,
-                        locked=application.finalized_assignment,
-                        collection_id=application.topic_selection.collection_number,
-                        group_id=application.topic_selection.group.pk
-                    ))
-                all_assignments[assignment.topic.pk].append(TempAssignment(
-                    topic_id=assignment.topic.pk,
-                    slot_id=assignment.slot_id,
-                    accepted_applications=applications,
-                    locked=assignment.finalized_slot))
-        else:
-            for application in AcceptedApplications.objects.filter(assignment=assignment):
-                if application.locked and application.pk not in handled_locked_applications:
-                    handled_locked_applications.append(application.pk)
-                    temp_application = TempApplication(
-                        id=application.topic_selection.pk,
-                        priority=application.topic_selection.priority,
-                        topic_id=assignment.topic.pk,
-                        size=application.topic_selection.group.size,
-                        locked=application.finalized_assignment,
-                        collection_id=application.topic_selection.collection_number,
-                        group_id=application.topic_selection.group.pk
-                    )
-                    all_assignments[assignment.topic.pk].append(TempAssignment(topic_id=assignment.topic.pk,
-                                                                               slot_id=assignment.slot_id,
-                                                                               accepted_applications=[temp_application],
-                                                                               locked=0))
 
 
 class Assignments:
-    """Represents all assignments for this iteration
+    """Represents all assignments for this iteration. The state is kept in flat buffers copied from the problem, so
+    starting a new iteration does not create any python objects per slot or application. The size and score of every
+    slot and the score of all assignments are kept up to date on every change.
+    :attr topic_data: the snapshot of all topics and slots
+    :type topic_data: TopicSnapshot
+    :attr slot_sizes: the number of students in a slot by slot index
+    :type slot_sizes: array
+    :attr slot_scores: the score of all applications in a slot by slot index
+    :type slot_scores: array
+    :attr accepted_slot: the slot index an application is accepted in by application index, -1 if not accepted
+    :type accepted_slot: array
+    :attr assigned_score: the score of all applications in all slots
+    :type assigned_score: int
     """
-    assignments: MyDictList()
-
-    def __init__(self):
-        self.assignments = copy.deepcopy(all_assignments)
+    topic_data: TopicSnapshot
+    slot_sizes: array
+    slot_scores: array
+    accepted_slot: array
+    assigned_score: int
 
-    def get_assignments(self, topic_id):
-        """Returns all assignments for the given topic"""
-        return self.assignments[topic_id]
+    def __init__(self, problem):
+        self.topic_data = problem.topic_data
+        self.data = problem.application_data
+        self.slot_sizes = self.topic_data.slot_sizes[:]
+        self.slot_scores = self.topic_data.slot_scores[:]
+        self.accepted_slot = array('l', [-1]) * len(self.data.ids)
+        self.assigned_score = self.topic_data.fixed_score
 
-    def add_application(self, application, slot_id):
+    def add_application(self, application, slot):
         """adds one application to a slot"""
-        for slot in self.assignments[application.topic_id]:
-            if slot.slot_id == slot_id:
-                slot.accepted_applications.append(application)
-                return
-        self.assignments[application.topic_id].append(TempAssignment(topic_id=application.topic_id,
-                                                                     slot_id=slot_id,
-                                                                     accepted_applications=[application],
-                                                                     locked=False))
+        score = self.data.scores[application]
+        self.accepted_slot[application] = slot
+        self.slot_sizes[slot] += self.data.sizes[application]
+        self.slot_scores[slot] += score
+        self.assigned_score += score
 
-    def get_remaining_space_in_slot(self, topic_id, slot_id):
-        for assignment in self.get_assignments(topic_id):
-            if assignment.slot_id == slot_id:
-                if assignment.locked > 0:
-                    return 0
-                return topic_data[topic_id].max_slot_size - assignment.size
-        return topic_data[topic_id].max_slot_size
+    def remove_application(self, application):
+        """removes one application from its slot"""
+        slot = self.accepted_slot[application]
+        score = self.data.scores[application]
+        self.accepted_slot[application] = -1
+        self.slot_sizes[slot] -= self.data.sizes[application]
+        self.slot_scores[slot] -= score
+        self.assigned_score -= score
+
+    def get_remaining_space_in_slot(self, slot):
+        """returns the remaining places in the slot with the given slot index"""
+        if self.topic_data.slot_locked[slot] > 0:
+            return 0
+        return self.topic_data.max_slot_size[self.topic_data.slot_topic[slot]] - self.slot_sizes[slot]
 
     def score(self, applications):
         """returns the score for the all saved assignments. will use all open applications to find collections of groups
          that are not fulfilled. These will result in negativ scoring values. The range is depending on the number of
           collections. Can return a negative value. Higher values should represent a better score"""
-        score = 0
-        for slot in self.assignments.values():
-            for assignment in slot:
-                score += assignment.score
         # minus score für nicht zugewiesene gruppen
-        score += get_score_for_not_assigned() * len(applications.applications_for_group.keys())
-        return score
+        return self.assigned_score + get_score_for_not_assigned() * applications.open_collection_count
+
+    def get_slots(self):
+        """returns all slots that are locked or contain applications
+        :return: a dict with the slot index as key and a list of (topic selection id, locked) as value
+        :rtype: dict
+        """
+        slots = {}
+        for slot, locked in enumerate(self.topic_data.slot_locked):
+            if locked:
+                slots[slot] = []
+        for application_id, slot, locked in self.topic_data.fixed_applications:
+            slots.setdefault(slot, []).append((application_id, locked))
+        for application, slot in enumerate(self.accepted_slot):
+            if slot >= 0:
+                slots.setdefault(slot, []).append((self.data.ids[application], False))
+        return slots
+
+    def get_database_slots(self):
+        """
+        :return: these assignments in the form Assignment.save_assignments saves them
+        :rtype: list
+        """
+        topic_data = self.topic_data
+        return [(topic_data.topic_ids[topic_data.slot_topic[slot]], topic_data.slot_number[slot],
+                 topic_data.slot_locked[slot], accepted_applications)
+                for slot, accepted_applications in self.get_slots().items()]
 
     def save_to_database(self, term):
-        for assignment in Assignment.objects.filter(topic__course__term=term):
-            assignment.delete()
-        for assignments in self.assignments.values():
-            for assignment in assignments:
-                new_assignment = Assignment.objects.create(
-                    topic=topic_data[assignment.topic_id].topic,
-                    slot_id=assignment.slot_id,
-                    finalized_slot=assignment.locked
-                )
-                for application in assignment.accepted_applications:
-                    AcceptedApplications.objects.create(
-                        assignment=new_assignment,
-                        topic_selection=TopicSelection.objects.get(pk=application.id),
-                        finalized_assignment=application.locked
-                    )
+        """replaces all assignments of the term with these assignments, only the differences are written
+        :return: the change set, see Assignment.save_assignments
+        :rtype: dict
+        """
+        return Assignment.save_assignments(Assignment.objects.filter(topic__course__term=term),
+                                           self.get_database_slots())
@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+from array import array
+from dataclasses import dataclass, field
 
 from backend.pages.functions import get_score_for_assigned
 from base.models import Topic
@@ -57,3 +58,78 @@ class TempTopic:
     min_slot_size: int
     max_slot_size: int
     topic: Topic
+
+
+@dataclass
+class TopicSnapshot:
+    """Flat buffers describing the topics and slots of a term. Topics are addressed by their index in topic_ids, slots
+    by their slot index. The slots of a topic are stored one after the other starting at slot_offset."""
+    topic_ids: array = field(default_factory=lambda: array('l'))
+    topic_index: dict = field(default_factory=dict)
+    min_slot_size: array = field(default_factory=lambda: array('l'))
+    max_slot_size: array = field(default_factory=lambda: array('l'))
+    slots: array = field(default_factory=lambda: array('l'))
+    slot_offset: array = field(default_factory=lambda: array('l'))
+    slot_topic: array = field(default_factory=lambda: array('l'))
+    slot_number: array = field(default_factory=lambda: array('l'))
+    slot_sizes: array = field(default_factory=lambda: array('l'))
+    slot_locked: array = field(default_factory=lambda: array('l'))
+    slot_scores: array = field(default_factory=lambda: array('l'))
+    fixed_applications: list = field(default_factory=list)
+    fixed_score: int = 0
+    database_applications: list = field(default_factory=list)
+
+    def get_slot_index(self, topic, slot_id):
+        """returns the slot index of the slot with the given slot id (starting at 1) of the topic with the given
+        index"""
+        return self.slot_offset[topic] + slot_id - 1
+
+
+@dataclass
+class ApplicationSnapshot:
+    """Flat buffers describing all open applications of a term. Applications are addressed by their index,
+    collections (group and collection number) by their index in collection_keys.
+
+    The applications of a topic are indexed by their position in applications_for_topic, a set of them is an int with
+    the bits at their positions set, see index_topics."""
+    ids: array = field(default_factory=lambda: array('l'))
+    sizes: array = field(default_factory=lambda: array('l'))
+    priorities: array = field(default_factory=lambda: array('l'))
+    scores: array = field(default_factory=lambda: array('l'))
+    topics: array = field(default_factory=lambda: array('l'))
+    collections: array = field(default_factory=lambda: array('l'))
+    collection_keys: list = field(default_factory=list)
+    applications_for_topic: list = field(default_factory=list)
+    applications_for_collection: list = field(default_factory=list)
+    topic_positions: array = field(default_factory=lambda: array('l'))
+    topic_masks: list = field(default_factory=list)
+    topic_size_masks: list = field(default_factory=list)
+
+    def index_topics(self):
+        """builds the indexes of the applications of every topic after all applications were added: the position of
+        every application in the list of its topic, the set of all applications of every topic and for every topic
+        and group size the set of its applications of at most this size as a list of (size, set) ordered by size"""
+        self.topic_positions = array('l', [0]) * len(self.ids)
+        self.topic_masks = []
+        self.topic_size_masks = []
+        for applications in self.applications_for_topic:
+            masks_by_size = {}
+            for position, application in enumerate(applications):
+                self.topic_positions[application] = position
+                size = self.sizes[application]
+                masks_by_size[size] = masks_by_size.get(size, 0) | 1 << position
+            size_masks = []
+            mask = 0
+            for size in sorted(masks_by_size):
+                mask |= masks_by_size[size]
+                size_masks.append((size, mask))
+            self.topic_masks.append(mask)
+            self.topic_size_masks.append(size_masks)
+
+
+@dataclass
+class Problem:
+    """Everything the automatic assignment works on. It consists of plain python objects only and does not change
+    during the automatic assignment, so it can be pickled and handed to other processes. See problem.load_problem"""
+    topic_data: TopicSnapshot = field(default_factory=TopicSnapshot)
+    application_data: ApplicationSnapshot = field(default_factory=ApplicationSnapshot)
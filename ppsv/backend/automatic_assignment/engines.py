@@ -0,0 +1,98 @@
+# the engine of jobs that do not choose one
+DEFAULT_ENGINE = 'search'
+
+# name -> engine, in the order they were registered
+_engines = {}
+
+
+class Engine:
+    """An algorithm of the automatic assignment. An engine solves a loaded problem within the budget of its context and
+    returns the best assignments it found with statistics of the run. The assignments of every engine with
+    improve_result are improved by a local search afterwards, see main.improve_assignments.
+
+    Engines are registered by their name with register and can be chosen on the control flow page.
+    :attr name: the name the engine is saved with in AssignmentJob.engine
+    :type name: str
+    :attr label: the name shown on the control flow page
+    :type label: str
+    :attr description: what the engine does and when to use it
+    :type description: str
+    :attr uses_budget: True if the iterations, time budget and patience of the context limit the engine
+    :type uses_budget: bool
+    :attr improve_result: True if the assignments of the engine are improved by a local search
+    :type improve_result: bool
+    """
+    name = None
+    label = None
+    description = ""
+    uses_budget = False
+    improve_result = True
+
+    def solve(self, problem, context):
+        """solves the problem
+
+        :return: the best assignments or None if none better than context.score were found, their score and the
+        statistics of the run. Searching engines return the iterations of each of their processes as 'iterations',
+        which is needed to replay the run, and the seconds until they found the returned assignments as 'time_to_best'
+        :rtype: (Assignments, int, dict)
+        """
+        raise NotImplementedError
+
+
+class Context:
+    """Everything an engine needs besides the problem.
+    :attr override: True if all non-locked assignments can be overwritten
+    :type override: bool
+    :attr score: the score of the assignments in the database, an engine only returns better assignments
+    :type score: int
+    :attr upper_bound: the best possible score, engines can lower it if they calculate a tighter bound
+    :type upper_bound: int
+    :attr seed: the seed of all random decisions
+    :type seed: int
+    :attr iterations: the maximum number of iterations of a search
+    :type iterations: int
+    :attr time_budget: the seconds after which a search is stopped, no limit if None
+    :type time_budget: int
+    :attr patience: the iterations without a better score after which a search is stopped, no limit if None
+    :type patience: int
+    :attr workers: the number of processes of engines that search in parallel
+    :type workers: int
+    :attr warm_start: True if engines that search start from the assignments in the database that can be replaced
+    :type warm_start: bool
+    :attr job: the job the progress is saved to, None if the engine does not run as a job
+    :type job: AssignmentJob
+    :attr replay: the run that is replayed, see main.replay_job, None if the engine runs for the first time
+    :type replay: dict
+    """
+
+    def __init__(self, override, score, upper_bound, seed, iterations, time_budget=None, patience=None, workers=1,
+                 warm_start=False, job=None, replay=None):
+        self.override = override
+        self.score = score
+        self.upper_bound = upper_bound
+        self.seed = seed
+        self.iterations = iterations
+        self.time_budget = time_budget
+        self.patience = patience
+        self.workers = workers
+        self.warm_start = warm_start
+        self.job = job
+        self.replay = replay
+
+
+def register(engine_class):
+    """registers an instance of the given Engine subclass under its name, can be used as class decorator"""
+    _engines[engine_class.name] = engine_class()
+    return engine_class
+
+
+def get_engine(name):
+    """returns the engine with the given name, raises a ValueError if there is none"""
+    if name not in _engines:
+        raise ValueError(f"Unknown assignment engine {name}, possible are {', '.join(_engines)}")
+    return _engines[name]
+
+
+def get_engines():
+    """returns all registered engines in the order they were registered"""
+    return list(_engines.values())
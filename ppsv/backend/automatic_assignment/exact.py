@@ -0,0 +1,388 @@
+import heapq
+import math
+from array import array
+
+from backend.automatic_assignment.applications import Applications
+from backend.automatic_assignment.assignments import Assignments
+from backend.pages.functions import get_score_for_not_assigned
+
+
+class MinCostFlow:
+    """A min-cost flow network that is solved with successive shortest paths. The sources are added one after the other,
+    and every source is augmented along the cheapest path of the residual network before the next one is added. The
+    residual network of the flow found so far never contains a negative cycle, so the flow stays optimal for the sources
+    added so far and dijkstra with node potentials can be used to find the paths. All edge costs have to be
+    non-negative."""
+
+    def __init__(self, node_count):
+        self.graph = [[] for _ in range(node_count)]
+        self.potential = [0] * node_count
+        # edge -> target node, remaining capacity, cost
+        self.to = []
+        self.capacity = []
+        self.cost = []
+
+    def add_edge(self, source, target, capacity, cost):
+        """adds an edge and its residual edge, returns the index of the edge"""
+        edge = len(self.to)
+        self.graph[source].append(edge)
+        self.to.append(target)
+        self.capacity.append(capacity)
+        self.cost.append(cost)
+        self.graph[target].append(edge + 1)
+        self.to.append(source)
+        self.capacity.append(0)
+        self.cost.append(-cost)
+        return edge
+
+    def flow(self, edge):
+        """returns how much flow is sent over the given edge"""
+        return self.capacity[edge ^ 1]
+
+    def augment(self, source, sink):
+        """sends one unit of flow from source to sink over the cheapest path. No flow may have entered source yet.
+        returns the cost of the path or None if sink can not be reached"""
+        potential = self.potential
+        # raise the potential of the new source so that all of its edges have non-negative reduced costs
+        potential[source] = max((potential[self.to[edge]] - self.cost[edge] for edge in self.graph[source]
+                                 if self.capacity[edge] > 0), default=0)
+
+        infinity = float('inf')
+        distance = {source: 0}
+        previous_edge = {}
+        settled = set()
+        queue = [(0, source)]
+        while queue:
+            node_distance, node = heapq.heappop(queue)
+            if node in settled:
+                continue
+            settled.add(node)
+            if node == sink:
+                break
+            for edge in self.graph[node]:
+                if self.capacity[edge] > 0:
+                    target = self.to[edge]
+                    new_distance = node_distance + self.cost[edge] + potential[node] - potential[target]
+                    if new_distance < distance.get(target, infinity):
+                        distance[target] = new_distance
+                        previous_edge[target] = edge
+                        heapq.heappush(queue, (new_distance, target))
+        if sink not in settled:
+            return None
+
+        # only the settled nodes change their potential, all other nodes are at least as far away as the sink
+        sink_distance = distance[sink]
+        for node in settled:
+            potential[node] += distance[node] - sink_distance
+
+        cost = 0
+        node = sink
+        while node != source:
+            edge = previous_edge[node]
+            self.capacity[edge] -= 1
+            self.capacity[edge ^ 1] += 1
+            cost += self.cost[edge]
+            node = self.to[edge ^ 1]
+        return cost
+
+
+def is_flow_problem(problem):
+    """returns True if the open part of the problem can be modeled as a min-cost flow, see solve_flow. This is not the
+    case if a group with more than one student applies, or if a topic with open applications needs more than one
+    student per slot, because groups can not be split and slots can not be left half filled"""
+    data = problem.application_data
+    for application in range(len(data.ids)):
+        if data.sizes[application] != 1 or problem.topic_data.min_slot_size[data.topics[application]] > 1:
+            return False
+    return True
+
+
+def solve(problem, best_score=None, should_stop=None):
+    """finds an optimal assignment for all open applications of the problem. Problems that can be modeled as a min-cost
+    flow are solved with solve_flow, all others with a BranchAndBound that only searches for assignments with a higher
+    score than best_score and stops as soon as should_stop returns True, see BranchAndBound.run
+    :return: the assignments and applications of the best solution, both None if none better than best_score was found,
+    and the statistics of the search: if the solution is optimal and how many nodes were searched as 'iterations'
+    :rtype: (Assignments, Applications, dict)
+    """
+    if is_flow_problem(problem):
+        assignments, applications = solve_flow(problem)
+        return assignments, applications, {'optimal': True, 'iterations': [0]}
+    search = BranchAndBound(problem, best_score)
+    optimal = search.run(should_stop)
+    assignments, applications = search.get_best()
+    return assignments, applications, {'optimal': optimal, 'iterations': [search.nodes]}
+
+
+def solve_flow(problem):
+    """finds an optimal assignment for all open applications of a problem for which is_flow_problem is True. Every
+    collection is the source of one unit of flow that either goes through one of its applications to the topic or
+    directly to the sink, which costs as much as a not satisfied collection. Topics pass at most as many units to the
+    sink as they have free places in their slots.
+    :return: the assignments and applications of the optimal solution
+    :rtype: (Assignments, Applications)
+    """
+    applications = Applications(problem)
+    assignments = Assignments(problem)
+    data = applications.data
+    topic_data = problem.topic_data
+
+    collection_count = len(data.collection_keys)
+    topic_count = len(topic_data.topic_ids)
+    sink = 0
+    first_collection = 1
+    first_topic = first_collection + collection_count
+    network = MinCostFlow(first_topic + topic_count)
+
+    # costs are shifted by the best possible score so that all of them are non-negative
+    best_score = max(data.scores, default=0)
+    for collection in range(collection_count):
+        network.add_edge(first_collection + collection, sink, 1, best_score - get_score_for_not_assigned())
+    application_edges = []
+    for application in range(len(applications)):
+        application_edges.append(network.add_edge(first_collection + data.collections[application],
+                                                  first_topic + data.topics[application],
+                                                  1,
+                                                  best_score - data.scores[application]))
+    for topic in range(topic_count):
+        first_slot = topic_data.slot_offset[topic]
+        free_places = sum(assignments.get_remaining_space_in_slot(slot)
+                          for slot in range(first_slot, first_slot + topic_data.slots[topic]))
+        if free_places > 0:
+            network.add_edge(first_topic + topic, sink, free_places, 0)
+
+    for collection in range(collection_count):
+        network.augment(first_collection + collection, sink)
+
+    # distribute the accepted applications over the slots of their topic
+    for application, edge in enumerate(application_edges):
+        if network.flow(edge):
+            topic = data.topics[application]
+            first_slot = topic_data.slot_offset[topic]
+            for slot in range(first_slot, first_slot + topic_data.slots[topic]):
+                if assignments.get_remaining_space_in_slot(slot) >= data.sizes[application]:
+                    applications.accept(application)
+                    assignments.add_application(application, slot)
+                    break
+
+    return assignments, applications
+
+
+def get_upper_bound(problem):
+    """returns an upper bound for the score of all assignments, see pages.functions.get_max_score for a simpler one and
+    get_relaxation_gain for how it is calculated
+    :return: the upper bound
+    :rtype: int
+    """
+    applications = Applications(problem)
+    assignments = Assignments(problem)
+    return assignments.score(applications) + get_relaxation_gain(problem, assignments,
+                                                                 range(len(applications.data.collection_keys)))
+
+
+def get_relaxation_gain(problem, assignments, collections):
+    """returns how much the score can at most grow if the given open collections get one of their applications in the
+    free places of the slots of assignments. It is the optimum of the linear relaxation in which a group can be split
+    over several topics and the students of a topic only have to fit into the free places of its slots, so the minimum
+    slot size and the packing of groups into slots are ignored. Only applications that fit into one of the slots of
+    their topic are used. Every student is a unit of flow that either gains its share of the score of one of the
+    applications of its collection or goes directly to the sink.
+    :return: the gain, rounded down
+    :rtype: int
+    """
+    data = problem.application_data
+    topic_data = problem.topic_data
+
+    topic_count = len(topic_data.topic_ids)
+    free_places = [0] * topic_count
+    max_space = [0] * topic_count
+    for topic in range(topic_count):
+        first_slot = topic_data.slot_offset[topic]
+        for slot in range(first_slot, first_slot + topic_data.slots[topic]):
+            space = assignments.get_remaining_space_in_slot(slot)
+            free_places[topic] += space
+            max_space[topic] = max(max_space[topic], space)
+
+    collections = list(collections)
+    collection_applications = [[application for application in data.applications_for_collection[collection]
+                                if data.sizes[application] <= max_space[data.topics[application]]]
+                               for collection in collections]
+    collection_sizes = [data.sizes[data.applications_for_collection[collection][0]] for collection in collections]
+    # the gains are scaled so that the share of every student is an integer
+    scale = math.lcm(*collection_sizes)
+    gains = {application: (data.scores[application] - get_score_for_not_assigned()) * scale // data.sizes[application]
+             for applications in collection_applications for application in applications}
+    best_gain = max(gains.values(), default=0)
+
+    sink = 0
+    first_collection = 1
+    first_topic = first_collection + len(collections)
+    first_student = first_topic + topic_count
+    network = MinCostFlow(first_student + sum(collection_sizes))
+
+    for index, applications in enumerate(collection_applications):
+        network.add_edge(first_collection + index, sink, collection_sizes[index], best_gain)
+        for application in applications:
+            network.add_edge(first_collection + index,
+                             first_topic + data.topics[application],
+                             data.sizes[application],
+                             best_gain - gains[application])
+    for topic in range(topic_count):
+        if free_places[topic] > 0:
+            network.add_edge(first_topic + topic, sink, free_places[topic], 0)
+
+    gain = 0
+    student = first_student
+    for index, collection_size in enumerate(collection_sizes):
+        for _ in range(collection_size):
+            network.add_edge(student, first_collection + index, 1, 0)
+            gain += best_gain - network.augment(student, sink)
+            student += 1
+
+    return gain // scale
+
+
+class BranchAndBound:
+    """Searches all assignments of the open collections of a problem for the best one. The collections are decided one
+    after the other, the one with the best application first, and every collection either gets one of its applications
+    in one of the slots of its topic or none, the best applications first. Slots of a topic with the same size that
+    both got or both did not get new applications are interchangeable, so only one of them is tried. The choices of
+    the undecided collections are only searched if get_relaxation_gain shows that they can lead to a better score than
+    the best assignment found so far. Every slot that gets new applications has to reach the minimum slot size of its
+    topic.
+    :attr best_score: the score of the best assignment found so far
+    :type best_score: int
+    :attr best_accepted_slot: the slot of every application in the best assignment, see Assignments.accepted_slot,
+    None if no assignment better than the initial best_score was found
+    :type best_accepted_slot: array
+    :attr nodes: the number of choices tried so far
+    :type nodes: int
+    """
+
+    def __init__(self, problem, best_score=None):
+        self.problem = problem
+        self.data = problem.application_data
+        self.topic_data = problem.topic_data
+        self.applications = Applications(problem)
+        self.assignments = Assignments(problem)
+        # the size of the new applications of every slot and the number of slots that are too small with them
+        self.added_sizes = array('l', [0]) * len(self.topic_data.slot_topic)
+        self.too_small_slots = 0
+        self.best_score = -math.inf if best_score is None else best_score
+        self.best_accepted_slot = None
+        self.nodes = 0
+
+        not_assigned = get_score_for_not_assigned()
+        best_gains = [max(self.data.scores[application] for application in applications) - not_assigned
+                      for applications in self.data.applications_for_collection]
+        self.order = sorted(range(len(best_gains)), key=lambda collection: -best_gains[collection])
+        # the gain if all collections from this position of the order on get their best application
+        self.remaining_gains = [0] * (len(self.order) + 1)
+        for position in range(len(self.order) - 1, -1, -1):
+            self.remaining_gains[position] = self.remaining_gains[position + 1] + best_gains[self.order[position]]
+
+    def run(self, should_stop=None):
+        """searches until all choices are tried or until should_stop returns True, which is called with the number of
+        tried choices and the best score before every choice
+        :return: True if all choices were tried, so the best assignment is optimal
+        :rtype: bool
+        """
+        if not self.order:
+            self.save_if_better()
+            return True
+        # per decided collection: its choices and how many of them were tried
+        stack = []
+        if self.can_improve(0):
+            stack.append([self.get_choices(self.order[0]), 0])
+        while stack:
+            frame = stack[-1]
+            choices, tried = frame
+            if tried > 0 and choices[tried - 1][0] is not None:
+                self.remove(choices[tried - 1][0])
+            if tried == len(choices):
+                stack.pop()
+                continue
+            if should_stop is not None and should_stop(self.nodes, self.best_score):
+                return False
+            frame[1] += 1
+            self.nodes += 1
+            application, slot = choices[tried]
+            if application is not None:
+                self.add(application, slot)
+            if len(stack) == len(self.order):
+                self.save_if_better()
+            elif self.can_improve(len(stack)):
+                stack.append([self.get_choices(self.order[len(stack)]), 0])
+        return True
+
+    def get_choices(self, collection):
+        """returns the choices of the collection as (application, slot), the best first and (None, None) last"""
+        choices = []
+        assignments = self.assignments
+        topic_data = self.topic_data
+        for application in sorted(self.data.applications_for_collection[collection],
+                                  key=lambda collection_application: -self.data.scores[collection_application]):
+            topic = self.data.topics[application]
+            size = self.data.sizes[application]
+            tried_states = set()
+            first_slot = topic_data.slot_offset[topic]
+            for slot in range(first_slot, first_slot + topic_data.slots[topic]):
+                state = (assignments.slot_sizes[slot], self.added_sizes[slot] > 0)
+                if assignments.get_remaining_space_in_slot(slot) >= size and state not in tried_states:
+                    tried_states.add(state)
+                    choices.append((application, slot))
+        choices.append((None, None))
+        return choices
+
+    def can_improve(self, position):
+        """returns True if deciding the collections from the given position of the order on can lead to a better score
+        than the best one"""
+        score = self.assignments.score(self.applications)
+        if score + self.remaining_gains[position] <= self.best_score:
+            return False
+        # the undecided collections can not lower the score
+        if score > self.best_score:
+            return True
+        return score + get_relaxation_gain(self.problem, self.assignments, self.order[position:]) > self.best_score
+
+    def is_too_small(self, slot):
+        return self.added_sizes[slot] > 0 and \
+            self.assignments.slot_sizes[slot] < self.topic_data.min_slot_size[self.topic_data.slot_topic[slot]]
+
+    def add(self, application, slot):
+        was_too_small = self.is_too_small(slot)
+        self.applications.accept(application)
+        self.assignments.add_application(application, slot)
+        self.added_sizes[slot] += self.data.sizes[application]
+        self.too_small_slots += self.is_too_small(slot) - was_too_small
+
+    def remove(self, application):
+        slot = self.assignments.accepted_slot[application]
+        was_too_small = self.is_too_small(slot)
+        self.applications.release(application)
+        self.assignments.remove_application(application)
+        self.added_sizes[slot] -= self.data.sizes[application]
+        self.too_small_slots += self.is_too_small(slot) - was_too_small
+
+    def save_if_better(self):
+        """saves the current assignment if every decided collection is placed in a slot that is big enough and it is
+        better than the best one"""
+        score = self.assignments.score(self.applications)
+        if self.too_small_slots == 0 and score > self.best_score:
+            self.best_score = score
+            self.best_accepted_slot = self.assignments.accepted_slot[:]
+
+    def get_best(self):
+        """
+        :return: the assignments and applications of the best assignment, both None if none was found
+        :rtype: (Assignments, Applications)
+        """
+        if self.best_accepted_slot is None:
+            return None, None
+        applications = Applications(self.problem)
+        assignments = Assignments(self.problem)
+        for application, slot in enumerate(self.best_accepted_slot):
+            if slot >= 0:
+                applications.accept(application)
+                assignments.add_application(application, slot)
+        return assignments, applications
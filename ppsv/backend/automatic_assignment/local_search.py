@@ -0,0 +1,174 @@
+from backend.automatic_assignment.applications import Applications
+from backend.automatic_assignment.assignments import Assignments
+from backend.pages.functions import get_score_for_not_assigned
+
+# the number of applications that may be pushed out of their slot to make room for one improvement
+ejection_depth = 2
+
+
+def load_assignments(problem, accepted_slot=None):
+    """rebuilds the assignments and applications of the problem from the accepted slot of every application. If
+    accepted_slot is None the assignments that were in the database when the problem was loaded are used, as far as
+    they are not kept in place anyway.
+    :return: the assignments and applications
+    :rtype: (Assignments, Applications)
+    """
+    applications = Applications(problem)
+    assignments = Assignments(problem)
+    if accepted_slot is None:
+        application_index = {application_id: index for index, application_id in enumerate(applications.data.ids)}
+        accepted_slot = [-1] * len(applications)
+        for application_id, slot in problem.topic_data.database_applications:
+            if application_id in application_index:
+                accepted_slot[application_index[application_id]] = slot
+    for application, slot in enumerate(accepted_slot):
+        if slot >= 0:
+            applications.accept(application)
+            assignments.add_application(application, slot)
+    return assignments, applications
+
+
+class LocalSearch:
+    """Improves given assignments until no single improvement is left. Every collection of a group is tried to be
+    moved into a better slot, or to be assigned at all if it is not satisfied yet. To make room in a full slot, up to
+    ejection_depth applications can be pushed out of their slot, which then are moved on in the same way. A move of an
+    assigned collection whose chain ends in its old slot swaps both. All changes are applied to the assignments right
+    away, the running scores make the evaluation of every step O(1), and everything is undone if the chain does not
+    end in a better score.
+    :attr slot_applications: the applications that are accepted in a slot by slot index
+    :type slot_applications: [[]]
+    """
+
+    def __init__(self, assignments, applications):
+        self.assignments = assignments
+        self.applications = applications
+        self.data = applications.data
+        self.topic_data = assignments.topic_data
+        self.slot_applications = [[] for _ in self.topic_data.slot_topic]
+        for application, slot in enumerate(assignments.accepted_slot):
+            if slot >= 0:
+                self.slot_applications[slot].append(application)
+        # a chain is only followed as long as its best possible end beats the start score. Pushing out one more
+        # application can at most gain the difference between the best and worst application of a collection
+        collection_scores = [[self.data.scores[application] for application in collection_applications]
+                             for collection_applications in self.data.applications_for_collection]
+        self.max_collection_score = [max(scores) for scores in collection_scores]
+        self.max_ejection_gain = max((max(scores) - min(scores) for scores in collection_scores), default=0)
+        self.chain = set()
+        self.start_score = 0
+        self.start_slot = -1
+
+    def run(self, on_pass=None):
+        """searches improvements until there are none left. on_pass is called with the score after every pass over all
+        collections
+        :return: the number of improvements
+        :rtype: int
+        """
+        improvements = 0
+        improved = True
+        while improved:
+            improved = False
+            for collection in range(len(self.data.collection_keys)):
+                if self.improve_collection(collection):
+                    improvements += 1
+                    improved = True
+            if on_pass is not None:
+                on_pass(self.assignments.score(self.applications))
+        return improvements
+
+    def improve_collection(self, collection):
+        """tries to find a better place for the collection, the change is kept if one is found
+        :return: True if the assignments were improved
+        :rtype: bool
+        """
+        self.start_score = self.assignments.score(self.applications)
+        self.start_slot = -1
+        self.chain = {collection}
+        accepted = self.get_accepted_application(collection)
+        if accepted is not None:
+            self.start_slot = self.assignments.accepted_slot[accepted]
+            self.remove(accepted)
+        if self.place(collection, ejection_depth):
+            return True
+        if accepted is not None:
+            self.add(accepted, self.start_slot)
+        return False
+
+    def get_accepted_application(self, collection):
+        for application in self.data.applications_for_collection[collection]:
+            if self.assignments.accepted_slot[application] >= 0:
+                return application
+        return None
+
+    def is_improvement(self):
+        """the chain is finished, so the old slot of the moved collection must not be left with too few students"""
+        if self.assignments.score(self.applications) <= self.start_score:
+            return False
+        if self.start_slot < 0:
+            return True
+        size = self.assignments.slot_sizes[self.start_slot]
+        return size == 0 or size >= self.topic_data.min_slot_size[self.topic_data.slot_topic[self.start_slot]]
+
+    def place(self, collection, depth):
+        """tries all applications of the open collection in all slots of their topic, either in free space or by
+        pushing out one application that is then placed on its own. Everything is undone if no improvement is found
+        :return: True if an improvement was found and applied
+        :rtype: bool
+        """
+        topic_data = self.topic_data
+        sizes = self.data.sizes
+        scores = self.data.scores
+        not_assigned = -get_score_for_not_assigned()
+        score = self.assignments.score(self.applications)
+        if score + self.max_collection_score[collection] + not_assigned + depth * self.max_ejection_gain \
+                <= self.start_score:
+            return False
+        for application in self.data.applications_for_collection[collection]:
+            topic = self.data.topics[application]
+            min_size = topic_data.min_slot_size[topic]
+            first_slot = topic_data.slot_offset[topic]
+            for slot in range(first_slot, first_slot + topic_data.slots[topic]):
+                if topic_data.slot_locked[slot] > 0:
+                    continue
+                space = self.assignments.get_remaining_space_in_slot(slot)
+                new_size = self.assignments.slot_sizes[slot] + sizes[application]
+                if sizes[application] <= space and new_size >= min_size \
+                        and score + scores[application] + not_assigned > self.start_score:
+                    self.add(application, slot)
+                    if self.is_improvement():
+                        return True
+                    self.remove(application)
+                if depth == 0:
+                    continue
+                for ejected in list(self.slot_applications[slot]):
+                    ejected_collection = self.data.collections[ejected]
+                    if ejected_collection in self.chain:
+                        continue
+                    replaced_size = new_size - sizes[ejected]
+                    if replaced_size < min_size or sizes[application] - sizes[ejected] > space:
+                        continue
+                    if score + scores[application] - scores[ejected] + self.max_collection_score[ejected_collection] \
+                            + not_assigned + (depth - 1) * self.max_ejection_gain <= self.start_score:
+                        continue
+                    self.remove(ejected)
+                    self.add(application, slot)
+                    self.chain.add(ejected_collection)
+                    # the pushed out collection can also stay unassigned if that is still better
+                    if self.is_improvement() or self.place(ejected_collection, depth - 1):
+                        return True
+                    self.chain.remove(ejected_collection)
+                    self.remove(application)
+                    self.add(ejected, slot)
+        return False
+
+    def add(self, application, slot):
+        self.applications.accept(application)
+        self.assignments.add_application(application, slot)
+        self.slot_applications[slot].append(application)
+
+    def remove(self, application):
+        slot = self.assignments.accepted_slot[application]
+        self.slot_applications[slot].remove(application)
+        self.assignments.remove_application(application)
+        self.applications.release(application)
+
@@ -1,98 +1,390 @@
 import cProfile
+import hashlib
+import math
+import random
 import statistics
 import time
 import traceback
 
-from base.models import Topic, Term, TopicSelection
+from base.models import Term
 from ppsv import settings
-from .applications import Applications, init_applications
-from .assignments import Assignments, init_assignments, topic_data
+from . import engines, exact as exact_solver, local_search, parallel
+from .applications import Applications
+from .assignments import Assignments
+from .problem import load_problem
+from .stop_policy import StopPolicy
 from .strategy import Strategy
-from ..models import Assignment, AcceptedApplications, TermFinalization
-from ..pages.functions import get_score_for_assigned, get_score_for_not_assigned
+from ..models import Assignment, TermFinalization, AssignmentJob
+from ..pages.functions import get_score_data, get_database_score, get_priority_statistics
 
+# the maximum number of iterations of a search, see StopPolicy
 iterations = 10000
-running = False
-progress = 0.0
-eta = ""
+# seconds between two progress updates written to the job
+progress_interval = 1.0
 
 
-def start_algo(override_assignments):
-    if TermFinalization.is_finalized(Term.get_active_term()):
-        raise ValueError("This Term is locked.")
-    global running, progress, eta
-    progress = 0.0
-    running = True
-    eta = "Initializing"
+def run_job(job):
+    """executes the given AssignmentJob and saves its state, progress and result. Exceptions are saved as error of the
+    job"""
+    if not job.claim():
+        return
     try:
-        if settings.DEBUG:
-            profiler = cProfile.Profile()
-            profiler.enable()
-        main(override_assignments)
-        if settings.DEBUG:
-            profiler.disable()
-            profiler.dump_stats('py automatic_assignment.prof')
+        if job.term != Term.get_active_term():
+            raise ValueError("The active term changed since the job was created.")
+        if job.seed is None:
+            job.seed = random.randrange(1 << 30)
+            job.save(update_fields=['seed'])
+        result = start_algo(job.override, job.engine, job, job.workers, job.time_budget, job.patience, job.seed,
+                            job.preview, job.warm_start)
     except Exception as e:
-        progress = 0.0
-        running = False
         print(traceback.format_exc())
-        raise e
-    progress = 0.0
-    running = False
-    eta = ""
+        job.finish(AssignmentJob.FAILED, error=str(e))
+        return
+    job.finish(AssignmentJob.DONE, result)
+
+
+def start_algo(override_assignments, engine=engines.DEFAULT_ENGINE, job=None, workers=1, time_budget=None,
+               patience=None, seed=None, preview=False, warm_start=False):
+    """starts the automatic assignment for the active term, see main"""
+    if TermFinalization.is_finalized(Term.get_active_term()):
+        raise ValueError("This Term is locked.")
+    if not settings.DEBUG:
+        return main(override_assignments, engine, job, workers, time_budget, patience, seed, preview=preview,
+                    warm_start=warm_start)
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        return main(override_assignments, engine, job, workers, time_budget, patience, seed, preview=preview,
+                    warm_start=warm_start)
+    finally:
+        # a profiler that stays enabled after a failed run keeps the next job from installing its own
+        profiler.disable()
+        profiler.dump_stats('py automatic_assignment.prof')
 
 
-def get_database_score():
-    score = 0
+def report_progress(job, progress, eta, best_score):
+    """saves the progress to the job, if the algorithm runs as a job"""
+    if settings.DEBUG:
+        print("Automatic Assignment running: {:.2f}% ".format(progress) + str(eta))
+    if job is not None:
+        job.update_progress(progress, eta, best_score)
 
-    for assignment in Assignment.objects.filter(topic__course__term=Term.get_active_term()):
-        for application in assignment.accepted_applications.all():
-            score += get_score_for_assigned(application.group.size, application.priority)
 
-    handled_apps = list(AcceptedApplications.get_collection_dict().keys())
-    for application in TopicSelection.objects.filter(topic__course__term=Term.get_active_term()):
-        if application.dict_key not in handled_apps:
-            handled_apps.append(application.dict_key)
-            score += get_score_for_not_assigned()
+def replay_job(job):
+    """runs the given finished AssignmentJob again with the same seed and the same number of iterations, without saving
+    the result. A job can only be replayed as long as the applications and the kept assignments did not change
+
+    :return: the result of the replay and if its slots are the same as the slots of the job
+    :rtype: (dict, bool)
+    """
+    if job.result is None or 'run' not in job.result:
+        raise ValueError("The job can not be replayed, it did not finish a run.")
+    if job.term != Term.get_active_term():
+        raise ValueError("Only jobs of the active term can be replayed.")
+    result = main(job.override, job.engine, None, job.workers, replay=job.result['run'], warm_start=job.warm_start)
+    return result, get_slot_keys(result) == get_slot_keys(job.result)
 
-    return score
 
+def apply_preview(job):
+    """saves the assignments of the given finished preview job to the database without running its engine again. A
+    preview can only be applied once and only as long as the applications and the kept assignments did not change
 
-def main(override_assignments):
+    :return: the change set, see Assignment.save_assignments
+    :rtype: dict
+    """
+    if not job.preview or job.state != AssignmentJob.DONE or 'assignments' not in job.result:
+        raise ValueError("Only finished previews can be applied.")
+    if job.applied is not None:
+        raise ValueError("The preview was already applied.")
+    term = Term.get_active_term()
+    if job.term != term:
+        raise ValueError("Only previews of the active term can be applied.")
+    if TermFinalization.is_finalized(term):
+        raise ValueError("This Term is locked.")
+    if AssignmentJob.is_running(term):
+        raise ValueError("An automatic assignment is running, the preview can be applied when it finished.")
+    if get_problem_hash(load_problem(term, job.override)) != job.result['run']['problem']:
+        raise ValueError("The applications or kept assignments changed since the preview, it can not be applied.")
+    changes = Assignment.save_assignments(Assignment.objects.filter(topic__course__term=term),
+                                          job.result['assignments'])
+    job.apply(changes)
+    return changes
+
+
+def get_slot_keys(result):
+    """returns the slots of a result in an order independent form"""
+    return sorted((slot['topic'], slot['slot'], sorted(slot['applications'])) for slot in result['slots'])
+
+
+def get_problem_hash(problem):
+    """returns a hash of everything the result of a run of the problem depends on, except for the assignments in the
+    database that can be replaced"""
+    topic_data = problem.topic_data
+    application_data = problem.application_data
+    key = (topic_data.topic_index, topic_data.min_slot_size, topic_data.max_slot_size, topic_data.slot_offset,
+           topic_data.slot_sizes, topic_data.slot_locked, topic_data.fixed_applications,
+           application_data.ids, application_data.sizes, application_data.priorities, application_data.topics,
+           application_data.collections)
+    return hashlib.sha256(repr(key).encode()).hexdigest()
+
+
+def main(override_assignments, engine=engines.DEFAULT_ENGINE, job=None, workers=1, time_budget=None, patience=None,
+         seed=None, replay=None, preview=False, warm_start=False):
     """the main algorithm for automatically assigning. If override_assignments is True all non-locked assignments could
-    be overwritten by the algorithm. The higher iterations the better the result"""
+    be overwritten by the algorithm. The assignments are calculated by the engine with the given name, see engines. The
+    best assignments found by the engine are improved by a local search afterwards, see local_search.LocalSearch.
+    Engines that search stop after iterations iterations, after time_budget seconds, after patience iterations without a
+    better score or when they reach the upper bound of exact.get_upper_bound, see StopPolicy. Engines that search in
+    parallel use workers processes. If warm_start is True they start from the assignments in the database that can be
+    overwritten, see get_warm_start_orders. All random decisions are derived from seed, a random one is used if it is
+    None. The engine, the seed, the start score and the iterations of the run are returned, so the same run can be
+    replayed by passing them as replay, which reproduces the run instead of saving the result, see replay_job. If
+    preview is True the result is not saved either, but returned with statistics to compare it with the assignments in
+    the database, so it can be saved later without running the engine again, see apply_preview. The progress is saved to
+    job if one is given.
+
+    :return: the best score, if it was saved to the database and what changed, the slots of the best assignment, the
+    statistics of the engine and how to replay the run. A preview also contains the assignments to save and the
+    statistics of the assignments and the database, see get_priority_statistics
+    :rtype: dict
+    """
     print("Starting automatic assignments!")
-    global eta, progress
+    engine = engines.get_engine(engine)
+    if replay is not None:
+        seed = replay['seed']
+    elif seed is None:
+        seed = random.randrange(1 << 30)
 
     # --- init --- #
-    time_track = None
-    topic_ids = [elem[0] for elem in (Topic.objects.filter(course__term=Term.get_active_term()).values_list('pk'))]
-    strategy = Strategy()
-    iteration = 0
-    best_assignments_score = get_database_score()
-    max_assignments_score = get_max_score()
-
-    print("Initial Score: " + str(best_assignments_score))
-    init_assignments(override_assignments)
-    init_applications(override_assignments)
     term = Term.get_active_term()
+    score_data = get_score_data(term)
+    best_assignments_score = score_data['score']
 
-    best_assignments = None
+    print("Initial Score: " + str(best_assignments_score))
+    problem = load_problem(term, override_assignments)
 
-    if len(Applications().applications_for_group) == 0:
+    if Applications(problem).open_collection_count == 0:
         print("No possible applications possible. Canceling automatic assignments")
-        return
-
-    # --- main loop --- #
-    while iteration < iterations:
-        if best_assignments_score == max_assignments_score:
-            print("Perfect Scoring! Stopping Algorithm")
-            break
+        return {'score': best_assignments_score, 'saved': False, 'changes': None, 'slots': []}
+
+    run = {'engine': engine.name, 'seed': seed, 'start_score': best_assignments_score, 'iterations': [],
+           'problem': get_problem_hash(problem), 'start': None}
+    if replay is not None:
+        if replay['problem'] != run['problem']:
+            raise ValueError("The applications or kept assignments changed since the run, it can not be replayed.")
+        best_assignments_score = run['start_score'] = replay['start_score']
+        if replay['start'] is not None:
+            # start from the same assignments as the run, even if they were replaced by its result
+            problem.topic_data.database_applications = [tuple(application) for application in replay['start']]
+    if warm_start:
+        run['start'] = problem.topic_data.database_applications
+
+    context = engines.Context(override_assignments, best_assignments_score, score_data['maxScore'], seed, iterations,
+                              time_budget, patience, workers, warm_start, job, replay)
+    best_assignments, best_assignments_score, stats = engine.solve(problem, context)
+    run['iterations'] = stats.get('iterations', [])
+
+    if engine.improve_result:
+        if best_assignments is None:
+            run['start'] = problem.topic_data.database_applications
+        best_assignments, best_assignments_score = improve_assignments(problem, best_assignments, context.upper_bound,
+                                                                       override_assignments, job)
+
+    database_score = get_database_score(term)
+    saved = replay is None and not preview and best_assignments_score > database_score
+    changes = None
+    if saved:
+        print("Saving to database")
+        changes = best_assignments.save_to_database(term)
+        print(Assignment.get_change_summary(changes))
+    elif preview:
+        print("Preview finished! Not saving to database")
+    else:
+        print("No better assignments found! Not saving to database")
+    topic_data = problem.topic_data
+    result = {
+        'score': best_assignments_score,
+        'saved': saved,
+        'changes': changes,
+        'stats': stats,
+        'run': run,
+        'slots': [{'topic': topic_data.topic_ids[topic_data.slot_topic[slot]],
+                   'slot': topic_data.slot_number[slot],
+                   'applications': [application_id for application_id, _ in slot_applications]}
+                  for slot, slot_applications in best_assignments.get_slots().items()]
+    }
+    if preview:
+        result['assignments'] = best_assignments.get_database_slots()
+        result['preview'] = {
+            'databaseScore': database_score,
+            'database': get_priority_statistics(term),
+            'assignments': get_priority_statistics(term, [application_id for slot in result['slots']
+                                                          for application_id in slot['applications']]),
+        }
+    return result
+
+
+def get_warm_start_orders(problem):
+    """returns the applications of the assignments in the database that can be overwritten by topic, ordered by their
+    slot. A strategy that starts with them takes these assignments as its first iteration and builds them again apart
+    from its mutations, so the search starts from the assignments in the database instead of from scratch
+
+    :return: topic -> applications, see Strategy.warm_start
+    :rtype: dict
+    """
+    data = problem.application_data
+    application_index = {application_id: index for index, application_id in enumerate(data.ids)}
+    orders = {}
+    database_applications = sorted(problem.topic_data.database_applications, key=lambda application: application[1])
+    for application_id, _ in database_applications:
+        if application_id in application_index:
+            application = application_index[application_id]
+            orders.setdefault(data.topics[application], []).append(application)
+    return orders
+
+
+def get_policies(problem, context, workers):
+    """returns the stop policies of the given number of search processes. A replayed run gets the same number of
+    iterations without any other limit, otherwise the upper bound of the context is lowered to exact.get_upper_bound
+    first
+
+    :return: one policy per process
+    :rtype: [StopPolicy]
+    """
+    if context.replay is not None:
+        return [StopPolicy(worker_iterations) for worker_iterations in context.replay['iterations']]
+    report_progress(context.job, 0.0, "Calculating upper bound. Override: {0}".format(context.override), context.score)
+    context.upper_bound = min(context.upper_bound, exact_solver.get_upper_bound(problem))
+    print("Upper Bound: " + str(context.upper_bound))
+    return [StopPolicy(context.iterations, context.time_budget, context.patience, context.upper_bound)] * workers
+
+
+@engines.register
+class SearchEngine(engines.Engine):
+    """builds assignments topic by topic with one randomized strategy, see search"""
+    name = 'search'
+    label = "Randomized search"
+    description = "Builds assignments greedily in a different random order every iteration and keeps the best one."
+    uses_budget = True
+
+    def solve(self, problem, context):
+        policy = get_policies(problem, context, 1)[0]
+        best_assignments, best_assignments_score, worker_iterations = search(
+            problem, context.score, policy, context.override, context.job, context.seed,
+            get_warm_start_orders(problem) if context.warm_start else None)
+        return best_assignments, best_assignments_score, {'iterations': [worker_iterations],
+                                                          'time_to_best': policy.time_to_best}
+
+
+@engines.register
+class ParallelSearchEngine(engines.Engine):
+    """runs independent randomized searches with different seeds in several processes, see parallel.search"""
+    name = 'parallel'
+    label = "Parallel randomized search"
+    description = "Runs one randomized search with its own seed in every process and keeps the best result."
+    uses_budget = True
+
+    def solve(self, problem, context):
+        workers = len(context.replay['iterations']) if context.replay is not None else context.workers
+        policies = get_policies(problem, context, workers)
+
+        def on_progress(done_iterations, best_score):
+            report_progress(context.job,
+                            round(policies[0].get_progress(done_iterations / workers) * 100, 2),
+                            "Searching with {0} processes. Score: {1}/{2}. Override: {3}".format(
+                                workers, best_score, context.upper_bound, context.override),
+                            best_score)
+
+        policies[0].start()
+        seeds = random.Random(context.seed).sample(range(1 << 30), workers)
+        best_assignments, best_assignments_score, worker_iterations, time_to_best = parallel.search(
+            problem, do_iteration, seeds, policies, context.score, on_progress, progress_interval,
+            get_warm_start_orders(problem) if context.warm_start else None)
+        return best_assignments, best_assignments_score, {'iterations': worker_iterations,
+                                                          'time_to_best': time_to_best}
+
+
+@engines.register
+class ExactEngine(engines.Engine):
+    """calculates the optimal assignment as a min-cost flow or with branch and bound, see exact.solve"""
+    name = 'exact'
+    label = "Exact"
+    description = "Calculates the optimal assignment. Terms in which only single students apply for topics with a " \
+                  "minimum slot size of 1 are solved quickly. All other terms are searched with branch and bound, " \
+                  "which only finishes for small terms. Otherwise the best assignment found within the time budget " \
+                  "is used, which is usually worse than the result of the randomized search."
+    uses_budget = True
+
+    def solve(self, problem, context):
+        if context.replay is not None:
+            policy = StopPolicy(context.replay['iterations'][0])
+        else:
+            report_progress(context.job, 0.0, "Calculating upper bound. Override: {0}".format(context.override),
+                            context.score)
+            context.upper_bound = min(context.upper_bound, exact_solver.get_upper_bound(problem))
+            policy = StopPolicy(math.inf, context.time_budget)
+        last_report = time.time()
+
+        def should_stop(nodes, best_score):
+            nonlocal last_report
+            if time.time() - last_report >= progress_interval:
+                last_report = time.time()
+                report_progress(context.job, round(policy.get_progress(nodes) * 100, 2),
+                                "Solving exactly, {0} choices tried. Score: {1}/{2}. Override: {3}".format(
+                                    nodes, best_score, context.upper_bound, context.override),
+                                best_score)
+            policy.update(nodes, best_score)
+            return policy.should_stop(nodes, None)
+
+        report_progress(context.job, 0.0, "Solving exactly. Override: {0}".format(context.override), context.score)
+        policy.start()
+        best_assignments, applications, stats = exact_solver.solve(problem, context.score, should_stop)
+        # the min-cost flow does not call should_stop, its only result is found at the end
+        stats['time_to_best'] = policy.time_to_best if policy.best_score is not None else policy.get_elapsed_time()
+        if best_assignments is None:
+            return None, context.score, stats
+        best_assignments_score = best_assignments.score(applications)
+        print(("Optimal Score: " if stats['optimal'] else "Best Score: ") + str(best_assignments_score))
+        return best_assignments, best_assignments_score, stats
+
+
+@engines.register
+class LocalSearchEngine(engines.Engine):
+    """does not build assignments, so the assignments in the database are improved by the local search that follows
+    every engine"""
+    name = 'local_search'
+    label = "Improve existing assignments"
+    description = "Moves and swaps single applications of the existing assignments until no better assignment is " \
+                  "left."
+
+    def solve(self, problem, context):
+        return None, context.score, {}
+
+
+def search(problem, best_assignments_score, policy, override_assignments, job, seed=None, orders=None):
+    """searches for better assignments of the problem than best_assignments_score with one strategy until policy stops
+    the search. If orders is given the strategy starts with them, see Strategy.warm_start
+
+    :return: the best assignments and their score, or None and best_assignments_score if nothing was found, and the
+    number of iterations
+    :rtype: (Assignments, int, int)
+    """
+    time_track = None
+    last_report = 0
+    strategy = Strategy(seed)
+    if orders is not None:
+        strategy.warm_start(orders)
+    iteration = 0
+    topic_ids = list(range(len(problem.topic_data.topic_ids)))
+    best_assignments = None
 
+    policy.start()
+    while not policy.should_stop(iteration, best_assignments_score):
         time0 = round(time.time() * 1000)
-        assignments, applications = do_iteration(strategy, topic_ids)
+        assignments, applications = do_iteration(problem, strategy, topic_ids)
         iteration += 1
         new_assignments_score = assignments.score(applications)
+        policy.update(iteration, new_assignments_score)
         if new_assignments_score >= best_assignments_score:
             best_assignments = assignments
             best_assignments_score = new_assignments_score
@@ -105,63 +397,81 @@ def main(override_assignments):
         time_track[iteration % 100] = (time3 - time0)
         it_time_mean = statistics.mean(time_track)
         eta = "ETA remaining: {0} ({5}ms). Score: {1}/{2}/{3}. Override: {4}".format(
-            print_time(it_time_mean * (iterations - iteration)),
+            print_time(policy.get_remaining_time(iteration, it_time_mean / 1000) * 1000),
             new_assignments_score,
             best_assignments_score,
-            max_assignments_score,
+            policy.upper_bound,
             override_assignments,
             it_time_mean
         )
-        progress = round(iteration / iterations * 100, 2)
-        if settings.DEBUG:
-            print(
-                "Automatic Assignment running: {:.2f}% ".format(progress) + str(eta) + " took " + str(
-                    time3 - time0) + "ms")
+        if time.time() - last_report >= progress_interval:
+            last_report = time.time()
+            report_progress(job, round(policy.get_progress(iteration) * 100, 2), eta, best_assignments_score)
 
-    if best_assignments is not None and best_assignments_score > get_database_score():
-        print("Saving to database")
-        best_assignments.save_to_database(term)
-    else:
-        print("No better assignments found! Not saving to database")
+    print("Stopping search: " + policy.reason)
+    return best_assignments, best_assignments_score, iteration
 
 
-def do_iteration(strategy, topic_ids):
-    assignments = Assignments()
-    applications = Applications()
+def improve_assignments(problem, assignments, max_assignments_score, override_assignments, job):
+    """improves the given assignments of the problem with a local search. If assignments is None the assignments in the
+    database are improved
+
+    :return: the improved assignments and their score
+    :rtype: (Assignments, int)
+    """
+    if assignments is None:
+        assignments, applications = local_search.load_assignments(problem)
+    else:
+        assignments, applications = local_search.load_assignments(problem, assignments.accepted_slot)
+    start_score = assignments.score(applications)
+
+    def on_pass(score):
+        report_progress(job, 100.0, "Improving assignments. Score: {0}/{1}/{2}. Override: {3}".format(
+            start_score, score, max_assignments_score, override_assignments), score)
+
+    on_pass(start_score)
+    improvements = local_search.LocalSearch(assignments, applications).run(on_pass)
+    print("Local search: {0} improvements".format(improvements))
+    return assignments, assignments.score(applications)
+
+
+def do_iteration(problem, strategy, topic_ids):
+    if strategy.load_database:
+        # the first iteration of a warm start, see Strategy.warm_start
+        return local_search.load_assignments(problem)
+    applications = Applications(problem)
+    assignments = Assignments(problem)
+    topic_data = problem.topic_data
     topic_ids = strategy.get_topics(topic_ids)
 
     for topic_id in topic_ids:
-        if topic_data[topic_id].min_slot_size > 1:
-            for slot_id in range(1, topic_data[topic_id].slots + 1):
-                possible_applications = get_possible_applications_for_slot(applications, assignments, topic_id, slot_id)
-                if len(possible_applications) == 0:
-                    break
+        first_slot = topic_data.slot_offset[topic_id]
+        for slot in range(first_slot, first_slot + topic_data.slots[topic_id]):
+            possible_applications = get_possible_applications_for_slot(applications, assignments, topic_id, slot)
+            if len(possible_applications) == 0:
+                break
+            if topic_data.min_slot_size[topic_id] > 1:
                 create_group_topic_assignment(applications,
                                               possible_applications,
                                               strategy,
                                               topic_id,
                                               assignments,
-                                              slot_id,
-                                              assignments.get_remaining_space_in_slot(topic_id, slot_id))
-        else:
-            for slot_id in range(1, topic_data[topic_id].slots + 1):
-                possible_applications = get_possible_applications_for_slot(applications, assignments, topic_id, slot_id)
-                if len(possible_applications) == 0:
-                    break
+                                              slot,
+                                              assignments.get_remaining_space_in_slot(slot))
+            else:
                 create_single_topic_assignment(applications,
                                                possible_applications,
                                                strategy,
                                                topic_id,
                                                assignments,
-                                               slot_id)
+                                               slot)
 
     return assignments, applications
 
 
-def get_possible_applications_for_slot(applications, assignments, topic_id, slot_id):
+def get_possible_applications_for_slot(applications, assignments, topic_id, slot):
     return applications.get_applications_for_topic_with_max_size(topic_id,
-                                                                 assignments.get_remaining_space_in_slot(topic_id,
-                                                                                                         slot_id))
+                                                                 assignments.get_remaining_space_in_slot(slot))
 
 
 def create_group_topic_assignment(applications, possible_applications, strategy, topic_id, assignments, slot,
@@ -170,20 +480,22 @@ def create_group_topic_assignment(applications, possible_applications, strategy,
     group_application = []
     possible = False
     application_size = 0
+    sizes = applications.data.sizes
 
     while application_size < remaining_slot_space:
         # no applications possible so we need to stop with this permutation
-        possible = topic_data[topic_id].min_slot_size <= application_size
+        possible = assignments.topic_data.min_slot_size[topic_id] <= application_size
         if len(possible_applications) == 0:
             break
         application = strategy.get_next_application(topic_id, possible_applications)
-        application_size += application.size
+        application_size += sizes[application]
         group_application.append(application)
-        possible_applications = [application for application in
-                                 applications.get_applications_for_topic_with_max_size(
-                                     topic_id,
-                                     remaining_slot_space - application_size)
-                                 if application not in group_application]
+        # the collections are accepted at the end, so only the chosen application and the applications that do not
+        # fit anymore drop out
+        possible_applications.remove(application)
+        max_size = remaining_slot_space - application_size
+        possible_applications = [application for application in possible_applications
+                                 if sizes[application] <= max_size]
     # found sth that works, we will stop looking at other permutations.
     if possible:
         for application in group_application:
@@ -208,17 +520,3 @@ def print_time(millis):
     minutes = int(minutes)
     hours = (millis / (1000 * 60 * 60)) % 24
     return "%d:%d:%d" % (hours, minutes, seconds)
-
-
-def get_max_score():
-    """
-    :return: Returns the highest possible score when considering the current applications
-    :rtype: int
-    """
-    handled_applications = []
-    score = 0
-    for application in TopicSelection.objects.filter(topic__course__term=Term.get_active_term()):
-        if (application.group, application.collection_number) not in handled_applications:
-            handled_applications.append((application.group, application.collection_number))
-            score += get_score_for_assigned(application.group.size, 1)
-    return score
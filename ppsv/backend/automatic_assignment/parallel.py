@@ -0,0 +1,101 @@
+import multiprocessing
+
+from django.db import connections
+
+from .applications import Applications
+from .assignments import Assignments
+from .strategy import Strategy
+
+# shared between the worker processes of one search, set by _init_worker
+_problem = None
+_best_score = None
+_done_iterations = None
+
+
+def _init_worker(problem, best_score, done_iterations):
+    global _problem, _best_score, _done_iterations
+    _problem = problem
+    _best_score = best_score
+    _done_iterations = done_iterations
+
+
+def _search(do_iteration, seed, policy, orders):
+    """runs one independent search of the problem of this worker with its own strategy until policy stops it. The best
+    score is shared with all other workers, so every worker can stop as soon as one of them reached the upper bound of
+    the policy. If orders is given the strategy starts with them, see Strategy.warm_start.
+    :return: the best score of this worker, its accepted slots, the number of its iterations and the seconds until it
+    reached its best score
+    :rtype: (int, array, int, float)
+    """
+    strategy = Strategy(seed)
+    if orders is not None:
+        strategy.warm_start(orders)
+    topic_ids = list(range(len(_problem.topic_data.topic_ids)))
+    best_score = None
+    best_accepted_slot = None
+    iteration = 0
+    policy.start()
+    while not policy.should_stop(iteration, _best_score.value):
+        assignments, applications = do_iteration(_problem, strategy, topic_ids)
+        iteration += 1
+        score = assignments.score(applications)
+        policy.update(iteration, score)
+        better = best_score is None or score >= best_score
+        if better:
+            best_score = score
+            best_accepted_slot = assignments.accepted_slot
+            with _best_score.get_lock():
+                if score > _best_score.value:
+                    _best_score.value = score
+        strategy.next_iteration(better, score)
+        with _done_iterations.get_lock():
+            _done_iterations.value += 1
+    return best_score, best_accepted_slot, iteration, policy.time_to_best
+
+
+def search(problem, do_iteration, seeds, policies, start_score, on_progress, progress_interval, orders=None):
+    """runs one independent search of the problem for every seed in parallel, every one of them is stopped by the policy
+    with the same index. The problem is handed to every worker process once when it is started.
+
+    :param do_iteration: the function that creates the assignments of one iteration of the problem for a strategy
+    :param start_score: the score that has to be beaten
+    :param on_progress: called every progress_interval seconds with the finished iterations of all workers and the best
+    score so far
+    :param orders: the orders of applications by topic every strategy starts with, see Strategy.warm_start
+    :return: the best assignments and their score, or None and start_score if no worker found a result, the number of
+    iterations of every worker and the seconds until the worker with the best assignments reached them, None if there
+    are none
+    :rtype: (Assignments, int, [int], float)
+    """
+    context = multiprocessing.get_context('fork')
+    # the forked workers must not share the database connections of this process
+    connections.close_all()
+    best_score = context.Value('q', start_score)
+    done_iterations = context.Value('q', 0)
+    with context.Pool(len(seeds), initializer=_init_worker, initargs=(problem, best_score, done_iterations)) as pool:
+        result = pool.starmap_async(_search, list(zip([do_iteration] * len(seeds), seeds, policies,
+                                                          [orders] * len(seeds))))
+        while not result.ready():
+            result.wait(progress_interval)
+            on_progress(done_iterations.value, best_score.value)
+        results = result.get()
+
+    best_accepted_slot = None
+    best = start_score
+    time_to_best = None
+    for score, accepted_slot, _, worker_time_to_best in results:
+        if score is not None and score >= best:
+            best = score
+            best_accepted_slot = accepted_slot
+            time_to_best = worker_time_to_best
+    worker_iterations = [iterations for _, _, iterations, _ in results]
+    if best_accepted_slot is None:
+        return None, start_score, worker_iterations, None
+
+    applications = Applications(problem)
+    best_assignments = Assignments(problem)
+    for application, slot in enumerate(best_accepted_slot):
+        if slot >= 0:
+            applications.accept(application)
+            best_assignments.add_application(application, slot)
+    return best_assignments, best, worker_iterations, time_to_best
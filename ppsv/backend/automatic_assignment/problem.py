@@ -0,0 +1,117 @@
+from array import array
+
+from backend.automatic_assignment.dataclasses import Problem
+from backend.models import Assignment, AcceptedApplications
+from backend.pages.functions import get_score_for_assigned
+from base.models import Topic, TopicSelection
+
+
+def load_problem(term, override_assignments):
+    """loads the problem of the given term as it is in the database right now with a few bulk queries. If
+    override_assignments is True all non-locked assignments could be overwritten by the algorithm, otherwise all
+    assignments stay in place.
+    :return: the problem
+    :rtype: Problem
+    """
+    problem = Problem()
+    kept_collections = load_topics(problem, term, override_assignments)
+    load_applications(problem, term, kept_collections)
+    return problem
+
+
+def load_topics(problem, term, override_assignments):
+    """loads the topics, slots and the assignments that stay in place
+    :return: the keys (group id, collection number) of the collections that stay in place
+    :rtype: set
+    """
+    data = problem.topic_data
+    topics = list(Topic.objects.filter(course__term=term)
+                  .values_list('pk', 'min_slot_size', 'max_slot_size', 'max_slots'))
+    data.topic_ids = array('l', (pk for pk, _, _, _ in topics))
+    data.topic_index = {pk: index for index, (pk, _, _, _) in enumerate(topics)}
+    data.min_slot_size = array('l', (min_slot_size for _, min_slot_size, _, _ in topics))
+    data.max_slot_size = array('l', (max_slot_size for _, _, max_slot_size, _ in topics))
+    data.slots = array('l', (max_slots for _, _, _, max_slots in topics))
+
+    # assignment id -> topic index, slot id, finalized slot
+    assignments = {pk: (data.topic_index[topic_id], slot_id, finalized_slot)
+                   for pk, topic_id, slot_id, finalized_slot in
+                   Assignment.objects.filter(topic__course__term=term).order_by('pk')
+                   .values_list('pk', 'topic_id', 'slot_id', 'finalized_slot')}
+    accepted_applications = AcceptedApplications.objects.filter(assignment__topic__course__term=term) \
+        .order_by('assignment_id', 'pk') \
+        .values_list('assignment_id', 'topic_selection_id', 'finalized_assignment', 'topic_selection__group_id',
+                     'topic_selection__group__member_count', 'topic_selection__priority',
+                     'topic_selection__collection_number')
+
+    # collect everything that stays in place, an existing slot id can be higher than the current max_slots
+    kept_applications = []
+    replaced_applications = []
+    kept_collections = set()
+    slot_count = list(data.slots)
+    for assignment_id, application_id, locked, group_id, size, priority, collection_number in accepted_applications:
+        topic, slot_id, finalized_slot = assignments[assignment_id]
+        if (not override_assignments) or finalized_slot != 0 or locked:
+            kept_applications.append((topic, slot_id, application_id, locked, size, priority))
+            kept_collections.add((group_id, collection_number))
+            slot_count[topic] = max(slot_count[topic], slot_id)
+        else:
+            replaced_applications.append((topic, slot_id, application_id))
+    for topic, slot_id, finalized_slot in assignments.values():
+        if finalized_slot != 0:
+            slot_count[topic] = max(slot_count[topic], slot_id)
+
+    for topic, count in enumerate(slot_count):
+        data.slot_offset.append(len(data.slot_topic))
+        data.slot_topic.extend([topic] * count)
+        data.slot_number.extend(range(1, count + 1))
+    data.slot_sizes = array('l', [0]) * len(data.slot_topic)
+    data.slot_locked = array('l', [0]) * len(data.slot_topic)
+    data.slot_scores = array('l', [0]) * len(data.slot_topic)
+
+    for topic, slot_id, finalized_slot in assignments.values():
+        if finalized_slot != 0:
+            data.slot_locked[data.get_slot_index(topic, slot_id)] = finalized_slot
+
+    for topic, slot_id, application_id, locked, size, priority in kept_applications:
+        slot = data.get_slot_index(topic, slot_id)
+        score = get_score_for_assigned(size, priority)
+        data.slot_sizes[slot] += size
+        data.slot_scores[slot] += score
+        data.fixed_score += score
+        data.fixed_applications.append((application_id, slot, locked))
+
+    # the assignments in the database that can be replaced, as start for the local search
+    data.database_applications = [(application_id, data.get_slot_index(topic, slot_id))
+                                  for topic, slot_id, application_id in replaced_applications
+                                  if slot_id <= slot_count[topic]]
+    return kept_collections
+
+
+def load_applications(problem, term, kept_collections):
+    """loads all applications that are not part of a collection that stays in place, ordered by priority"""
+    data = problem.application_data
+    topic_index = problem.topic_data.topic_index
+    data.applications_for_topic = [[] for _ in problem.topic_data.topic_ids]
+    collection_index = {}
+    applications = TopicSelection.objects.filter(topic__course__term=term, collection_number__gt=0) \
+        .order_by('priority', 'pk') \
+        .values_list('pk', 'group_id', 'group__member_count', 'topic_id', 'priority', 'collection_number')
+    for pk, group_id, size, topic_id, priority, collection_number in applications:
+        key = (group_id, collection_number)
+        if key in kept_collections:
+            continue
+        if key not in collection_index:
+            collection_index[key] = len(data.collection_keys)
+            data.collection_keys.append(key)
+            data.applications_for_collection.append([])
+        index = len(data.ids)
+        data.ids.append(pk)
+        data.sizes.append(size)
+        data.priorities.append(priority)
+        data.scores.append(get_score_for_assigned(size, priority))
+        data.topics.append(topic_index[topic_id])
+        data.collections.append(collection_index[key])
+        data.applications_for_topic[topic_index[topic_id]].append(index)
+        data.applications_for_collection[collection_index[key]].append(index)
+    data.index_topics()
@@ -0,0 +1,71 @@
+import time
+
+
+class StopPolicy:
+    """Decides when a search is stopped. A search stops after max_iterations iterations, after time_budget seconds,
+    after patience iterations without a better score or as soon as the best score reaches upper_bound. time_budget,
+    patience and upper_bound can be None to not use them. The patience only counts finished iterations, so a patience of
+    0 stops after the first iteration that is not better than the one before.
+    :attr reason: why the search was stopped, None if it was not stopped yet
+    :type reason: str
+    :attr time_to_best: the seconds from the start until the best score given to update was reached
+    :type time_to_best: float
+    """
+
+    def __init__(self, max_iterations, time_budget=None, patience=None, upper_bound=None):
+        self.max_iterations = max_iterations
+        self.time_budget = time_budget
+        self.patience = patience
+        self.upper_bound = upper_bound
+        self.start_time = time.time()
+        self.best_score = None
+        self.last_improvement = 0
+        self.time_to_best = 0.0
+        self.reason = None
+
+    def start(self):
+        """starts the clock and forgets all scores, has to be called when the search starts"""
+        self.start_time = time.time()
+        self.best_score = None
+        self.last_improvement = 0
+        self.time_to_best = 0.0
+        self.reason = None
+
+    def update(self, iteration, score):
+        """saves the score of the given finished iteration"""
+        if self.best_score is None or score > self.best_score:
+            self.best_score = score
+            self.last_improvement = iteration
+            self.time_to_best = self.get_elapsed_time()
+
+    def should_stop(self, iteration, best_score):
+        """returns True if the search should stop before the given iteration. best_score is the best score of the
+        whole search, which can be better than the scores given to update"""
+        if self.upper_bound is not None and best_score is not None and best_score >= self.upper_bound:
+            self.reason = "Perfect Scoring"
+        elif iteration >= self.max_iterations:
+            self.reason = "All iterations done"
+        elif self.time_budget is not None and self.get_elapsed_time() >= self.time_budget:
+            self.reason = "Time budget used up"
+        elif self.patience is not None and iteration > 0 and iteration - self.last_improvement >= self.patience:
+            self.reason = "No improvement for {0} iterations".format(self.patience)
+        else:
+            return False
+        return True
+
+    def get_elapsed_time(self):
+        return time.time() - self.start_time
+
+    def get_progress(self, iteration):
+        """returns the progress of the search between 0 and 1, the time budget counts as much as the iterations"""
+        progress = iteration / self.max_iterations
+        if self.time_budget:
+            progress = max(progress, self.get_elapsed_time() / self.time_budget)
+        return min(progress, 1.0)
+
+    def get_remaining_time(self, iteration, seconds_per_iteration):
+        """returns the remaining seconds until the search is stopped at the latest"""
+        remaining = (self.max_iterations - iteration) * seconds_per_iteration
+        if self.time_budget is not None:
+            remaining = min(remaining, self.time_budget - self.get_elapsed_time())
+        return max(remaining, 0)
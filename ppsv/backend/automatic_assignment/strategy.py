@@ -1,30 +1,35 @@
 import math
 import random
+from bisect import bisect_left
 
 
 class Strategy:
-    """The strategy in which applications and topics will be iterated."""
+    """The strategy in which applications and topics will be iterated. Every strategy has its own random number
+    generator, so the same seed always results in the same iterations."""
 
-    def __init__(self):
+    def __init__(self, seed=None):
         self.iteration = 0
-        self.seed = random.randint(0, 256)
+        self.seed = random.randint(0, 256) if seed is None else seed
+        self.random = random.Random(self.seed)
         # self.seed = -1
         self.mutation_rate = 0.05
         self.mutation_cycle = 5
         self.mutation_cycle_rate = 0.5
         self.topic_list_mutation_cycle = self.mutation_cycle * 2
-        self._topic_cycle_order = {}
+        # the orders of the best iteration of the current topic cycle, the orders of earlier cycles are not used again
+        self.topic_cycle_order = {}
+        # for every topic of topic_cycle_order the position in its order before which all applications were picked in
+        # this iteration
+        self.topic_cycle_cursors = {}
         self.application_order = {}
-        self.application_order_index = {}
+        # the applications picked in this iteration
+        self.picked_applications = set()
+        # the topics whose saved order has no application left for this iteration
+        self.exhausted_topics = set()
+        # True if this iteration takes the assignments in the database instead of building new ones, see warm_start
+        self.load_database = False
         self.topic_cycle = 0
 
-    @property
-    def topic_cycle_order(self):
-        """a map with topics as key and list of applications as values"""
-        if self.topic_cycle not in self._topic_cycle_order:
-            self._topic_cycle_order[self.topic_cycle] = {}
-        return self._topic_cycle_order[self.topic_cycle]
-
     def get_next_application(self, topic, applications):
         """returns the next application from the given applications based on the iteration"""
         if topic not in self.topic_cycle_order:
@@ -33,8 +38,6 @@ class Strategy:
             else:
                 application = self.get_random_application(applications)
         else:
-            if topic not in self.application_order_index:
-                self.application_order_index[topic] = 0
             if self.iteration % self.mutation_cycle == 0:
                 application = self.get_mutation_application(topic, applications, self.mutation_cycle_rate)
             else:
@@ -43,6 +46,7 @@ class Strategy:
         if topic not in self.application_order:
             self.application_order[topic] = []
         self.application_order[topic].append(application)
+        self.picked_applications.add(application)
 
         return application
 
@@ -50,55 +54,74 @@ class Strategy:
         return applications[(self.iteration + self.seed) % len(applications)]
 
     def get_mutation_application(self, topic, applications, mutation_rate):
-        if random.random() > mutation_rate:
+        if self.random.random() > mutation_rate:
             # dont mutate
-            # check if we have elements left in saved order, otherwise return a random one
-            if self.application_order_index[topic] >= len(self.topic_cycle_order[topic]):
+            # return the given application that comes first in the saved order. If there is none, the saved order is
+            # not used for this topic anymore in this iteration and a random one is returned
+            if topic in self.exhausted_topics:
                 return self.get_random_application(applications)
-
-            # get possible indices
-            possible_indices = [i for i in
-                                range(self.application_order_index[topic], len(self.topic_cycle_order[topic]))]
-            for possible_index in possible_indices:
-                if self.topic_cycle_order[topic][possible_index] in applications:
-                    return self.topic_cycle_order[topic][possible_index]
-
-            application = self.topic_cycle_order[topic][self.application_order_index[topic]]
-            self.application_order_index[topic] += 1
-            while application not in applications:
-                if self.application_order_index[topic] >= len(self.topic_cycle_order[topic]):
-                    return self.get_random_application(applications)
-                application = self.topic_cycle_order[topic][self.application_order_index[topic]]
-                self.application_order_index[topic] += 1
-            return application
+            application = self.get_saved_application(topic, applications)
+            if application is not None:
+                return application
+            self.exhausted_topics.add(topic)
+            return self.get_random_application(applications)
         else:
             # mutate
             return self.get_random_application(applications)
 
+    def get_saved_application(self, topic, applications):
+        """returns the given application that comes first in the saved order of the topic, None if there is none. The
+        applications picked in this iteration are not taken again, the cursor of the topic moves past them once, so
+        every pick only looks at the saved applications that are neither picked nor given. The given applications are
+        searched by bisection, so they have to be ordered by their index like ApplicationSnapshot.applications_for_topic
+        to be found"""
+        order = self.topic_cycle_order[topic]
+        cursor = self.topic_cycle_cursors.get(topic, 0)
+        while cursor < len(order) and order[cursor] in self.picked_applications:
+            cursor += 1
+        self.topic_cycle_cursors[topic] = cursor
+        for position in range(cursor, len(order)):
+            application = order[position]
+            if application not in self.picked_applications:
+                index = bisect_left(applications, application)
+                if index < len(applications) and applications[index] == application:
+                    return application
+        return None
+
     def get_topics(self, topics):
         """returns the list of topics for one iteration"""
         if self.seed == -1:
             return topics
         if self.iteration % self.topic_list_mutation_cycle == 0:
-            random.shuffle(topics)
+            self.random.shuffle(topics)
 
         return topics
 
+    def warm_start(self, orders):
+        """starts the search from the assignments in the database. The first iteration takes them as they are, see
+        main.do_iteration, with the given applications by topic as its orders, so the next iterations build the same
+        assignments apart from the mutations"""
+        self.application_order = {topic: list(order) for topic, order in orders.items()}
+        self.load_database = True
+
+    def save_orders(self, orders):
+        """saves the orders of applications by topic that the next iterations follow"""
+        self.topic_cycle_order = orders
+
     def next_iteration(self, iteration_better, score):
-        if iteration_better or len(self._topic_cycle_order[self.topic_cycle]) == 0:
-            self._topic_cycle_order[self.topic_cycle] = self.application_order
-            # if math.floor(self.iteration / self.topic_list_mutation_cycle) not in self.score_for_topic_cycle:
-            #     self.score_for_topic_cycle[math.floor(self.iteration / self.topic_list_mutation_cycle)] = []
-            # self.score_for_topic_cycle[math.floor(self.iteration / self.topic_list_mutation_cycle)] = score
+        if iteration_better or len(self.topic_cycle_order) == 0:
+            self.save_orders(self.application_order)
 
         self.application_order = {}
-        self.application_order_index = {}
+        self.topic_cycle_cursors = {}
+        self.picked_applications = set()
+        self.exhausted_topics = set()
+        self.load_database = False
         self.iteration += 1
 
-        # print("getting applications took " + str(round(self.time * 1000)) + "ms")
-
         if self.iteration % self.topic_list_mutation_cycle == 0:
             self.topic_cycle = math.floor(self.iteration / self.topic_list_mutation_cycle)
+            self.topic_cycle_order = {}
 
     def topic_cycle(self, value):
         self.topic_cycle = value
@@ -0,0 +1,76 @@
+from django.db.models import Sum
+
+from base import request_cache
+
+
+class CapacityIndex:
+    """The used places of all slots of a term, read with one aggregated query. The free places of slots and topics are
+    computed from them without further queries.
+
+    :attr CapacityIndex.slots: topic id -> {assignment id: (slot id, used places)}
+    :type CapacityIndex.slots: dict
+    """
+
+    def __init__(self, assignments):
+        """
+        :param assignments: the assignments (slots) of the term
+        :type assignments: QuerySet
+        """
+        self.slots = {}
+        self._topics = {}
+        for pk, topic_id, slot_id, used in assignments.order_by().values_list('pk', 'topic_id', 'slot_id').annotate(
+                used=Sum('accepted_applications__group__member_count')):
+            self.slots.setdefault(topic_id, {})[pk] = (slot_id, used or 0)
+            self._topics[pk] = topic_id
+
+    def __contains__(self, assignment_id):
+        return assignment_id in self._topics
+
+    def get_used_places_in_slot(self, assignment_id):
+        """returns the number of students assigned to the slot"""
+        return self.slots[self._topics[assignment_id]][assignment_id][1]
+
+    def get_free_places_in_slot(self, assignment_id, topic):
+        """returns the number of students that can still be assigned to the slot of the topic"""
+        return topic.max_slot_size - self.get_used_places_in_slot(assignment_id)
+
+    def get_used_places_in_topic(self, topic_id):
+        """returns the number of students assigned to all slots of the topic"""
+        return sum(used for _, used in self.slots.get(topic_id, {}).values())
+
+    def get_free_places_in_topic(self, topic):
+        """returns the number of students that can still be assigned to the topic, counting the slots that do not exist
+        yet as empty"""
+        return topic.max_slot_size * topic.max_slots - self.get_used_places_in_topic(topic.pk)
+
+    def has_place_for(self, topic_id, max_slots, max_slot_size, group_size):
+        """returns if a group of the given size can be assigned to the topic, either to a slot that does not exist yet
+        or to the free places of an existing one"""
+        slots = self.slots.get(topic_id, {})
+        if len(slots) < max_slots:
+            return True
+        return any(max_slot_size - used >= group_size for _, used in slots.values())
+
+    def get_free_places_in_slots(self, topic):
+        """returns the free places of every existing slot of the topic"""
+        return [topic.max_slot_size - used for _, used in self.slots.get(topic.pk, {}).values()]
+
+
+def get_index(term_id, assignments):
+    """returns the capacity index of the term. While a request is handled the index is kept until the request ends or
+    an assignment changes, see base.request_cache.
+
+    :param term_id: the id of the term of the index
+    :type term_id: int
+    :param assignments: the assignments of the term, only read if the index is not cached
+    :type assignments: QuerySet
+    :rtype: CapacityIndex
+    """
+    return request_cache.get(('capacity', term_id), lambda: CapacityIndex(assignments))
+
+
+def get_cached_index(term_id, assignments):
+    """returns the capacity index of the term if values are cached at the moment, otherwise None"""
+    if not request_cache.is_active():
+        return None
+    return get_index(term_id, assignments)
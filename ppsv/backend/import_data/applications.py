@@ -21,11 +21,13 @@ def init_applications(override_assignments):
         init_applications_for_topic[topic.pk] = []
     init_accepted_applications = []
     for accepted_application in AcceptedApplications.objects.filter(
-            assignment__topic__course__term=Term.get_active_term()):
+            assignment__topic__course__term=Term.get_active_term()).select_related('assignment',
+                                                                                   'topic_selection__group'):
         if (not override_assignments) or accepted_application.assignment.locked or accepted_application.locked:
             init_accepted_applications.append(accepted_application.topic_selection.dict_key)
     for application in TopicSelection.objects.filter(topic__course__term=Term.get_active_term(),
-                                                     collection_number__gt=0).order_by('priority'):
+                                                     collection_number__gt=0) \
+            .select_related('group', 'topic').order_by('priority'):
         if application.dict_key not in init_accepted_applications:
             temp_application = TempApplication(
                 id=application.pk,
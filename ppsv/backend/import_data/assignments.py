@@ -3,7 +3,7 @@ import copy
 from backend.automatic_assignment.dataclasses import TempAssignment, TempApplication, TempTopic
 from backend.automatic_assignment.my_dict_list import MyDictList
 from backend.models import Assignment, AcceptedApplications
-from base.models import Topic, Term, TopicSelection
+from base.models import Topic, Term
 
 all_assignments = MyDictList()
 topic_data = MyDictList()
@@ -23,12 +23,13 @@ def init_assignments(override_assignments):
             slots=topic.max_slots,
             topic=topic
         )
-    for assignment in Assignment.objects.filter(topic__course__term=Term.get_active_term()):
+    for assignment in Assignment.objects.filter(topic__course__term=Term.get_active_term()).select_related('topic'):
         handled_locked_applications = []
         if assignment.locked or not override_assignments:
             if assignment.locked:
                 applications = []
-                for application in AcceptedApplications.objects.filter(assignment=assignment):
+                for application in AcceptedApplications.objects.filter(assignment=assignment) \
+                        .select_related('topic_selection__group'):
                     handled_locked_applications.append(application.pk)
                     applications.append(TempApplication(
                         id=application.topic_selection.pk,
@@ -45,7 +46,8 @@ def init_assignments(override_assignments):
                     accepted_applications=applications,
                     locked=assignment.finalized_slot))
         else:
-            for application in AcceptedApplications.objects.filter(assignment=assignment):
+            for application in AcceptedApplications.objects.filter(assignment=assignment) \
+                    .select_related('topic_selection__group'):
                 if application.locked and application.pk not in handled_locked_applications:
                     handled_locked_applications.append(application.pk)
                     temp_application = TempApplication(
@@ -112,22 +114,19 @@ class Assignments:
         return topic_data[topic_id].max_slot_size
 
     def save_to_database(self, term, faculties):
-        """saves the new assignments to the database only changing the faculties of the imported data"""
-        for assignment in Assignment.objects.filter(topic__course__term=term, topic__course__faculty__in=faculties):
-            assignment.delete()
-        for assignments in self.assignments.values():
-            for assignment in assignments:
-                new_assignment = Assignment.objects.create(
-                    topic=topic_data[assignment.topic_id].topic,
-                    slot_id=assignment.slot_id,
-                    finalized_slot=assignment.locked
-                )
-                for application in assignment.accepted_applications:
-                    AcceptedApplications.objects.create(
-                        assignment=new_assignment,
-                        topic_selection=TopicSelection.objects.get(pk=application.id),
-                        finalized_assignment=application.locked
-                    )
+        """saves the new assignments to the database only changing the faculties of the imported data, only the
+        differences are written
+        :return: the change set, see Assignment.save_assignments
+        :rtype: dict
+        """
+        topic_ids = set(Topic.objects.filter(course__term=term, course__faculty__in=faculties)
+                        .values_list('pk', flat=True))
+        return Assignment.save_assignments(
+            Assignment.objects.filter(topic__course__term=term, topic__course__faculty__in=faculties),
+            [(assignment.topic_id, assignment.slot_id, assignment.locked,
+              [(application.id, application.locked) for application in assignment.accepted_applications])
+             for assignments in self.assignments.values() for assignment in assignments
+             if assignment.topic_id in topic_ids])
 
     def check_collection_satisfied(self, application):
         """returns if the collection the group from this application is satisfied or not"""
@@ -0,0 +1,30 @@
+"""
+Replays a finished automatic assignment job with its seed and checks that it results in the same assignments. Nothing is
+saved to the database
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.automatic_assignment import main as automatic_assignment
+from backend.models import AssignmentJob
+
+
+class Command(BaseCommand):
+    help = "Replays a finished automatic assignment job and compares the result"
+
+    def add_arguments(self, parser):
+        parser.add_argument('job', type=int, help="the id of the job")
+
+    def handle(self, *args, **options):
+        try:
+            job = AssignmentJob.objects.get(pk=options['job'])
+        except AssignmentJob.DoesNotExist:
+            raise CommandError(f"Assignment job {options['job']} does not exist")
+        try:
+            result, identical = automatic_assignment.replay_job(job)
+        except ValueError as e:
+            raise CommandError(str(e))
+        self.stdout.write(f"Replayed assignment job {job.pk} with seed {result['run']['seed']}: "
+                          f"score {result['score']}, job score {job.result['score']}")
+        if not identical:
+            raise CommandError("The replay resulted in other assignments than the job")
+        self.stdout.write("The replay resulted in the same assignments")
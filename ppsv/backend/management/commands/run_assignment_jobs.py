@@ -0,0 +1,31 @@
+"""
+Executes the queued automatic assignment jobs. Runs as its own process next to the web workers, e.g. as a systemd
+service. Only one process may run at a time, jobs that are still running when it starts are marked as failed
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from backend.automatic_assignment import main as automatic_assignment
+from backend.models import AssignmentJob
+
+
+class Command(BaseCommand):
+    help = "Executes queued automatic assignment jobs"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="execute all queued jobs and exit")
+        parser.add_argument('--interval', type=float, default=2.0, help="seconds to wait between looking for jobs")
+
+    def handle(self, *args, **options):
+        interrupted = AssignmentJob.fail_interrupted()
+        if interrupted:
+            self.stdout.write(f"Marked {interrupted} interrupted assignment jobs as failed")
+        while True:
+            for job in AssignmentJob.objects.filter(state=AssignmentJob.QUEUED).order_by('created'):
+                self.stdout.write(f"Starting assignment job {job.pk}")
+                automatic_assignment.run_job(job)
+                self.stdout.write(f"Assignment job {job.pk} {job.state}")
+            if options['once']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,41 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0004_normalize_priority'),
+        ('backend', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssignmentJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('state', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=10)),
+                ('override', models.BooleanField(default=False)),
+                ('engine', models.CharField(default='search', max_length=20)),
+                ('workers', models.PositiveIntegerField(default=1)),
+                ('time_budget', models.PositiveIntegerField(blank=True, null=True)),
+                ('patience', models.PositiveIntegerField(blank=True, null=True)),
+                ('warm_start', models.BooleanField(default=False)),
+                ('preview', models.BooleanField(default=False)),
+                ('seed', models.PositiveIntegerField(blank=True, null=True)),
+                ('progress', models.FloatField(default=0.0)),
+                ('eta', models.CharField(blank=True, default='', max_length=200)),
+                ('best_score', models.IntegerField(blank=True, null=True)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('started', models.DateTimeField(blank=True, null=True)),
+                ('finished', models.DateTimeField(blank=True, null=True)),
+                ('applied', models.DateTimeField(blank=True, null=True)),
+                ('term', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='base.term')),
+            ],
+            options={
+                'ordering': ['-created'],
+            },
+        ),
+    ]
@@ -1,7 +1,12 @@
+from backend import capacity
+from base import request_cache
 from base.models import Topic
 from base.models import TopicSelection, Term
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import connection, models, transaction
+from django.db.models import Sum
+from django.utils import timezone
 
 
 class Assignment(models.Model):
@@ -33,10 +38,7 @@ class Assignment(models.Model):
         :return: returns the count of all open places (per student) for the topic of this assignment
         :rtype: int
         """
-        open_assignment_count = self.topic.max_slot_size * self.topic.max_slots
-        for assignment in Assignment.objects.filter(topic=self.topic):
-            open_assignment_count -= self.topic.max_slot_size - assignment.open_places_in_slot_count
-        return open_assignment_count
+        return Assignment.get_capacity_index(self.topic.course.term_id).get_free_places_in_topic(self.topic)
 
     @property
     def locked(self):
@@ -48,10 +50,7 @@ class Assignment(models.Model):
         :return: returns the count of all open assignments (per student) for this slot
         :rtype: int
         """
-        open_assignment_count = self.topic.max_slot_size
-        for applications in self.accepted_applications.all():
-            open_assignment_count -= applications.group.size
-        return open_assignment_count
+        return self.topic.max_slot_size - self.assigned_student_to_slot_count
 
     @staticmethod
     def assigned_student_to_topic_count(topic):
@@ -59,19 +58,24 @@ class Assignment(models.Model):
         :return: returns the count of all assigned students for the topic of this assignment
         :rtype: int
         """
-        all_assignment_count = 0
-        for assignment in Assignment.objects.filter(topic=topic, topic__course__term=Term.get_active_term()):
-            all_assignment_count += assignment.assigned_student_to_slot_count
-        return all_assignment_count
+        return Assignment.get_capacity_index().get_used_places_in_topic(topic.pk)
 
     @staticmethod
     def has_open_places(topic):
         """returns how many open places (students) are remaining for this topic"""
-        all_assignment_count = 0
-        max_assignments = topic.max_slot_size * topic.max_slots
-        for assignment in Assignment.objects.filter(topic=topic, topic__course__term=Term.get_active_term()):
-            all_assignment_count += assignment.assigned_student_to_slot_count
-        return max_assignments - all_assignment_count
+        return Assignment.get_capacity_index().get_free_places_in_topic(topic)
+
+    @staticmethod
+    def get_capacity_index(term_id=None):
+        """the used places of all slots of a term, see backend.capacity
+        :param term_id: the id of the term, the active term if not given
+        :type term_id: int
+        :rtype: CapacityIndex
+        """
+        if term_id is None:
+            term = Term.get_active_term()
+            term_id = term.pk if term is not None else None
+        return capacity.get_index(term_id, Assignment.objects.filter(topic__course__term_id=term_id))
 
     @property
     def assigned_student_to_slot_count(self):
@@ -79,10 +83,11 @@ class Assignment(models.Model):
         :return: returns the count of all assigned students for this slot
         :rtype: int
         """
-        assignment_count = 0
-        for application in self.accepted_applications.all():
-            assignment_count += application.group.size
-        return assignment_count
+        index = capacity.get_cached_index(self.topic.course.term_id,
+                                          Assignment.objects.filter(topic__course__term_id=self.topic.course.term_id))
+        if index is not None and self.pk in index:
+            return index.get_used_places_in_slot(self.pk)
+        return self.accepted_applications.aggregate(students=Sum('group__member_count'))['students'] or 0
 
     @property
     def max_assigned_student_to_slot(self):
@@ -92,6 +97,117 @@ class Assignment(models.Model):
         """
         return self.topic.max_slot_size
 
+    @staticmethod
+    def save_assignments(assignments, slots):
+        """changes the given assignments so that they contain exactly the given slots. Only the differences are
+        written: slots that are not part of slots anymore are deleted, new slots are created, accepted applications
+        are added, removed or moved to their new slot and changed locks are updated. Everything runs in one
+        transaction, so either all or none of the changes are saved, and only a constant number of queries is used.
+
+        :param assignments: the assignments that are replaced by slots
+        :type assignments: QuerySet
+        :param slots: the slots that are saved as (topic id, slot id, finalized slot, [(topic selection id,
+        finalized assignment)])
+        :type slots: list
+        :return: the change set, a dict with lists of the created and deleted slots as [topic id, slot id], the added
+        and removed applications as [topic selection id, topic id, slot id] and the moved applications as [topic
+        selection id, old topic id, old slot id, topic id, slot id]
+        :rtype: dict
+        """
+        changes = {'created_slots': [], 'deleted_slots': [], 'added': [], 'removed': [], 'moved': []}
+        with transaction.atomic():
+            # assignment id -> (topic id, slot id) and (topic id, slot id) -> (assignment id, finalized slot)
+            slot_keys = {}
+            old_slots = {}
+            for pk, topic_id, slot_id, finalized_slot in assignments.values_list('pk', 'topic_id', 'slot_id',
+                                                                                  'finalized_slot').order_by('pk'):
+                slot_keys[pk] = (topic_id, slot_id)
+                old_slots.setdefault((topic_id, slot_id), (pk, finalized_slot))
+            # topic selection id -> (accepted application id, assignment id, finalized assignment)
+            old_applications = {}
+            duplicates = []
+            for pk, assignment_id, topic_selection_id, finalized_assignment in AcceptedApplications.objects.filter(
+                    assignment_id__in=list(slot_keys)).values_list('pk', 'assignment_id', 'topic_selection_id',
+                                                                   'finalized_assignment').order_by('pk'):
+                if topic_selection_id in old_applications:
+                    duplicates.append(pk)
+                else:
+                    old_applications[topic_selection_id] = (pk, assignment_id, finalized_assignment)
+
+            new_slots = {(topic_id, slot_id): (finalized_slot, accepted_applications)
+                         for topic_id, slot_id, finalized_slot, accepted_applications in slots}
+            created = [Assignment(topic_id=topic_id, slot_id=slot_id, finalized_slot=finalized_slot)
+                       for (topic_id, slot_id), (finalized_slot, _) in new_slots.items()
+                       if (topic_id, slot_id) not in old_slots]
+            if created:
+                Assignment.objects.bulk_create(created)
+                if any(assignment.pk is None for assignment in created):
+                    # the database backend does not return the ids of created rows, a topic has one slot per id
+                    created_ids = dict(((topic_id, slot_id), pk) for pk, topic_id, slot_id in
+                                       Assignment.objects.filter(topic_id__in={slot.topic_id for slot in created})
+                                       .exclude(pk__in=list(slot_keys)).values_list('pk', 'topic_id', 'slot_id'))
+                    for assignment in created:
+                        assignment.pk = created_ids[(assignment.topic_id, assignment.slot_id)]
+                for assignment in created:
+                    changes['created_slots'].append([assignment.topic_id, assignment.slot_id])
+            assignment_ids = {key: pk for key, (pk, _) in old_slots.items()}
+            assignment_ids.update({(assignment.topic_id, assignment.slot_id): assignment.pk for assignment in created})
+
+            changed_slots = []
+            for key, (pk, finalized_slot) in old_slots.items():
+                if key in new_slots and new_slots[key][0] != finalized_slot:
+                    changed_slots.append(Assignment(pk=pk, finalized_slot=new_slots[key][0]))
+            Assignment.objects.bulk_update(changed_slots, ['finalized_slot'])
+
+            added = []
+            changed_applications = []
+            for key, (_, accepted_applications) in new_slots.items():
+                for topic_selection_id, finalized_assignment in accepted_applications:
+                    old_application = old_applications.pop(topic_selection_id, None)
+                    if old_application is None:
+                        added.append(AcceptedApplications(assignment_id=assignment_ids[key],
+                                                          topic_selection_id=topic_selection_id,
+                                                          finalized_assignment=finalized_assignment))
+                        changes['added'].append([topic_selection_id, *key])
+                        continue
+                    pk, assignment_id, old_finalized_assignment = old_application
+                    if assignment_id != assignment_ids[key] or old_finalized_assignment != finalized_assignment:
+                        changed_applications.append(AcceptedApplications(pk=pk, assignment_id=assignment_ids[key],
+                                                                         finalized_assignment=finalized_assignment))
+                    if slot_keys[assignment_id] != key:
+                        changes['moved'].append([topic_selection_id, *slot_keys[assignment_id], *key])
+            # moved applications are updated before their old slot can be deleted
+            AcceptedApplications.objects.bulk_update(changed_applications, ['assignment', 'finalized_assignment'])
+            AcceptedApplications.objects.bulk_create(added)
+
+            removed = duplicates
+            for topic_selection_id, (pk, assignment_id, _) in old_applications.items():
+                removed.append(pk)
+                changes['removed'].append([topic_selection_id, *slot_keys[assignment_id]])
+            if removed:
+                AcceptedApplications.objects.filter(pk__in=removed).delete()
+
+            # a slot that exists twice in the database is merged into one
+            deleted = [pk for pk, key in slot_keys.items() if key not in new_slots or old_slots[key][0] != pk]
+            if deleted:
+                Assignment.objects.filter(pk__in=deleted).delete()
+            changes['deleted_slots'] = [list(key) for key in old_slots if key not in new_slots]
+        # the bulk operations do not send signals
+        request_cache.clear()
+        return changes
+
+    @staticmethod
+    def get_change_summary(changes):
+        """
+        :return: a readable summary of a change set of save_assignments
+        :rtype: str
+        """
+        if changes is None:
+            return "Nothing changed."
+        return "{0} slots created, {1} slots deleted, {2} applications added, {3} removed and {4} moved.".format(
+            len(changes['created_slots']), len(changes['deleted_slots']), len(changes['added']),
+            len(changes['removed']), len(changes['moved']))
+
     @property
     def any_application_locked(self):
         """
@@ -157,14 +273,19 @@ class AcceptedApplications(models.Model):
     @classmethod
     def get_collection_dict(cls):
         """
-        :return: a dict with keys (group, collection_number) and values accepted application
-        :rtype: QuerySet
+        :return: a dict with keys (group id, collection_number) and values accepted application, read with one query
+        and cached for the request
+        :rtype: dict
          """
+        return request_cache.get('accepted_collections', cls._read_collection_dict)
+
+    @classmethod
+    def _read_collection_dict(cls):
         collection_dict = {}
-        for application in cls.objects.filter(assignment__topic__course__term=Term.get_active_term()):
-            application = application.topic_selection
+        for accepted_application in cls.objects.filter(
+                assignment__topic__course__term=Term.get_active_term()).select_related('topic_selection'):
+            application = accepted_application.topic_selection
             collection_dict[application.dict_key] = application
-
         return collection_dict
 
 
@@ -176,7 +297,199 @@ class TermFinalization(models.Model):
 
     @staticmethod
     def is_finalized(term):
-        query = TermFinalization.objects.filter(term=term)
-        if not query.exists():
+        """returns if the term is finalized, the state of the active term is read from its TermStatus"""
+        status = TermStatus.get()
+        if term == status.term:
+            return status.finalized
+        finalization = TermFinalization.objects.filter(term=term).first()
+        return finalization is not None and finalization.finalized
+
+
+# the cache key of the state of the active term, see TermStatus
+TERM_STATUS_CACHE_KEY = 'backend:term_status'
+
+
+class TermStatus:
+    """ TermStatus
+
+    The active term and its state. It is read once per request, the state is kept in the cache that is shared by all
+    processes together with the primary key of the term it belongs to, so it is never used for another term.
+    backend.signals removes it from the cache whenever a term or a term finalization is saved or deleted.
+
+    :attr TermStatus.term: The active term, None if there is none
+    :type TermStatus.term: Term
+    :attr TermStatus.finalized: True if the active term is finalized
+    :type TermStatus.finalized: bool
+    :attr TermStatus.mails_send: True if the emails about the assignments of the active term were sent
+    :type TermStatus.mails_send: bool
+    """
+
+    def __init__(self, term, finalized, mails_send):
+        self.term = term
+        self.finalized = finalized
+        self.mails_send = mails_send
+
+    @staticmethod
+    def get():
+        """
+        :return: the status of the active term
+        :rtype: TermStatus
+        """
+        return request_cache.get('term_status', TermStatus._get_cached)
+
+    @staticmethod
+    def _get_cached():
+        term = Term.get_active_term()
+        if term is None:
+            return TermStatus(None, False, False)
+        # inside a transaction the status is read from the database, see Term.get_active_term
+        use_cache = not connection.in_atomic_block
+        cached = cache.get(TERM_STATUS_CACHE_KEY) if use_cache else None
+        if cached is not None and cached[0] == term.pk:
+            return TermStatus(term, cached[1], cached[2])
+        finalization = TermFinalization.objects.filter(term=term).first()
+        finalized = finalization is not None and finalization.finalized
+        mails_send = finalization is not None and finalization.mails_send
+        if use_cache:
+            cache.set(TERM_STATUS_CACHE_KEY, (term.pk, finalized, mails_send))
+        return TermStatus(term, finalized, mails_send)
+
+
+class AssignmentJob(models.Model):
+    """ AssignmentJob
+
+    This model represents one run of the automatic assignment. Jobs are created by the admin page and executed by the
+    run_assignment_jobs management command, so the progress can be read by every web worker.
+
+    :attr AssignmentJob.term: The term the assignment is calculated for
+    :type AssignmentJob.term: ForeignKey
+    :attr AssignmentJob.state: queued, running, done or failed
+    :type AssignmentJob.state: CharField
+    :attr AssignmentJob.override: True if all non-locked assignments can be overwritten
+    :type AssignmentJob.override: BooleanField
+    :attr AssignmentJob.engine: The name of the engine that calculates the assignment, see automatic_assignment.engines
+    :type AssignmentJob.engine: CharField
+    :attr AssignmentJob.workers: The number of processes of engines searching in parallel
+    :type AssignmentJob.workers: PositiveIntegerField
+    :attr AssignmentJob.time_budget: The seconds after which the search is stopped, no limit if None
+    :type AssignmentJob.time_budget: PositiveIntegerField
+    :attr AssignmentJob.patience: The iterations without a better score after which the search is stopped, no limit if
+        None
+    :type AssignmentJob.patience: PositiveIntegerField
+    :attr AssignmentJob.warm_start: True if the search starts from the assignments in the database that can be
+        overwritten instead of from scratch
+    :type AssignmentJob.warm_start: BooleanField
+    :attr AssignmentJob.preview: True if the result is only saved to the job, so it can be compared with the assignments
+        in the database and applied later
+    :type AssignmentJob.preview: BooleanField
+    :attr AssignmentJob.seed: The seed of all random decisions of the search, a random one is chosen when the job starts
+        if None
+    :type AssignmentJob.seed: PositiveIntegerField
+    :attr AssignmentJob.progress: The progress of the job in percent
+    :type AssignmentJob.progress: FloatField
+    :attr AssignmentJob.eta: A text describing the current status of the job
+    :type AssignmentJob.eta: CharField
+    :attr AssignmentJob.best_score: The best score found so far
+    :type AssignmentJob.best_score: IntegerField
+    :attr AssignmentJob.result: The slots of the best assignment found, a list of topic id, slot id and application ids,
+        and everything needed to replay the run
+    :type AssignmentJob.result: JSONField
+    :attr AssignmentJob.error: The error message if the job failed
+    :type AssignmentJob.error: TextField
+    :attr AssignmentJob.applied: When the result of a preview was saved to the database, None if it was not
+    :type AssignmentJob.applied: DateTimeField
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATE_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    term = models.ForeignKey(Term, on_delete=models.CASCADE)
+    state = models.CharField(max_length=10, choices=STATE_CHOICES, default=QUEUED)
+    override = models.BooleanField(default=False)
+    engine = models.CharField(max_length=20, default='search')
+    workers = models.PositiveIntegerField(default=1)
+    time_budget = models.PositiveIntegerField(null=True, blank=True)
+    patience = models.PositiveIntegerField(null=True, blank=True)
+    warm_start = models.BooleanField(default=False)
+    preview = models.BooleanField(default=False)
+    seed = models.PositiveIntegerField(null=True, blank=True)
+    progress = models.FloatField(default=0.0)
+    eta = models.CharField(max_length=200, blank=True, default="")
+    best_score = models.IntegerField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default="")
+    created = models.DateTimeField(auto_now_add=True)
+    started = models.DateTimeField(null=True, blank=True)
+    finished = models.DateTimeField(null=True, blank=True)
+    applied = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created']
+
+    @property
+    def running(self):
+        return self.state in (AssignmentJob.QUEUED, AssignmentJob.RUNNING)
+
+    @staticmethod
+    def get_latest(term):
+        """returns the latest job of the given term or None"""
+        return AssignmentJob.objects.filter(term=term).first()
+
+    @staticmethod
+    def get_running(term):
+        """returns the queued or running job of the given term or None"""
+        return AssignmentJob.objects.filter(term=term,
+                                            state__in=[AssignmentJob.QUEUED, AssignmentJob.RUNNING]).first()
+
+    @staticmethod
+    def is_running(term):
+        """returns true if a job of the given term is queued or running"""
+        return AssignmentJob.objects.filter(term=term,
+                                            state__in=[AssignmentJob.QUEUED, AssignmentJob.RUNNING]).exists()
+
+    @staticmethod
+    def fail_interrupted():
+        """marks all running jobs as failed. Jobs are executed by a single run_assignment_jobs process, so a job that is
+        still running when it starts was interrupted, e.g. by a crash or a restart of the process, and would block new
+        jobs of its term forever. returns the number of failed jobs"""
+        return AssignmentJob.objects.filter(state=AssignmentJob.RUNNING).update(
+            state=AssignmentJob.FAILED, finished=timezone.now(),
+            error="The job was interrupted, the assignment worker stopped while it was running.")
+
+    def claim(self):
+        """marks this job as running. returns false if another worker took it first"""
+        started = timezone.now()
+        if AssignmentJob.objects.filter(pk=self.pk, state=AssignmentJob.QUEUED) \
+                .update(state=AssignmentJob.RUNNING, started=started) == 0:
             return False
-        return query.get().finalized
+        self.state = AssignmentJob.RUNNING
+        self.started = started
+        return True
+
+    def update_progress(self, progress, eta, best_score=None):
+        """saves the progress of the running job"""
+        self.progress = progress
+        self.eta = eta
+        self.best_score = best_score
+        self.save(update_fields=['progress', 'eta', 'best_score'])
+
+    def apply(self, changes):
+        """saves that the result of this preview was saved to the database with the given change set"""
+        self.applied = timezone.now()
+        self.result['changes'] = changes
+        self.save(update_fields=['applied', 'result'])
+
+    def finish(self, state, result=None, error=""):
+        """saves the final state of the job"""
+        self.state = state
+        self.result = result
+        self.error = error
+        self.finished = timezone.now()
+        self.save(update_fields=['state', 'result', 'error', 'finished'])
@@ -1,3 +1,4 @@
+import os
 import traceback
 
 from django.core.exceptions import ValidationError
@@ -8,16 +9,67 @@ from django.urls import reverse
 
 from base.models import Term, Group, TopicSelection
 from ppsv import settings
-from ..automatic_assignment import main as automatic_assigment
-from ..models import Assignment, TermFinalization, AcceptedApplications
+from ..automatic_assignment import engines, main as automatic_assignment
+from ..models import Assignment, TermFinalization, TermStatus, AcceptedApplications, AssignmentJob
 
 
-def handle_get_assignment_progress():
-    """returns the status of the automatic assignment"""
+def handle_get_assignment_progress(request):
+    """returns the status of the automatic assignment job with the id given as job, or of the latest job of the active
+    term if none is given"""
+    if request.POST.get('job'):
+        job = get_job_of_active_term(request.POST.get('job'))
+        if job is None:
+            return HttpResponse(status=404, content="The automatic assignment does not exist in the active term.")
+    else:
+        job = AssignmentJob.get_latest(Term.get_active_term())
+    if job is None:
+        return JsonResponse({
+            "running": False,
+            "state": None,
+            "progress": 0.0,
+            "eta": "",
+            "bestScore": None,
+            "error": "",
+            "changes": "",
+            "preview": None,
+        })
+    return JsonResponse({
+        "running": job.running,
+        "state": job.state,
+        "progress": job.progress,
+        "eta": job.eta,
+        "bestScore": job.best_score,
+        "error": job.error,
+        "changes": Assignment.get_change_summary(job.result.get('changes')) if job.result else "",
+        "preview": get_preview_data(job),
+    })
+
+
+def get_preview_data(job):
+    """returns the statistics of a finished preview job that was not applied yet, otherwise None"""
+    if not job.preview or job.applied is not None or not job.result or 'preview' not in job.result:
+        return None
+    return dict(job.result['preview'], job=job.pk, score=job.result['score'])
+
+
+def get_job_of_active_term(job_id):
+    """returns the AssignmentJob with the given id if it belongs to the active term, otherwise None"""
+    if not job_id or not job_id.isdigit():
+        return None
+    return AssignmentJob.objects.filter(pk=int(job_id), term=Term.get_active_term()).first()
+
+
+def handle_apply_preview(request):
+    """saves the assignments of a finished preview job to the database, see main.apply_preview"""
+    job = get_job_of_active_term(request.POST.get('job'))
+    if job is None:
+        return HttpResponse(status=404, content="The preview does not exist in the active term.")
+    try:
+        changes = automatic_assignment.apply_preview(job)
+    except ValueError as e:
+        return HttpResponse(status=409, content=str(e))
     return JsonResponse({
-        "running": automatic_assigment.running,
-        "progress": automatic_assigment.progress,
-        "eta": automatic_assigment.eta
+        "changes": Assignment.get_change_summary(changes),
     })
 
 
@@ -49,10 +101,10 @@ def handle_finalize(request):
             "success": "true",
         })
     else:
-        fin = TermFinalization.objects.get_or_create(term=Term.get_active_term())[0]
-        if fin.mails_send:
+        if TermStatus.get().mails_send:
             return HttpResponse(status=500,
                                 content="Emails got already send for this Term. Term is not changeable anymore")
+        fin = TermFinalization.objects.get_or_create(term=Term.get_active_term())[0]
         for assignment in Assignment.objects.all():
             if assignment.finalized_slot > 1:
                 assignment.finalized_slot -= 2
@@ -65,11 +117,35 @@ def handle_finalize(request):
 
 
 def handle_start_automatic_assignment(request):
-    """starts an automatic assignment if it is not running"""
+    """queues an automatic assignment job if none is queued or running. The job is executed by the
+    run_assignment_jobs management command. Returns the id of the queued job, or of the job that is already queued or
+    running, so its progress can be requested"""
     override = request.POST.get('override') == 'true'
-    if not automatic_assigment.running:
-        automatic_assigment.start_algo(override)
-    return HttpResponse(status=205)
+    engine = engines.get_engine(request.POST.get('engine') or engines.DEFAULT_ENGINE)
+    preview = request.POST.get('preview') == 'true'
+    warm_start = request.POST.get('warmStart') == 'true'
+    workers = min(max(int(request.POST.get('workers', 1)), 1), os.cpu_count() or 1)
+    time_budget = get_optional_positive_int(request.POST.get('timeBudget'))
+    patience = get_optional_positive_int(request.POST.get('patience'))
+    seed = int(request.POST['seed']) if request.POST.get('seed') else None
+    term = Term.get_active_term()
+    if TermFinalization.is_finalized(term):
+        raise ValueError("This Term is locked.")
+    job = AssignmentJob.get_running(term)
+    if job is None:
+        job = AssignmentJob.objects.create(term=term, override=override, engine=engine.name, workers=workers,
+                                           time_budget=time_budget, patience=patience, seed=seed, preview=preview,
+                                           warm_start=warm_start)
+    return JsonResponse({
+        "job": job.pk,
+    })
+
+
+def get_optional_positive_int(value):
+    """returns value as an int of at least 1, or None if value is empty"""
+    if not value:
+        return None
+    return max(int(value), 1)
 
 
 def handle_change_term(request):
@@ -104,11 +180,11 @@ def handle_send_mail():
     If emails have already been sent or the current term is not finalized, this function will return an error.
     """
 
-    term = Term.get_active_term()
-    if not TermFinalization.is_finalized(term):
+    status = TermStatus.get()
+    term = status.term
+    if not status.finalized:
         return HttpResponse(status=500, content="Term needs to be finalized")
-    term_info = TermFinalization.objects.get(term=term)
-    if term_info.mails_send:
+    if status.mails_send:
         return HttpResponse(status=500, content="Emails got already send for this Term")
 
     mails = {}
@@ -125,7 +201,8 @@ def handle_send_mail():
             if query.exists():
                 email_body_german += '<h3>Ihnen (oder Ihren Gruppen) wurden folgenden Themen zugewiesen</h3><ul>'
                 email_body_english += '<h3>You (or your Groups) were assigned to the following Topics</h3><ul>'
-                for accepted_application in query.all():
+                for accepted_application in query.select_related('topic_selection__topic__course',
+                                                                 'topic_selection__group'):
                     email_body_german += '<li>' + str(accepted_application.topic_selection.topic.course) + " "
                     email_body_german += str(accepted_application.topic_selection.topic)
                     email_body_english += '<li>' + str(accepted_application.topic_selection.topic.course) + " "
@@ -168,6 +245,7 @@ def handle_send_mail():
     ]
     for m in messages:
         m.content_subtype = 'html'
+    term_info = TermFinalization.objects.get(term=term)
     term_info.mails_send = True
     term_info.save()
 
@@ -193,11 +271,13 @@ def handle_post(request):
         action = request.POST.get("action")
 
         if action == "getAssignmentProgress":
-            return handle_get_assignment_progress()
+            return handle_get_assignment_progress(request)
         if action == "finalize":
             return handle_finalize(request)
         if action == "startAutomaticAssignment":
             return handle_start_automatic_assignment(request)
+        if action == "applyPreview":
+            return handle_apply_preview(request)
         if action == "changeTerm":
             return handle_change_term(request)
         if action == "removeBrokenSlots":
@@ -227,7 +307,12 @@ def render_site(request):
     args = {}
     template_name = 'backend/control_flow.html'
 
-    args["running"] = automatic_assigment.running
+    args["running"] = AssignmentJob.is_running(Term.get_active_term())
+    job = AssignmentJob.get_latest(Term.get_active_term())
+    args["preview"] = get_preview_data(job) if job is not None else None
+    args["cpu_count"] = os.cpu_count() or 1
+    args["engines"] = engines.get_engines()
+    args["default_engine"] = engines.DEFAULT_ENGINE
     args["terms"] = list(Term.objects.all())
     args["activeTerm"] = Term.get_active_term()
 
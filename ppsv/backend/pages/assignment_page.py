@@ -6,12 +6,10 @@ from django.shortcuts import render, redirect
 from django.urls import reverse
 
 from backend.models import Assignment, AcceptedApplications, TermFinalization
-from backend.pages.functions import possible_assignments_for_group, \
-    get_or_none, \
-    check_collection_satisfied, create_json_response, get_or_error, get_group_data, get_broken_slots, \
-    get_score_and_chart_data
+from backend.pages.functions import check_collection_satisfied, create_json_response, get_or_error, \
+    get_group_data, get_broken_slots, get_score_and_chart_data, get_collection_data
 from backend.pages.home_page import handle_clear_slot
-from base.models import TopicSelection, Topic, CourseType, Course, Term
+from base.models import TopicSelection, Topic, CourseType, Course, Term, Group
 from ppsv import settings
 
 
@@ -117,51 +115,56 @@ def handle_select_topic(request):
 
     # get topic
     topic = get_or_error(Topic, id=int(request.POST.get("topicID")))
-
-    # get query applications for topic
-    applications = TopicSelection.objects.filter(topic=topic, topic__course__term=Term.get_active_term(),
-                                                 collection_number__gt=0)
-    application_dict = TopicSelection.get_collection_dict()
-
-    # get query assignments for topic
-    assignments = Assignment.objects.filter(topic=topic, topic__course__term=Term.get_active_term())
+    term = Term.get_active_term()
+
+    # get query applications for topic, everything else is read for all of them at once
+    applications = TopicSelection.objects.filter(topic=topic, topic__course__term=term,
+                                                 collection_number__gt=0).select_related('group')
+    group_ids = {application.group_id for application in applications}
+    members = {}
+    for group_id, student_id in Group.students.through.objects.filter(group_id__in=group_ids).values_list(
+            'group_id', 'student_id'):
+        members.setdefault(group_id, []).append(student_id)
+    collections = get_collection_data(group_ids, term)
+    # topic selection id -> (finalized assignment, slot id)
+    accepted_applications = {
+        topic_selection_id: (finalized_assignment, slot_id)
+        for topic_selection_id, finalized_assignment, slot_id in AcceptedApplications.objects.filter(
+            assignment__topic=topic, assignment__topic__course__term=term).values_list(
+            'topic_selection_id', 'finalized_assignment', 'assignment__slot_id')}
 
     # load all applications data
     _applications = []
     for application in applications:
+        collection = collections[(application.group_id, application.collection_number)]
         # application data
         data = {
-            'students': list(map(lambda x: x.pk, application.group.members)),
+            'students': members.get(application.group_id, []),
             'applicationID': application.id,
-            'possibleAssignmentsForCollection': possible_assignments_for_group(application.group.id,
-                                                                               application.collection_number),
-            'collectionCount': len(application_dict.get(application.dict_key)),
+            'possibleAssignmentsForCollection': collection['possibleAssignments'],
+            'collectionCount': collection['count'],
             'preference': application.priority,
-            'collectionFulfilled': check_collection_satisfied(application),
-            'groupID': application.group.id,
+            'collectionFulfilled': collection['fulfilled'],
+            'groupID': application.group_id,
             'collectionID': application.collection_number,
         }
 
         # accepted application data
-        accepted_application = get_or_none(AcceptedApplications,
-                                           assignment__topic=topic,
-                                           assignment__topic__course__term=Term.get_active_term(),
-                                           topic_selection=application)
-        if accepted_application is None:
+        if application.id not in accepted_applications:
             data['finalizedAssignment'] = False
             data['slotID'] = -1
         else:
-            data['finalizedAssignment'] = accepted_application.finalized_assignment
-            data['slotID'] = accepted_application.assignment.slot_id
+            data['finalizedAssignment'], data['slotID'] = accepted_applications[application.id]
 
         _applications.append(data)
 
     # load slot data
-    term_finalized = TermFinalization.is_finalized(Term.get_active_term())
+    term_finalized = TermFinalization.is_finalized(term)
     slots_finalized = [int(term_finalized) * 2 for _ in range(topic.max_slots)]
     if not term_finalized:
-        for assignment in assignments:
-            slots_finalized[assignment.slot_id - 1] = assignment.finalized_slot
+        for slot_id, finalized_slot in Assignment.objects.filter(topic=topic, topic__course__term=term).values_list(
+                'slot_id', 'finalized_slot'):
+            slots_finalized[slot_id - 1] = finalized_slot
 
     return JsonResponse(
         {
@@ -347,6 +350,12 @@ def handle_get_topics_filtered(request):
 
     filter_type = int(request.POST.get('special'))
     accepted_application_dict = AcceptedApplications.get_collection_dict()
+    # the topics with an application of a collection that is not satisfied
+    unsatisfied_topic_ids = set()
+    if filter_type == 2:
+        for key, applications in TopicSelection.get_collection_dict().items():
+            if key[1] > 0 and key not in accepted_application_dict:
+                unsatisfied_topic_ids.update(application.topic_id for application in applications)
 
     filter_topic_ids = []
 
@@ -355,10 +364,8 @@ def handle_get_topics_filtered(request):
             if Assignment.has_open_places(topic) != 0:
                 filter_topic_ids.append(topic.id)
         if filter_type == 2:
-            for application in TopicSelection.objects.filter(topic=topic, collection_number__gt=0):
-                if application.dict_key not in accepted_application_dict:
-                    filter_topic_ids.append(topic.id)
-                    break
+            if topic.id in unsatisfied_topic_ids:
+                filter_topic_ids.append(topic.id)
 
     return JsonResponse({
         'filteredTopics': filter_topic_ids,
@@ -370,10 +377,13 @@ def handle_get_bulk_applications_update(request):
 
     app_ids = request.POST.getlist('applicationIDs[]')
     app_data = {}
-    for app in TopicSelection.objects.filter(pk__in=app_ids, collection_number__gt=0):
+    applications = TopicSelection.objects.filter(pk__in=app_ids, collection_number__gt=0)
+    collections = get_collection_data({app.group_id for app in applications}, Term.get_active_term())
+    for app in applications:
+        collection = collections.get((app.group_id, app.collection_number))
         app_data[app.pk] = {
-            'possibleAssignments': possible_assignments_for_group(app.group, app.collection_number),
-            'collectionFulfilled': check_collection_satisfied(app)
+            'possibleAssignments': collection['possibleAssignments'] if collection else 0,
+            'collectionFulfilled': collection['fulfilled'] if collection else False
         }
     return JsonResponse(app_data)
 
@@ -386,14 +396,13 @@ def handle_groups_by_prio():
     group_by_prio = {0: [], 1: [], 2: [], 3: [], 4: [], 5: [], 6: []}
     accepted_application_dict = AcceptedApplications.get_collection_dict()
     for app_key in TopicSelection.get_collection_dict():
-        group_id_collection_id_key = (app_key[0].id, app_key[1])
         if app_key in accepted_application_dict:
             if accepted_application_dict[app_key].priority > 5:
-                group_by_prio[6].append(group_id_collection_id_key)
+                group_by_prio[6].append(app_key)
             else:
-                group_by_prio[accepted_application_dict[app_key].priority].append(group_id_collection_id_key)
+                group_by_prio[accepted_application_dict[app_key].priority].append(app_key)
         else:
-            group_by_prio[0].append(group_id_collection_id_key)
+            group_by_prio[0].append(app_key)
 
     return JsonResponse(group_by_prio)
 
@@ -540,7 +549,7 @@ def assignment_page(request):
     """
 
     if not request.user.is_staff:
-        return redirect(reverse('admin:login') + '?next=' + reverse('backend:assignment_page'))
+        return redirect(reverse('admin:login') + '?next=' + reverse('assignments:manual'))
 
     # check if the request is a post
     if request.method == "POST":
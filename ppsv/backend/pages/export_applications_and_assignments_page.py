@@ -29,7 +29,7 @@ def write_row_assignment_helper(topic, slot_id, assignment_writer):
                                        topic__course__term=Term.get_active_term()).exists():
         for assigned_applications in Assignment.objects.all().filter(topic__id=topic.id,
                                                                      slot_id=slot_id,
-                                                                     topic__course__term=Term.get_active_term()).get().accepted_applications.all():
+                                                                     topic__course__term=Term.get_active_term()).get().accepted_applications.select_related('group'):
             if not AcceptedApplications.objects.get(topic_selection=assigned_applications,
                                                     assignment=Assignment.objects.get(topic=topic.id,
                                                                                       slot_id=slot_id)).finalized_assignment:
@@ -81,7 +81,7 @@ def export_applications_and_assignments_page(request):
     """
 
     if not request.user.is_staff:
-        return redirect(reverse('admin:login') + '?next=' + reverse('backend:home_page'))
+        return redirect(reverse('admin:login') + '?next=' + reverse('assignments:export'))
 
     # files
     directory = "import_export_tmp/"
@@ -102,7 +102,8 @@ def export_applications_and_assignments_page(request):
     application_writer.writerow(
         ['ApplicationID', 'TopicID', 'topic name', 'GroupID', 'group size', 'collection number', 'priority'])
 
-    for application in TopicSelection.objects.filter(topic__course__term=Term.get_active_term(), collection_number__gt=0):
+    for application in TopicSelection.objects.filter(topic__course__term=Term.get_active_term(), collection_number__gt=0) \
+            .select_related('topic', 'group'):
         if 'all' == faculty or application.topic.course.faculty == faculty:
             write_row_application_helper(application, application_writer)
 
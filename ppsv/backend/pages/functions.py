@@ -1,7 +1,8 @@
 from django.core.exceptions import ValidationError, MultipleObjectsReturned
 from django.http import JsonResponse
 
-from backend.models import Assignment
+from backend.models import Assignment, AcceptedApplications
+from base import request_cache
 from base.models import TopicSelection, Term, Group
 
 
@@ -46,24 +47,48 @@ def possible_assignments_for_group(group_id, collection_number):
     :param collection_number: the collection id
     """
 
-    term = Term.get_active_term()
+    capacity_index = Assignment.get_capacity_index()
 
     all_applications = all_applications_from_group(group_id, collection_number)
 
     possible_assignments_for_group = 0
     for application in all_applications:
-        query_assignments_for_topic = Assignment.objects.filter(topic=application.topic,
-                                                                topic__course__term=term)
-        if query_assignments_for_topic.count() < application.topic.max_slots:
+        if capacity_index.has_place_for(application.topic.pk, application.topic.max_slots,
+                                        application.topic.max_slot_size, application.group.size):
             possible_assignments_for_group += 1
-            continue
-        for slot in query_assignments_for_topic:
-            if slot.open_places_in_slot_count >= application.group.size:
-                possible_assignments_for_group += 1
-                break
     return possible_assignments_for_group
 
 
+def get_collection_data(group_ids, term):
+    """
+    Returns the data of all collections of the given groups that the assignment page shows for every application,
+    read with a constant number of queries
+    :param group_ids: the ids of the groups
+    :param term: the term of the collections
+    :return: a dict with keys (group id, collection number) and values dicts with the number of applications of the
+    collection ('count'), the number of its applications that can still be assigned ('possibleAssignments') and if the
+    collection is satisfied ('fulfilled')
+    :rtype: dict
+    """
+    capacity_index = Assignment.get_capacity_index(term.pk if term is not None else None)
+    collections = {}
+    for group_id, collection_number, topic_id, max_slots, max_slot_size, group_size in TopicSelection.objects.filter(
+            group_id__in=group_ids, topic__course__term=term).order_by().values_list(
+            'group_id', 'collection_number', 'topic_id', 'topic__max_slots', 'topic__max_slot_size',
+            'group__member_count'):
+        collection = collections.setdefault((group_id, collection_number),
+                                            {'count': 0, 'possibleAssignments': 0, 'fulfilled': False})
+        collection['count'] += 1
+        if capacity_index.has_place_for(topic_id, max_slots, max_slot_size, group_size):
+            collection['possibleAssignments'] += 1
+    for key in AcceptedApplications.objects.filter(topic_selection__group_id__in=group_ids,
+                                                   assignment__topic__course__term=term).values_list(
+            'topic_selection__group_id', 'topic_selection__collection_number'):
+        if key in collections:
+            collections[key]['fulfilled'] = True
+    return collections
+
+
 def possible_assignments_of_group_to_topic(topic, group):
     """
     Returns all assignments than ce be assigned to the given topic without exceeding its maximum slot size
@@ -71,8 +96,8 @@ def possible_assignments_of_group_to_topic(topic, group):
     :param group: the group to search the possible assignments for
     """
     open_assignment_count = topic.max_slots
-    for assignment in Assignment.objects.filter(topic=topic, topic__course__term=Term.get_active_term()):
-        if assignment.open_places_in_slot_count < group.size:
+    for free_places in Assignment.get_capacity_index().get_free_places_in_slots(topic):
+        if free_places < group.size:
             open_assignment_count -= 1
     return open_assignment_count
 
@@ -85,7 +110,7 @@ def all_applications_from_group(group_id, collection_number):
     :return: a list containing all applications in the given collection of the given group sorted by their priority
     """
     return list(TopicSelection.objects.filter(group_id=group_id, topic__course__term=Term.get_active_term()).filter(
-        collection_number=collection_number).order_by(
+        collection_number=collection_number).select_related('topic', 'group').order_by(
         'priority'))
 
 
@@ -132,6 +157,113 @@ def get_score_for_not_assigned():
     return -30
 
 
+def get_assigned_applications(assignments):
+    """
+    Returns all applications that are accepted in the given assignments with one query
+
+    :param assignments: the assignments
+    :type assignments: QuerySet
+    :return: (group id, collection number, priority, group size) of every accepted application
+    :rtype: list
+    """
+    return list(AcceptedApplications.objects.filter(assignment__in=assignments)
+                .values_list('topic_selection__group_id', 'topic_selection__collection_number',
+                             'topic_selection__priority', 'topic_selection__group__member_count'))
+
+
+def get_collection_sizes(applications):
+    """
+    Returns the collections of the given applications with one query
+
+    :param applications: the applications
+    :type applications: QuerySet
+    :return: a dict with keys (group id, collection number) and the size of the group as values
+    :rtype: dict
+    """
+    return {(group_id, collection_number): size for group_id, collection_number, size in
+            applications.order_by().values_list('group_id', 'collection_number', 'group__member_count').distinct()}
+
+
+def get_score_data(term):
+    """
+    Calculates the score of the assignments of the term in the database with two queries. Every accepted application
+    scores get_score_for_assigned, every collection of the term that is not satisfied get_score_for_not_assigned.
+
+    :param term: the term
+    :return: the score, the highest and lowest possible score, the number of accepted applications and of not
+    satisfied collections
+    :rtype: dict
+    """
+    assigned_applications = get_assigned_applications(Assignment.objects.filter(topic__course__term=term))
+    collections = get_collection_sizes(TopicSelection.objects.filter(topic__course__term=term))
+    satisfied_collections = {(group_id, collection_number)
+                             for group_id, collection_number, _, _ in assigned_applications}
+    not_assigned = len(collections.keys() - satisfied_collections)
+    return {
+        'score': sum(get_score_for_assigned(size, priority) for _, _, priority, size in assigned_applications)
+                 + get_score_for_not_assigned() * not_assigned,
+        'maxScore': sum(get_score_for_assigned(size, 1) for size in collections.values()),
+        'minScore': get_score_for_not_assigned() * len(collections),
+        'assignedApplications': len(assigned_applications),
+        'notAssignedCollections': not_assigned,
+    }
+
+
+def get_priority_statistics(term, accepted_ids=None):
+    """
+    Calculates how many groups and students of the term got which priority with two queries, so that assignments that
+    are not saved yet can be compared with the assignments in the database.
+
+    :param term: the term
+    :param accepted_ids: the ids of the accepted topic selections, the ones accepted in the database if None
+    :type accepted_ids: list
+    :return: the histograms groups and students by priority 1 to 5, above 5 and not assigned like
+    TermStatistics.get_chart_data and the score like get_score_data
+    :rtype: dict
+    """
+    if accepted_ids is None:
+        accepted_ids = AcceptedApplications.objects.filter(assignment__topic__course__term=term) \
+            .values_list('topic_selection_id', flat=True)
+    accepted_ids = set(accepted_ids)
+    groups = [0] * 7
+    students = [0] * 7
+    score = 0
+    collections = {}
+    satisfied_collections = set()
+    for pk, group_id, collection_number, priority, size in TopicSelection.objects.filter(
+            topic__course__term=term).values_list('pk', 'group_id', 'collection_number', 'priority',
+                                                  'group__member_count'):
+        collections[(group_id, collection_number)] = size
+        if pk in accepted_ids:
+            bucket = min(priority, 6) - 1
+            groups[bucket] += 1
+            students[bucket] += size
+            score += get_score_for_assigned(size, priority)
+            satisfied_collections.add((group_id, collection_number))
+    not_assigned = collections.keys() - satisfied_collections
+    groups[TermStatistics.NOT_ASSIGNED] = len(not_assigned)
+    students[TermStatistics.NOT_ASSIGNED] = sum(collections[collection] for collection in not_assigned)
+    score += get_score_for_not_assigned() * len(not_assigned)
+    return {'groups': groups, 'students': students, 'score': score}
+
+
+def get_database_score(term):
+    """
+    :return: the score of the assignments of the term in the database, see get_score_data
+    :rtype: int
+    """
+    return get_score_data(term)['score']
+
+
+def get_max_score(term):
+    """
+    :return: the highest possible score when considering the applications of the term
+    :rtype: int
+    """
+    return sum(get_score_for_assigned(size, 1)
+               for size in get_collection_sizes(TopicSelection.objects.filter(topic__course__term=term)).values())
+
+
 def check_collection_satisfied(application):
     """returns if the collection the group from this application is satisfied or not"""
     return Assignment.objects.filter(accepted_applications__group=application.group,
@@ -174,90 +306,109 @@ def get_group_data(group_id, collection_id):
     )
 
 
+class TermStatistics:
+    """The accepted applications and the not satisfied collections of a term, grouped by the courses they belong to, so
+    that the chart data for any filter of courses is summed up from a few groups. It is read with one query per table
+    and cached for the request, see get.
+
+    :attr TermStatistics.courses: (cp, course type id, faculty) -> the sums of the accepted applications of the
+    courses with these values as a dict with the keys groups and students (the histograms by priority 1 to 5, above
+    5 and not assigned), score, maxScore and minScore, and their not satisfied collections as notAssigned: {(group id,
+    collection number): group size}
+    :type TermStatistics.courses: dict
+    """
+    # the index of the not satisfied collections in the histograms, priorities above 5 are counted at index 5
+    NOT_ASSIGNED = 6
+
+    def __init__(self, term):
+        self.courses = {}
+        satisfied_collections = set()
+        accepted_applications = AcceptedApplications.objects.filter(assignment__topic__course__term=term)
+        for group_id, collection_number, priority, size, cp, course_type, faculty in accepted_applications.values_list(
+                'topic_selection__group_id', 'topic_selection__collection_number', 'topic_selection__priority',
+                'topic_selection__group__member_count', 'assignment__topic__course__cp',
+                'assignment__topic__course__type_id', 'assignment__topic__course__faculty'):
+            course = self._get_course(cp, course_type, faculty)
+            bucket = min(priority, 6) - 1
+            course['groups'][bucket] += 1
+            course['students'][bucket] += size
+            course['score'] += get_score_for_assigned(size, priority)
+            course['maxScore'] += get_score_for_assigned(size, 1)
+            course['minScore'] += get_score_for_not_assigned()
+            satisfied_collections.add((group_id, collection_number))
+        # collections that are satisfied outside of the filter are not counted as not assigned
+        for group_id, collection_number, size, cp, course_type, faculty in TopicSelection.objects.filter(
+                topic__course__term=term, collection_number__gt=0).order_by().values_list(
+                'group_id', 'collection_number', 'group__member_count', 'topic__course__cp', 'topic__course__type_id',
+                'topic__course__faculty').distinct():
+            if (group_id, collection_number) not in satisfied_collections:
+                self._get_course(cp, course_type, faculty)['notAssigned'][(group_id, collection_number)] = size
+
+    def _get_course(self, cp, course_type, faculty):
+        key = (cp, course_type, faculty)
+        if key not in self.courses:
+            self.courses[key] = {'groups': [0] * 7, 'students': [0] * 7, 'score': 0, 'maxScore': 0, 'minScore': 0,
+                                 'notAssigned': {}}
+        return self.courses[key]
+
+    @staticmethod
+    def get(term):
+        """
+        :param term: the term or its id
+        :return: the statistics of the term, cached for the request
+        :rtype: TermStatistics
+        """
+        return request_cache.get(('statistics', getattr(term, 'pk', term)), lambda: TermStatistics(term))
+
+    def get_chart_data(self, min_cp, max_cp, course_types, faculties):
+        """sums up the statistics of the courses that match the filter
+
+        :param max_cp: the maximum cp of the courses, -1 if there is none
+        :param course_types: the ids of the course types
+        :type course_types: set
+        :param faculties: the faculties
+        :type faculties: set
+        :return: the histograms of the groups and students by priority, the score in percent of the range between the
+        lowest and highest possible score and the number of not satisfied collections
+        :rtype: (list, list, str, int)
+        """
+        groups = [0] * 7
+        students = [0] * 7
+        score = 0
+        max_score = 0
+        min_score = 0
+        not_assigned = {}
+        for (cp, course_type, faculty), course in self.courses.items():
+            if cp < min_cp or (max_cp != -1 and cp > max_cp) or course_type not in course_types \
+                    or faculty not in faculties:
+                continue
+            for bucket in range(7):
+                groups[bucket] += course['groups'][bucket]
+                students[bucket] += course['students'][bucket]
+            score += course['score']
+            max_score += course['maxScore']
+            min_score += course['minScore']
+            not_assigned.update(course['notAssigned'])
+
+        groups[self.NOT_ASSIGNED] += len(not_assigned)
+        students[self.NOT_ASSIGNED] += sum(not_assigned.values())
+        score += get_score_for_not_assigned() * len(not_assigned)
+        min_score += get_score_for_not_assigned() * len(not_assigned)
+
+        if (max_score - min_score) == 0:
+            data_score = "No Topics with current Filter"
+        else:
+            data_score = "{:.2f} %".format((score - min_score) / (max_score - min_score) * 100)
+        return groups, students, data_score, len(not_assigned)
+
+
 def get_score_and_chart_data(request):
-    min_cp = int(request.POST.get('minCP'))
-    max_cp = int(request.POST.get('maxCP'))
-    course_types = request.POST.getlist('courseTypes[]')
-    faculties = request.POST.getlist('faculties[]')
-    term = request.POST.get('term', Term.get_active_term())
-
-    if max_cp == -1:
-        assignment_query = Assignment.objects.filter(topic__course__cp__gte=min_cp,
-                                                     topic__course__type__in=course_types,
-                                                     topic__course__faculty__in=faculties,
-                                                     topic__course__term=term)
-        application_query = TopicSelection.objects.filter(topic__course__cp__gte=min_cp,
-                                                          topic__course__type__in=course_types,
-                                                          topic__course__faculty__in=faculties,
-                                                          topic__course__term=term,
-                                                          collection_number__gt=0)
-    else:
-        assignment_query = Assignment.objects.filter(topic__course__cp__range=(min_cp, max_cp),
-                                                     topic__course__type__in=course_types,
-                                                     topic__course__faculty__in=faculties,
-                                                     topic__course__term=term)
-        application_query = TopicSelection.objects.filter(topic__course__cp__range=(min_cp, max_cp),
-                                                          topic__course__type__in=course_types,
-                                                          topic__course__faculty__in=faculties,
-                                                          topic__course__term=term,
-                                                          collection_number__gt=0)
-
-    data_statistic = {
-        'groups': {
-            1: 0,
-            2: 0,
-            3: 0,
-            4: 0,
-            5: 0,
-            6: 0,
-            -1: 0
-        },
-        'students': {
-            1: 0,
-            2: 0,
-            3: 0,
-            4: 0,
-            5: 0,
-            6: 0,
-            -1: 0
-        }
-    }
-    score = 0
-    max_score = 0
-    min_score = 0
-    data_not_assigned = 0
-
-    handled_collections = []
-    for assignment in assignment_query:
-        for application in assignment.accepted_applications.all():
-            if application.priority > 5:
-                data_statistic['groups'][6] += 1
-                data_statistic['students'][6] += application.group.size
-            else:
-                data_statistic['groups'][application.priority] += 1
-                data_statistic['students'][application.priority] += application.group.size
-            score += get_score_for_assigned(application.group.size, application.priority)
-            max_score += get_score_for_assigned(application.group.size, 1)
-            min_score += get_score_for_not_assigned()
-            handled_collections.append(application.dict_key)
-
-    for application in application_query:
-        if application.dict_key not in handled_collections:
-            handled_collections.append(application.dict_key)
-            if not check_collection_satisfied(application):
-                data_statistic['groups'][-1] += 1
-                data_statistic['students'][-1] += application.group.size
-                score += get_score_for_not_assigned()
-                min_score += get_score_for_not_assigned()
-                data_not_assigned += 1
-
-    if (max_score - min_score) == 0:
-        data_score = "No Topics with current Filter"
-    else:
-        data_score = "{:.2f} %".format((score - min_score) / (max_score - min_score) * 100)
-
-    return (
-        [i for i in data_statistic['groups'].values()],
-        [i for i in data_statistic['students'].values()],
-        data_score,
-        data_not_assigned)
+    """
+    :return: the chart data of the term of the request for its filter of courses, see TermStatistics.get_chart_data
+    :rtype: (list, list, str, int)
+    """
+    return TermStatistics.get(request.POST.get('term', Term.get_active_term())).get_chart_data(
+        int(request.POST.get('minCP')),
+        int(request.POST.get('maxCP')),
+        {int(course_type) for course_type in request.POST.getlist('courseTypes[]')},
+        set(request.POST.getlist('faculties[]')))
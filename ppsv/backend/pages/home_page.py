@@ -8,27 +8,33 @@ from django.http import JsonResponse
 from django.shortcuts import render, redirect
 from django.urls import reverse
 
-from backend.automatic_assignment import main
 from backend.import_data.applications import *
 from backend.import_data.assignments import *
 from backend.models import Assignment, TopicSelection
-from backend.models import TermFinalization
-from backend.pages.functions import get_broken_slots, get_or_error, get_score_and_chart_data
-from base.models import Course, CourseType, Term
+from backend.models import TermFinalization, AssignmentJob
+from backend.pages.functions import get_broken_slots, get_or_error, get_score_and_chart_data, get_score_data
+from base.models import Course, CourseType, Group, Term
 from ppsv import settings
 
 
 def handle_do_automatic_assignments():
     """
-    Executes the automatic assignment
+    Queues an automatic assignment with override, if none is queued or running. The job is executed by the
+    run_assignment_jobs management command
 
-    :return: If the automatic assignment finished successful, returns a JSONResponse containing "status": "done"
+    :return: a JSONResponse containing "status": "queued" or "running" if a job was already queued or running
     :rtype: JsonResponse
     """
-    main.main(True)
+    term = Term.get_active_term()
+    if AssignmentJob.is_running(term):
+        return JsonResponse(
+            {
+                'status': "running"
+            })
+    AssignmentJob.objects.create(term=term, override=True)
     return JsonResponse(
         {
-            'status': "done"
+            'status': "queued"
         })
 
 
@@ -39,11 +45,12 @@ def handle_get_problems_listing():
     :return: a JsonResponse containing both lists
     :rtype: JsonResponse
     """
-    unfulfilled_collections = []
     all_applications_in_assignments = AcceptedApplications.get_collection_dict()
-    for collection in TopicSelection.get_collection_dict():
-        if collection not in all_applications_in_assignments:
-            unfulfilled_collections.append((str(collection[0]), collection[1], collection[0].id))
+    unfulfilled_keys = [collection for collection in TopicSelection.get_collection_dict()
+                        if collection not in all_applications_in_assignments]
+    groups = Group.objects.in_bulk({group_id for group_id, _ in unfulfilled_keys})
+    unfulfilled_collections = [(str(groups[group_id]), collection_number, group_id)
+                               for group_id, collection_number in unfulfilled_keys]
 
     return JsonResponse(
         data={
@@ -67,6 +74,16 @@ def handle_get_chart_data(request):
     })
 
 
+def handle_get_score():
+    """Creates the score of the assignments of the active term.
+
+    :return: The score, the highest and lowest possible score and the number of accepted applications and not
+    satisfied collections.
+    :rtype: JsonResponse
+    """
+    return JsonResponse(data=get_score_data(Term.get_active_term()))
+
+
 def handle_clear_slot(request):
     """Clears the given slot"""
     slot = get_or_error(Assignment,
@@ -210,12 +227,13 @@ def handle_import(request):
             'errorList': error_list,
         })
 
-    assignments.save_to_database(Term.get_active_term(), imported_faculties)
+    changes = assignments.save_to_database(Term.get_active_term(), imported_faculties)
 
     return JsonResponse(data={
         'successStatus': True,
-        'msg': 'Data imported.',
+        'msg': 'Data imported. ' + Assignment.get_change_summary(changes),
         'errorList': [],
+        'changes': changes,
     })
 
 
@@ -239,6 +257,8 @@ def handle_post(request):
 
         if action == "getChartData":
             return handle_get_chart_data(request)
+        if action == "getScore":
+            return handle_get_score()
         if action == "getProblemsListing":
             return handle_get_problems_listing()
         if action == "doAutomaticAssignments":
@@ -0,0 +1,30 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from backend.models import TERM_STATUS_CACHE_KEY, AcceptedApplications, Assignment, TermFinalization
+from base import request_cache
+from base.models import Term
+
+
+@receiver(post_save, sender=Assignment)
+@receiver(post_delete, sender=Assignment)
+@receiver(post_save, sender=AcceptedApplications)
+@receiver(post_delete, sender=AcceptedApplications)
+@receiver(m2m_changed, sender=Assignment.accepted_applications.through)
+def clear_request_cache(sender, **kwargs):
+    """the capacity indexes and the accepted collections change if applications are accepted or removed"""
+    request_cache.clear()
+
+
+@receiver(post_save, sender=Term)
+@receiver(post_delete, sender=Term)
+@receiver(post_save, sender=TermFinalization)
+@receiver(post_delete, sender=TermFinalization)
+def clear_term_status(sender, **kwargs):
+    """the status is removed from the cache at once and again after the change is committed, because other processes
+    can read and cache the old status until then"""
+    request_cache.clear()
+    cache.delete(TERM_STATUS_CACHE_KEY)
+    transaction.on_commit(lambda: cache.delete(TERM_STATUS_CACHE_KEY))
@@ -1,16 +1,35 @@
+import itertools
+import math
+import pickle
+import random
 from datetime import timedelta
+from io import StringIO
 
 from django.contrib.auth.models import User
 from django.core import mail
 from django.core.exceptions import ValidationError
-from django.test import TestCase
+from django.core.management import call_command
+from django.db import connection
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
 from base.models import Topic, Group, CourseType, Course, Student, TopicSelection, Term
-from .automatic_assignment import main as automatic_assigment
-from .models import Assignment, AcceptedApplications, TermFinalization
+from base import request_cache
+from .automatic_assignment import engines, exact, main as automatic_assigment, parallel
+from .automatic_assignment.applications import Applications
+from .automatic_assignment.assignments import Assignments
+from .automatic_assignment.dataclasses import Problem
+from .automatic_assignment.problem import load_problem
+from .automatic_assignment.stop_policy import StopPolicy
+from .automatic_assignment.strategy import Strategy
+from .models import Assignment, AcceptedApplications, TermFinalization, TermStatus, AssignmentJob, \
+    TERM_STATUS_CACHE_KEY
 from .pages import admin_page, home_page
+from .pages.functions import TermStatistics, get_database_score, get_max_score, get_score_data, \
+    get_priority_statistics, get_score_for_assigned, get_score_for_not_assigned
 
 
 # noinspection PyUnresolvedReferences,DuplicatedCode,DjangoOrm
@@ -165,6 +184,25 @@ class TestAssignmentModel(TestCase):
         self.assertFalse(TermFinalization.is_finalized(self.term))
         self.assertTrue(TermFinalization.is_finalized(self.term2_finalized))
 
+    def test_term_status(self):
+        """
+        tests if the TermStatus is read once per request and read again after the term was finalized
+        """
+
+        request_cache.start()
+        self.addCleanup(request_cache.stop)
+        status = TermStatus.get()
+        self.assertEqual(status.term, self.term)
+        self.assertFalse(status.finalized)
+        self.assertFalse(status.mails_send)
+        with self.assertNumQueries(0):
+            self.assertIs(TermStatus.get(), status)
+            self.assertFalse(TermFinalization.is_finalized(self.term))
+
+        TermFinalization.objects.create(term=self.term, finalized=True)
+        self.assertTrue(TermStatus.get().finalized)
+        self.assertTrue(TermFinalization.is_finalized(self.term))
+
     def test_assigned_student_to_topic_count(self):
         """
         tests if Assignment.assigned_student_to_topic_count property is correct
@@ -243,16 +281,32 @@ class TestAssignmentModel(TestCase):
         """
 
         expected = {
-            (self.group6_size1, 1): self.app_g6_ct2_t1_c1_p1,
-            (self.group5_size1, 1): self.app_g5_ct2_t1_c1_p1,
-            (self.group5_size1, 2): self.app_g5_ct2_t2_c2_p1,
-            (self.group1_size3, 1): self.app_g1_ct1_t1_c1_p1,
-            (self.group2_size3, 1): self.app_g2_ct1_t1_c1_p1,
-            (self.group3_size2, 1): self.app_g3_ct1_t1_c1_p1
+            (self.group6_size1.id, 1): self.app_g6_ct2_t1_c1_p1,
+            (self.group5_size1.id, 1): self.app_g5_ct2_t1_c1_p1,
+            (self.group5_size1.id, 2): self.app_g5_ct2_t2_c2_p1,
+            (self.group1_size3.id, 1): self.app_g1_ct1_t1_c1_p1,
+            (self.group2_size3.id, 1): self.app_g2_ct1_t1_c1_p1,
+            (self.group3_size2.id, 1): self.app_g3_ct1_t1_c1_p1
         }
 
         self.assertDictEqual(AcceptedApplications.get_collection_dict(), expected)
 
+    def test_get_collection_dict_request_cache(self):
+        """
+        tests if the collection dicts are read once per request and read again after an application changed
+        """
+
+        request_cache.start()
+        self.addCleanup(request_cache.stop)
+        collections = TopicSelection.get_collection_dict()
+        accepted_collections = AcceptedApplications.get_collection_dict()
+        with self.assertNumQueries(0):
+            self.assertIs(TopicSelection.get_collection_dict(), collections)
+            self.assertIs(AcceptedApplications.get_collection_dict(), accepted_collections)
+
+        AcceptedApplications.objects.filter(topic_selection=self.app_g1_ct1_t1_c1_p1).delete()
+        self.assertNotIn((self.group1_size3.id, 1), AcceptedApplications.get_collection_dict())
+
     def test_open_places_in_topic_count(self):
         """
         tests if the Assignment.open_places_in_topic_count property is correct
@@ -264,6 +318,24 @@ class TestAssignmentModel(TestCase):
         self.assertEqual(self.assignment4.open_places_in_topic_count, 0)
         self.assertEqual(self.assignment5.open_places_in_topic_count, 1)
 
+    def test_capacity_index(self):
+        """
+        tests if the capacity index is read once per request and read again after the accepted applications changed
+        """
+
+        request_cache.start()
+        self.addCleanup(request_cache.stop)
+        self.assertEqual(Assignment.has_open_places(self.c1_topic1), 7)
+        with self.assertNumQueries(0):
+            self.assertEqual(Assignment.has_open_places(self.c1_topic1), 7)
+            self.assertEqual(Assignment.assigned_student_to_topic_count(self.c2_topic1), 2)
+        self.assertEqual(self.assignment1.assigned_student_to_slot_count, 3)
+        self.assertEqual(self.assignment2.open_places_in_slot_count, 0)
+
+        AcceptedApplications.objects.filter(assignment=self.assignment1).delete()
+        self.assertEqual(Assignment.has_open_places(self.c1_topic1), 10)
+        self.assertEqual(self.assignment1.assigned_student_to_slot_count, 0)
+
     def test_open_places_in_slot_count_single_group(self):
         """
         tests if the Assignment.open_places_in_slot_count property is correct if one group is assigned
@@ -450,32 +522,32 @@ class AssignmentViewTests(TestCase):
         Tests if the URL of the assignment view exists at the correct location.
         """
         self.client.force_login(self.superUser1)
-        response = self.client.get(reverse('backend:assignment_page'))
+        response = self.client.get(reverse('assignments:manual'))
         self.assertEqual(response.status_code, 200)
 
     def test_redirect_for_anonymous_user(self):
         """
         Tests if an anonymous user is redirected to the admin login page when trying to access the assignment page.
         """
-        response = self.client.get(reverse('backend:assignment_page'), follow=True)
+        response = self.client.get(reverse('assignments:manual'), follow=True)
         self.assertEqual(response.status_code, 200)
-        self.assertRedirects(response, reverse('admin:login') + '?next=' + reverse('backend:assignment_page'))
+        self.assertRedirects(response, reverse('admin:login') + '?next=' + reverse('assignments:manual'))
 
     def test_redirect_for_default_user(self):
         """
         Tests if an anonymous user is redirected to the admin login page when trying to access the assignment page.
         """
         self.client.force_login(self.user1)
-        response = self.client.get(reverse('backend:assignment_page'), follow=True)
+        response = self.client.get(reverse('assignments:manual'), follow=True)
         self.assertEqual(response.status_code, 200)
-        self.assertRedirects(response, reverse('admin:login') + '?next=' + reverse('backend:assignment_page'))
+        self.assertRedirects(response, reverse('admin:login') + '?next=' + reverse('assignments:manual'))
 
     def test_view_template(self):
         """
         Tests if the assignment page view uses the correct template assignment.html.
         """
         self.client.force_login(self.superUser1)
-        response = self.client.get(reverse('backend:assignment_page'))
+        response = self.client.get(reverse('assignments:manual'))
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'backend/assignment.html')
 
@@ -484,7 +556,7 @@ class AssignmentViewTests(TestCase):
         Tests if the assignment view displays the correct interface to make assignments.
         """
         self.client.force_login(self.superUser1)
-        response = self.client.get(reverse('backend:assignment_page'))
+        response = self.client.get(reverse('assignments:manual'))
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, 'Topics')
         self.assertContains(response, 'Search course/topic')
@@ -522,7 +594,7 @@ class AssignmentViewTests(TestCase):
                 ],
                 'topicID': 1}
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:assignment_page'), data=data)
+        response = self.client.post(reverse('assignments:manual'), data=data)
         self.assertEqual(response.status_code, 200)
 
         self.maxDiff = None
@@ -582,6 +654,24 @@ class AssignmentViewTests(TestCase):
             }
         )
 
+    def test_select_topic_query_count(self):
+        """
+        Tests if the number of queries of a select topic action does not depend on the number of applications
+        """
+        data = {'action': 'selectTopic', 'topicID': self.topic1A.id}
+        self.client.force_login(self.superUser1)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(reverse('assignments:manual'), data=data)
+
+        for student in [self.student5, self.student6]:
+            group = Group.objects.create()
+            group.students.add(student)
+            TopicSelection.objects.create(group=group, topic=self.topic1A, priority=1)
+        with CaptureQueriesContext(connection) as more_queries:
+            response = self.client.post(reverse('assignments:manual'), data=data)
+        self.assertEqual(len(response.json()['applications']), 5)
+        self.assertEqual(len(more_queries), len(queries))
+
     def test_new_assignment_satisfied(self):
         """
         Tests if the response of a new assignment action is correct when the group is already assigned to a topic
@@ -597,7 +687,7 @@ class AssignmentViewTests(TestCase):
                 'applicationID': self.topic_selection1.id
                 }
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:assignment_page'), data=data)
+        response = self.client.post(reverse('assignments:manual'), data=data)
         self.assertEqual(response.status_code, 200)
 
         self.assertJSONEqual(
@@ -628,7 +718,7 @@ class AssignmentViewTests(TestCase):
                 'applicationID': self.topic_selection4.id
                 }
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:assignment_page'), data=data)
+        response = self.client.post(reverse('assignments:manual'), data=data)
         self.assertEqual(response.status_code, 200)
 
         self.assertJSONEqual(
@@ -648,7 +738,7 @@ class AssignmentViewTests(TestCase):
                 'applicationID': self.topic_selection1_4.id
                 }
 
-        response = self.client.post(reverse('backend:assignment_page'), data=data)
+        response = self.client.post(reverse('assignments:manual'), data=data)
         self.assertEqual(response.status_code, 200)
 
         self.assertJSONEqual(
@@ -670,7 +760,7 @@ class AssignmentViewTests(TestCase):
                 'applicationID': self.topic_selection5.id
                 }
 
-        response = self.client.post(reverse('backend:assignment_page'), data=data)
+        response = self.client.post(reverse('assignments:manual'), data=data)
         self.assertEqual(response.status_code, 200)
 
         self.assertJSONEqual(
@@ -697,7 +787,7 @@ class AssignmentViewTests(TestCase):
                 'applicationID': 69
                 }
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:assignment_page'), data=data)
+        response = self.client.post(reverse('assignments:manual'), data=data)
         self.assertEqual(response.status_code, 500)
 
     def test_new_Assignment_not_enough_space_in_slot(self):
@@ -711,7 +801,7 @@ class AssignmentViewTests(TestCase):
                 'applicationID': self.topic_selection1_3.id
                 }
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:assignment_page'), data=data)
+        response = self.client.post(reverse('assignments:manual'), data=data)
         self.assertEqual(response.status_code, 200)
 
         self.assertJSONEqual(
@@ -733,7 +823,7 @@ class AssignmentViewTests(TestCase):
         }
 
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:assignment_page'), data=data)
+        response = self.client.post(reverse('assignments:manual'), data=data)
         self.assertEqual(response.status_code, 200)
 
         self.assertJSONEqual(
@@ -761,7 +851,7 @@ class AssignmentViewTests(TestCase):
         }
 
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:assignment_page'), data=data)
+        response = self.client.post(reverse('assignments:manual'), data=data)
         self.assertEqual(response.status_code, 200)
 
         assignment = Assignment.objects.get(id=assignment.id)
@@ -785,7 +875,7 @@ class AssignmentViewTests(TestCase):
         }
 
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:assignment_page'), data=data)
+        response = self.client.post(reverse('assignments:manual'), data=data)
         self.assertEqual(response.status_code, 200)
 
         assignment = Assignment.objects.get(id=assignment.id)
@@ -818,7 +908,7 @@ class AssignmentViewTests(TestCase):
         }
 
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:assignment_page'), data=data)
+        response = self.client.post(reverse('assignments:manual'), data=data)
         self.assertEqual(response.status_code, 200)
 
         assignment = Assignment.objects.get(id=assignment.id)
@@ -851,7 +941,7 @@ class AssignmentViewTests(TestCase):
         }
 
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:assignment_page'), data=data)
+        response = self.client.post(reverse('assignments:manual'), data=data)
         self.assertEqual(response.status_code, 200)
 
         assignment = Assignment.objects.get(id=assignment.id)
@@ -884,7 +974,7 @@ class AssignmentViewTests(TestCase):
         }
 
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:assignment_page'), data=data)
+        response = self.client.post(reverse('assignments:manual'), data=data)
         self.assertEqual(response.status_code, 200)
 
         self.assertJSONEqual(
@@ -912,7 +1002,7 @@ class AssignmentViewTests(TestCase):
         }
 
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:assignment_page'), data=data)
+        response = self.client.post(reverse('assignments:manual'), data=data)
         self.assertEqual(response.status_code, 200)
 
         self.assertJSONEqual(str(response.content, encoding='utf8'), {"filteredTopics": [1, 2]})
@@ -931,7 +1021,7 @@ class AssignmentViewTests(TestCase):
         }
 
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:assignment_page'), data=data)
+        response = self.client.post(reverse('assignments:manual'), data=data)
         self.assertEqual(response.status_code, 200)
 
         self.assertJSONEqual(str(response.content, encoding='utf8'), {"filteredTopics": [1]})
@@ -960,7 +1050,7 @@ class AssignmentViewTests(TestCase):
         }
 
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:assignment_page'), data=data)
+        response = self.client.post(reverse('assignments:manual'), data=data)
         self.assertEqual(response.status_code, 200)
 
         assignment = Assignment.objects.get(id=assignment.id)
@@ -996,7 +1086,7 @@ class AssignmentViewTests(TestCase):
         }
 
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:assignment_page'), data=data)
+        response = self.client.post(reverse('assignments:manual'), data=data)
         self.assertEqual(response.status_code, 200)
 
         self.assertJSONEqual(
@@ -1020,7 +1110,7 @@ class AssignmentViewTests(TestCase):
         }
 
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:assignment_page'), data=data)
+        response = self.client.post(reverse('assignments:manual'), data=data)
         self.assertEqual(response.status_code, 200)
 
         self.assertFalse(Assignment.objects.filter(id=assignment.id).exists())
@@ -1037,7 +1127,7 @@ class AssignmentViewTests(TestCase):
         }
 
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:assignment_page'), data=data)
+        response = self.client.post(reverse('assignments:manual'), data=data)
 
         self.assertJSONEqual(str(response.content, encoding='utf8'),
                              '{"selectedGroup": "1", "selectedCollection": "1", "members": ["ab12eeee", "bc22eeee"], '
@@ -1054,7 +1144,7 @@ class AssignmentViewTests(TestCase):
         }
 
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:assignment_page'), data=data)
+        response = self.client.post(reverse('assignments:manual'), data=data)
         self.assertEqual(response.status_code, 200)
 
         self.assertJSONEqual(
@@ -1073,7 +1163,7 @@ class AssignmentViewTests(TestCase):
         }
 
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:assignment_page'), data=data)
+        response = self.client.post(reverse('assignments:manual'), data=data)
         self.assertEqual(response.status_code, 200)
 
         self.assertJSONEqual(
@@ -1092,7 +1182,7 @@ class AssignmentViewTests(TestCase):
         }
 
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:assignment_page'), data=data)
+        response = self.client.post(reverse('assignments:manual'), data=data)
         self.assertEqual(response.status_code, 501)
 
         self.assertEqual(response.content,
@@ -1109,7 +1199,7 @@ class AssignmentViewTests(TestCase):
         }
 
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:assignment_page'), data=data)
+        response = self.client.post(reverse('assignments:manual'), data=data)
         self.assertEqual(response.status_code, 501)
 
         self.assertEqual(response.content, b"POST request didn't specify an action. Please report this and the actions "
@@ -1136,7 +1226,7 @@ class AssignmentViewTests(TestCase):
         }
 
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:assignment_page'), data=data)
+        response = self.client.post(reverse('assignments:manual'), data=data)
         self.assertEqual(response.status_code, 200)
 
         accepted_application = AcceptedApplications.objects.get(id=accepted_application.id)
@@ -1160,7 +1250,7 @@ class AssignmentViewTests(TestCase):
         }
 
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:assignment_page'), data=data)
+        response = self.client.post(reverse('assignments:manual'), data=data)
         self.assertEqual(response.status_code, 200)
 
         accepted_application = AcceptedApplications.objects.get(id=accepted_application.id)
@@ -1195,7 +1285,7 @@ class AssignmentViewTests(TestCase):
         }
 
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:assignment_page'), data=data)
+        response = self.client.post(reverse('assignments:manual'), data=data)
         self.assertEqual(response.status_code, 200)
 
         accepted_application = AcceptedApplications.objects.get(id=accepted_application.id)
@@ -1222,7 +1312,7 @@ class AssignmentViewTests(TestCase):
         }
 
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:assignment_page'), data=data)
+        response = self.client.post(reverse('assignments:manual'), data=data)
         self.assertEqual(response.status_code, 200)
 
         self.assertJSONEqual(
@@ -1248,7 +1338,7 @@ class AssignmentViewTests(TestCase):
                 }
 
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:assignment_page'), data=data)
+        response = self.client.post(reverse('assignments:manual'), data=data)
         self.assertEqual(response.status_code, 200)
 
         self.assertJSONEqual(
@@ -1278,7 +1368,7 @@ class AssignmentViewTests(TestCase):
                 'applicationID': self.topic_selection4.id
                 }
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:assignment_page'), data=data)
+        response = self.client.post(reverse('assignments:manual'), data=data)
         self.assertEqual(response.status_code, 200)
 
         self.assertJSONEqual(
@@ -1308,7 +1398,7 @@ class AssignmentViewTests(TestCase):
                 'applicationID': self.topic_selection4.id
                 }
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:assignment_page'), data=data)
+        response = self.client.post(reverse('assignments:manual'), data=data)
         self.assertEqual(response.status_code, 200)
 
         self.assertJSONEqual(
@@ -1342,7 +1432,7 @@ class AssignmentViewTests(TestCase):
                 'applicationID': self.topic_selection4.id
                 }
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:assignment_page'), data=data)
+        response = self.client.post(reverse('assignments:manual'), data=data)
         self.assertEqual(response.status_code, 200)
 
         self.assertJSONEqual(
@@ -1369,7 +1459,7 @@ class AssignmentViewTests(TestCase):
         """
 
         self.client.force_login(self.superUser1)
-        response = self.client.get(reverse('backend:assignment_page'))
+        response = self.client.get(reverse('assignments:manual'))
         self.assertEqual(response.status_code, 200)
 
         self.assertContains(response, 'CP:')
@@ -1391,12 +1481,12 @@ class AdminPageTest(TestCase):
         Sets up test data
         """
 
-        cls.user1 = User.objects.create_user(username='testuser1', password='12345')
-        cls.user2 = User.objects.create_user(username='testuser2', password='12345')
-        cls.user3 = User.objects.create_user(username='testuser3', password='12345')
-        cls.user4 = User.objects.create_user(username='testuser4', password='12345')
-        cls.user5 = User.objects.create_user(username='testuser5', password='12345')
-        cls.user6 = User.objects.create_user(username='testuser6', password='12345')
+        cls.user1 = User.objects.create_user(username='testuser1', password='12345', email="test1@test.com")
+        cls.user2 = User.objects.create_user(username='testuser2', password='12345', email="test2@test.com")
+        cls.user3 = User.objects.create_user(username='testuser3', password='12345', email="test3@test.com")
+        cls.user4 = User.objects.create_user(username='testuser4', password='12345', email="test4@test.com")
+        cls.user5 = User.objects.create_user(username='testuser5', password='12345', email="test5@test.com")
+        cls.user6 = User.objects.create_user(username='testuser6', password='12345', email="test6@test.com")
 
         cls.superUser1 = User.objects.create_superuser(username='testsuperuser1', password='12345')
 
@@ -1456,12 +1546,12 @@ class AdminPageTest(TestCase):
         cls.topic2B = Topic.objects.create(course=cls.course4, title='topic2B', max_slots=3, min_slot_size=1,
                                            max_slot_size=2)
 
-        cls.student1 = Student.objects.create(user=cls.user1, tucan_id='ab12eeee', email="test1@test.com")
-        cls.student2 = Student.objects.create(user=cls.user2, tucan_id='bc22eeee', email="test2@test.com")
-        cls.student3 = Student.objects.create(user=cls.user3, tucan_id='cd33eeee', email="test3@test.com")
-        cls.student4 = Student.objects.create(user=cls.user4, tucan_id='de44eeee', email="test4@test.com")
-        cls.student5 = Student.objects.create(user=cls.user5, tucan_id='ef55eeee', email="test5@test.com")
-        cls.student6 = Student.objects.create(user=cls.user6, tucan_id='fg66eeee', email="test6@test.com")
+        cls.student1 = Student.objects.create(user=cls.user1, tucan_id='ab12eeee')
+        cls.student2 = Student.objects.create(user=cls.user2, tucan_id='bc22eeee')
+        cls.student3 = Student.objects.create(user=cls.user3, tucan_id='cd33eeee')
+        cls.student4 = Student.objects.create(user=cls.user4, tucan_id='de44eeee')
+        cls.student5 = Student.objects.create(user=cls.user5, tucan_id='ef55eeee')
+        cls.student6 = Student.objects.create(user=cls.user6, tucan_id='fg66eeee')
 
         cls.group1_1_2 = Group.objects.create()
         cls.group1_1_2.students.add(cls.student1)
@@ -1501,34 +1591,34 @@ class AdminPageTest(TestCase):
 
     def test_admin_page_template(self):
         self.client.force_login(self.superUser1)
-        response = self.client.get(reverse('backend:admin_page'))
+        response = self.client.get(reverse('assignments:manage'))
         self.assertEqual(response.status_code, 200)
-        self.assertTemplateUsed(response, 'backend/admin.html')
+        self.assertTemplateUsed(response, 'backend/control_flow.html')
 
     def test_view_url_exists_at_correct_location(self):
         """
         Tests if the URL of the assignment view exists at the correct location.
         """
         self.client.force_login(self.superUser1)
-        response = self.client.get(reverse('backend:admin_page'))
+        response = self.client.get(reverse('assignments:manage'))
         self.assertEqual(response.status_code, 200)
 
     def test_redirect_for_anonymous_user(self):
         """
         Tests if an anonymous user is redirected to the admin login page when trying to access the assignment page.
         """
-        response = self.client.get(reverse('backend:admin_page'), follow=True)
+        response = self.client.get(reverse('assignments:manage'), follow=True)
         self.assertEqual(response.status_code, 200)
-        self.assertRedirects(response, reverse('admin:login') + '?next=' + reverse('backend:admin_page'))
+        self.assertRedirects(response, reverse('admin:login') + '?next=' + reverse('assignments:manage'))
 
     def test_redirect_for_default_user(self):
         """
         Tests if an anonymous user is redirected to the admin login page when trying to access the assignment page.
         """
         self.client.force_login(self.user1)
-        response = self.client.get(reverse('backend:admin_page'), follow=True)
+        response = self.client.get(reverse('assignments:manage'), follow=True)
         self.assertEqual(response.status_code, 200)
-        self.assertRedirects(response, reverse('admin:login') + '?next=' + reverse('backend:admin_page'))
+        self.assertRedirects(response, reverse('admin:login') + '?next=' + reverse('assignments:manage'))
 
     def test_handle_finalize(self):
         """
@@ -1541,7 +1631,7 @@ class AdminPageTest(TestCase):
         }
 
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:admin_page'), data=data)
+        response = self.client.post(reverse('assignments:manage'), data=data)
         self.assertJSONEqual(str(response.content, encoding='utf8'), {
             "success": "true"
         })
@@ -1556,7 +1646,7 @@ class AdminPageTest(TestCase):
             "finalize": "false"
         }
 
-        response = self.client.post(reverse('backend:admin_page'), data=data)
+        response = self.client.post(reverse('assignments:manage'), data=data)
         self.assertJSONEqual(str(response.content, encoding='utf8'), {
             "success": "true"
         })
@@ -1583,7 +1673,7 @@ class AdminPageTest(TestCase):
         TermFinalization.objects.create(term=self.term, finalized=True, mails_send=True)
 
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:admin_page'), data=data)
+        response = self.client.post(reverse('assignments:manage'), data=data)
         self.assertEqual(response.status_code, 500)
 
         self.assertEqual(response.content, b"Emails got already send for this Term. Term is not changeable anymore")
@@ -1611,7 +1701,7 @@ class AdminPageTest(TestCase):
         assignment.accepted_applications.add(self.topic_selection2)
 
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:admin_page'), data=data)
+        response = self.client.post(reverse('assignments:manage'), data=data)
         self.assertJSONEqual(str(response.content, encoding='utf8'), {
             "success": "false"
         })
@@ -1642,7 +1732,7 @@ class AdminPageTest(TestCase):
         assignment.accepted_applications.add(self.topic_selection5)
 
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:admin_page'), data=data)
+        response = self.client.post(reverse('assignments:manage'), data=data)
         self.assertJSONEqual(str(response.content, encoding='utf8'), {
             "success": "false"
         })
@@ -1664,12 +1754,287 @@ class AdminPageTest(TestCase):
             "override": "false"
         }
 
-        automatic_assigment.running = False
         automatic_assigment.iterations = 1
 
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:admin_page'), data=data)
-        self.assertEqual(response.status_code, 205)
+        response = self.client.post(reverse('assignments:manage'), data=data)
+        self.assertEqual(response.status_code, 200)
+        job = AssignmentJob.objects.get(term=self.term)
+        self.assertEqual(response.json(), {"job": job.pk})
+        self.assertEqual(job.state, AssignmentJob.QUEUED)
+        self.assertFalse(job.override)
+
+        # a second request does not queue another job but returns the queued one
+        response = self.client.post(reverse('assignments:manage'), data=data)
+        self.assertEqual(response.json(), {"job": job.pk})
+        self.assertEqual(AssignmentJob.objects.filter(term=self.term).count(), 1)
+
+        call_command('run_assignment_jobs', '--once', stdout=StringIO())
+        job.refresh_from_db()
+        self.assertEqual(job.state, AssignmentJob.DONE)
+        self.assertIsNotNone(job.result)
+
+    def test_run_assignment_jobs_interrupted(self):
+        """
+        tests if a job that is still running when the worker starts is marked as failed and does not block new jobs
+        """
+
+        job = AssignmentJob.objects.create(term=self.term, state=AssignmentJob.RUNNING, started=timezone.now())
+        queued_job = AssignmentJob.objects.create(term=self.term)
+        self.assertTrue(AssignmentJob.is_running(self.term))
+
+        out = StringIO()
+        call_command('run_assignment_jobs', '--once', stdout=out)
+        self.assertIn("Marked 1 interrupted assignment jobs as failed", out.getvalue())
+        job.refresh_from_db()
+        self.assertEqual(job.state, AssignmentJob.FAILED)
+        self.assertNotEqual(job.error, "")
+        self.assertIsNotNone(job.finished)
+        queued_job.refresh_from_db()
+        self.assertEqual(queued_job.state, AssignmentJob.DONE)
+        self.assertFalse(AssignmentJob.is_running(self.term))
+
+    def test_handle_start_automatic_assignment_improve(self):
+        """
+        tests if an improvement of the existing assignments is queued and executed
+        """
+
+        data = {
+            "action": "startAutomaticAssignment",
+            "override": "true",
+            "engine": "local_search"
+        }
+
+        self.client.force_login(self.superUser1)
+        response = self.client.post(reverse('assignments:manage'), data=data)
+        self.assertEqual(response.status_code, 200)
+        job = AssignmentJob.objects.get(term=self.term)
+        self.assertEqual(job.engine, 'local_search')
+
+        call_command('run_assignment_jobs', '--once', stdout=StringIO())
+        job.refresh_from_db()
+        self.assertEqual(job.state, AssignmentJob.DONE)
+        self.assertGreaterEqual(job.result['score'], get_database_score(self.term))
+
+    def test_handle_start_automatic_assignment_engine(self):
+        """
+        tests if the engines are offered on the control flow page and an unknown engine is not queued
+        """
+
+        self.client.force_login(self.superUser1)
+        response = self.client.get(reverse('assignments:manage'))
+        for engine in engines.get_engines():
+            self.assertContains(response, f'value="{engine.name}"')
+
+        data = {
+            "action": "startAutomaticAssignment",
+            "override": "true",
+            "engine": "unknown"
+        }
+        response = self.client.post(reverse('assignments:manage'), data=data)
+        self.assertEqual(response.status_code, 500)
+        self.assertFalse(AssignmentJob.objects.filter(term=self.term).exists())
+
+        response = self.client.post(reverse('assignments:manage'), data=dict(data, engine="parallel", workers="1"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(AssignmentJob.objects.get(term=self.term).engine, 'parallel')
+
+    def test_handle_start_automatic_assignment_stop_policy(self):
+        """
+        tests if the time budget and the patience are saved to the job and the job is executed
+        """
+
+        data = {
+            "action": "startAutomaticAssignment",
+            "override": "true",
+            "timeBudget": "5",
+            "patience": "0"
+        }
+
+        self.client.force_login(self.superUser1)
+        response = self.client.post(reverse('assignments:manage'), data=data)
+        self.assertEqual(response.status_code, 200)
+        job = AssignmentJob.objects.get(term=self.term)
+        self.assertEqual(job.time_budget, 5)
+        self.assertEqual(job.patience, 1)
+
+        call_command('run_assignment_jobs', '--once', stdout=StringIO())
+        job.refresh_from_db()
+        self.assertEqual(job.state, AssignmentJob.DONE)
+
+    def test_replay_assignment_job(self):
+        """
+        tests if a finished job is replayed with its seed and results in the same assignments
+        """
+
+        data = {
+            "action": "startAutomaticAssignment",
+            "override": "true",
+            "seed": "42"
+        }
+
+        automatic_assigment.iterations = 20
+
+        self.client.force_login(self.superUser1)
+        self.client.post(reverse('assignments:manage'), data=data)
+        call_command('run_assignment_jobs', '--once', stdout=StringIO())
+        job = AssignmentJob.objects.get(term=self.term)
+        self.assertEqual(job.state, AssignmentJob.DONE)
+        self.assertEqual(job.seed, 42)
+        self.assertEqual(job.result['run']['seed'], 42)
+
+        out = StringIO()
+        call_command('replay_assignment_job', job.pk, stdout=out)
+        self.assertIn("The replay resulted in the same assignments", out.getvalue())
+
+    def test_warm_start_assignment_job(self):
+        """
+        tests if a search that starts from the assignments in the database is executed and can be replayed
+        """
+
+        data = {
+            "action": "startAutomaticAssignment",
+            "override": "true",
+            "warmStart": "true",
+            "seed": "42"
+        }
+
+        automatic_assigment.iterations = 20
+
+        self.client.force_login(self.superUser1)
+        self.client.post(reverse('assignments:manage'), data=data)
+        call_command('run_assignment_jobs', '--once', stdout=StringIO())
+        job = AssignmentJob.objects.get(term=self.term)
+        self.assertEqual(job.state, AssignmentJob.DONE)
+        self.assertTrue(job.warm_start)
+        self.assertIsNotNone(job.result['run']['start'])
+
+        out = StringIO()
+        call_command('replay_assignment_job', job.pk, stdout=out)
+        self.assertIn("The replay resulted in the same assignments", out.getvalue())
+
+    def test_warm_start_first_iteration(self):
+        """
+        tests if the first iteration of a warm start reproduces the assignments in the database
+        """
+
+        # the collection of topic_selection1 is already satisfied by topic_selection1_3 in a locked slot
+        self.assignment1.accepted_applications.remove(self.topic_selection1)
+        problem = load_problem(self.term, True)
+        database_applications = problem.topic_data.database_applications
+        self.assertNotEqual(database_applications, [])
+        policy = StopPolicy(automatic_assigment.iterations, patience=0)
+        assignments, score, iterations = automatic_assigment.search(
+            problem, -1 << 62, policy, True, None, 42, automatic_assigment.get_warm_start_orders(problem))
+        self.assertEqual(iterations, 1)
+        self.assertEqual(score, get_database_score(self.term))
+        ids = problem.application_data.ids
+        self.assertEqual({(ids[application], slot) for application, slot in enumerate(assignments.accepted_slot)
+                          if slot >= 0}, set(database_applications))
+
+    def test_preview_assignment_job(self):
+        """
+        tests if a preview is not saved, compared with the assignments in the database and applied once
+        """
+
+        data = {
+            "action": "startAutomaticAssignment",
+            "override": "true",
+            "preview": "true"
+        }
+
+        automatic_assigment.iterations = 20
+        database_score = get_database_score(self.term)
+
+        self.client.force_login(self.superUser1)
+        self.client.post(reverse('assignments:manage'), data=data)
+        call_command('run_assignment_jobs', '--once', stdout=StringIO())
+        job = AssignmentJob.objects.get(term=self.term)
+        self.assertEqual(job.state, AssignmentJob.DONE)
+        self.assertTrue(job.preview)
+        self.assertFalse(job.result['saved'])
+        self.assertEqual(get_database_score(self.term), database_score)
+        self.assertEqual(job.result['preview']['database']['score'], database_score)
+        self.assertEqual(job.result['preview']['assignments']['score'], job.result['score'])
+
+        response = self.client.post(reverse('assignments:manage'), data={"action": "getAssignmentProgress"})
+        self.assertEqual(response.json()['preview']['job'], job.pk)
+
+        response = self.client.post(reverse('assignments:manage'), data={"action": "applyPreview", "job": job.pk})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(get_database_score(self.term), job.result['score'])
+        job.refresh_from_db()
+        self.assertIsNotNone(job.applied)
+
+        # a preview is applied only once
+        response = self.client.post(reverse('assignments:manage'), data={"action": "applyPreview", "job": job.pk})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.content, b'The preview was already applied.')
+
+    def test_load_problem(self):
+        """
+        tests if the problem contains all topics of the term, keeps the assignments in place and can be pickled
+        """
+
+        problem = load_problem(self.term, False)
+        topic_data = problem.topic_data
+        self.assertEqual(sorted(topic_data.topic_ids), sorted(Topic.objects.filter(course__term=self.term)
+                                                              .values_list('pk', flat=True)))
+        self.assertEqual(len(topic_data.fixed_applications),
+                         AcceptedApplications.objects.filter(assignment__topic__course__term=self.term).count())
+        self.assertEqual(topic_data.database_applications, [])
+        for application_id in problem.application_data.ids:
+            application = TopicSelection.objects.get(pk=application_id)
+            self.assertFalse(AcceptedApplications.objects.filter(
+                topic_selection__group=application.group,
+                topic_selection__collection_number=application.collection_number).exists())
+
+        self.assertEqual(pickle.loads(pickle.dumps(problem)), problem)
+
+    def test_save_to_database(self):
+        """
+        tests if saving unchanged assignments recreates the same slots with a constant number of queries
+        """
+
+        def get_slots():
+            return sorted((assignment.topic_id, assignment.slot_id, assignment.finalized_slot,
+                           sorted(AcceptedApplications.objects.filter(assignment=assignment)
+                                  .values_list('topic_selection_id', 'finalized_assignment')))
+                          for assignment in Assignment.objects.filter(topic__course__term=self.term))
+
+        slots = get_slots()
+        assignments = Assignments(load_problem(self.term, False))
+        with CaptureQueriesContext(connection) as queries:
+            changes = assignments.save_to_database(self.term)
+        self.assertLessEqual(len(queries), 10)
+        self.assertEqual(get_slots(), slots)
+        self.assertEqual(changes, {'created_slots': [], 'deleted_slots': [], 'added': [], 'removed': [], 'moved': []})
+
+    def test_save_assignments_changes(self):
+        """
+        tests if only the differences are written and returned as change set
+        """
+
+        assignment1_pk = self.assignment1.pk
+        changes = Assignment.save_assignments(
+            Assignment.objects.filter(topic__course__term=self.term),
+            [(self.topic1A.pk, 1, 0, [(self.topic_selection1.pk, False), (self.topic_selection3.pk, False)]),
+             (self.topic1A.pk, 2, 0, [(self.topic_selection2.pk, True)]),
+             (self.topic2A.pk, 1, 2, [(self.topic_selection4.pk, False)])])
+
+        self.assertEqual(changes['created_slots'], [[self.topic1A.pk, 1]])
+        self.assertEqual(changes['deleted_slots'], [[self.topic2B.pk, 1]])
+        self.assertEqual(changes['added'], [[self.topic_selection3.pk, self.topic1A.pk, 1]])
+        self.assertEqual(changes['removed'], [[self.topic_selection1_3.pk, self.topic2B.pk, 1]])
+        self.assertEqual(changes['moved'], [[self.topic_selection1.pk, self.topic1A.pk, 2, self.topic1A.pk, 1]])
+        self.assertEqual(Assignment.get_change_summary(changes),
+                         "1 slots created, 1 slots deleted, 1 applications added, 1 removed and 1 moved.")
+
+        # the unchanged slot is kept
+        self.assertTrue(Assignment.objects.filter(pk=assignment1_pk, topic=self.topic1A, slot_id=2).exists())
+        self.assertFalse(Assignment.objects.filter(topic=self.topic2B).exists())
+        self.assertTrue(AcceptedApplications.objects.get(topic_selection=self.topic_selection2).finalized_assignment)
+        self.assertEqual(AcceptedApplications.objects.get(topic_selection=self.topic_selection1).assignment.slot_id, 1)
 
     def test_handle_remove_broken_slots(self):
         """
@@ -1684,7 +2049,7 @@ class AdminPageTest(TestCase):
         assignment.accepted_applications.add(self.topic_selection2)
 
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:admin_page'), data=data)
+        response = self.client.post(reverse('assignments:manage'), data=data)
         self.assertEqual(response.status_code, 205)
 
         self.assertTrue(Assignment.objects.filter(id=self.assignment1.id).exists())
@@ -1699,7 +2064,7 @@ class AdminPageTest(TestCase):
         assignment.accepted_applications.add(self.topic_selection5)
 
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:admin_page'), data=data)
+        response = self.client.post(reverse('assignments:manage'), data=data)
         self.assertEqual(response.status_code, 205)
 
         self.assertTrue(Assignment.objects.filter(id=self.assignment1.id).exists())
@@ -1727,7 +2092,7 @@ class AdminPageTest(TestCase):
         }
 
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:admin_page'), data=data)
+        response = self.client.post(reverse('assignments:manage'), data=data)
         self.assertEqual(response.status_code, 200)
 
         self.assertEqual(len(mail.outbox), 6)
@@ -1771,7 +2136,7 @@ class AdminPageTest(TestCase):
         }
 
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:admin_page'), data=data)
+        response = self.client.post(reverse('assignments:manage'), data=data)
         self.assertEqual(response.status_code, 500)
         self.assertEqual(response.content, b'Term needs to be finalized')
 
@@ -1784,28 +2149,146 @@ class AdminPageTest(TestCase):
         TermFinalization.objects.create(term=self.term, finalized=True, mails_send=True)
 
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:admin_page'), data=data)
+        response = self.client.post(reverse('assignments:manage'), data=data)
         self.assertEqual(response.status_code, 500)
         self.assertEqual(response.content, b'Emails got already send for this Term')
 
     def test_handle_get_assignment_progress(self):
-        automatic_assigment.running = True
-        automatic_assigment.progress = 69.0
-        automatic_assigment.eta = "test"
+        AssignmentJob.objects.create(term=self.term, state=AssignmentJob.RUNNING, progress=69.0, eta="test",
+                                     best_score=42)
 
         data = {
             "action": "getAssignmentProgress"
         }
 
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:admin_page'), data=data)
+        response = self.client.post(reverse('assignments:manage'), data=data)
 
         self.assertJSONEqual(str(response.content, encoding='utf8'), {
             "running": True,
+            "state": "running",
             "progress": 69.0,
-            "eta": "test"
+            "eta": "test",
+            "bestScore": 42,
+            "error": "",
+            "changes": "",
+            "preview": None
+        })
+
+    def test_handle_get_assignment_progress_preview(self):
+        """
+        tests if the progress of a finished preview that was not applied yet contains the statistics of the preview
+        """
+
+        statistics = get_priority_statistics(self.term)
+        job = AssignmentJob.objects.create(term=self.term, state=AssignmentJob.DONE, progress=100.0, best_score=42,
+                                           preview=True, result={
+                                               'score': 42,
+                                               'changes': None,
+                                               'assignments': [],
+                                               'preview': {
+                                                   'databaseScore': statistics['score'],
+                                                   'database': statistics,
+                                                   'assignments': statistics,
+                                               }})
+
+        data = {
+            "action": "getAssignmentProgress"
+        }
+
+        self.client.force_login(self.superUser1)
+        response = self.client.post(reverse('assignments:manage'), data=data)
+
+        self.assertJSONEqual(str(response.content, encoding='utf8'), {
+            "running": False,
+            "state": "done",
+            "progress": 100.0,
+            "eta": "",
+            "bestScore": 42,
+            "error": "",
+            "changes": "Nothing changed.",
+            "preview": {
+                "job": job.pk,
+                "score": 42,
+                "databaseScore": statistics['score'],
+                "database": statistics,
+                "assignments": statistics
+            }
         })
 
+        # an applied preview is not shown anymore
+        job.apply(None)
+        response = self.client.post(reverse('assignments:manage'), data=data)
+        self.assertIsNone(response.json()['preview'])
+
+    def test_handle_apply_preview(self):
+        """
+        tests if the response of an apply preview request is correct and the assignments of the preview are saved
+        """
+
+        automatic_assigment.iterations = 20
+        self.client.force_login(self.superUser1)
+        self.client.post(reverse('assignments:manage'), data={
+            "action": "startAutomaticAssignment",
+            "override": "true",
+            "preview": "true"
+        })
+        call_command('run_assignment_jobs', '--once', stdout=StringIO())
+        job = AssignmentJob.objects.get(term=self.term)
+        self.assertEqual(job.state, AssignmentJob.DONE)
+        self.assertNotEqual(get_database_score(self.term), job.result['score'])
+
+        data = {
+            "action": "applyPreview",
+            "job": job.pk
+        }
+
+        response = self.client.post(reverse('assignments:manage'), data=data)
+
+        job.refresh_from_db()
+        self.assertIsNotNone(job.applied)
+        self.assertJSONEqual(str(response.content, encoding='utf8'), {
+            "changes": Assignment.get_change_summary(job.result['changes'])
+        })
+        self.assertEqual(get_database_score(self.term), job.result['score'])
+
+    def test_handle_apply_preview_unknown_job(self):
+        """
+        tests if a preview that does not exist or belongs to another term is not applied
+        """
+
+        term = Term.objects.create(name="SoSe23", active_term=False, registration_start=self.deadline,
+                                   registration_deadline=self.deadline)
+        job = AssignmentJob.objects.create(term=term, state=AssignmentJob.DONE, preview=True, result={})
+
+        self.client.force_login(self.superUser1)
+        for job_id in [job.pk, job.pk + 1, "", "x"]:
+            response = self.client.post(reverse('assignments:manage'), data={"action": "applyPreview", "job": job_id})
+            self.assertEqual(response.status_code, 404)
+            self.assertEqual(response.content, b'The preview does not exist in the active term.')
+        job.refresh_from_db()
+        self.assertIsNone(job.applied)
+
+    def test_handle_get_assignment_progress_of_job(self):
+        """
+        tests if the progress of the given job is returned instead of the progress of the latest job
+        """
+
+        job = AssignmentJob.objects.create(term=self.term, state=AssignmentJob.FAILED, error="old")
+        AssignmentJob.objects.create(term=self.term, state=AssignmentJob.QUEUED)
+
+        self.client.force_login(self.superUser1)
+        response = self.client.post(reverse('assignments:manage'), data={"action": "getAssignmentProgress"})
+        self.assertEqual(response.json()['state'], AssignmentJob.QUEUED)
+        response = self.client.post(reverse('assignments:manage'),
+                                    data={"action": "getAssignmentProgress", "job": job.pk})
+        self.assertEqual(response.json()['state'], AssignmentJob.FAILED)
+        self.assertEqual(response.json()['error'], "old")
+
+        response = self.client.post(reverse('assignments:manage'),
+                                    data={"action": "getAssignmentProgress", "job": job.pk + 2})
+        self.assertEqual(response.status_code, 404)
+
     def test_handle_change_term(self):
         term1 = Term.objects.create(name="SoSe22/23", active_term=False, registration_start=self.deadline,
                                     registration_deadline=self.deadline)
@@ -1816,7 +2299,7 @@ class AdminPageTest(TestCase):
         }
 
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:admin_page'), data=data)
+        response = self.client.post(reverse('assignments:manage'), data=data)
 
         self.assertEqual(response.status_code, 205)
 
@@ -1833,7 +2316,7 @@ class AdminPageTest(TestCase):
             "newTerm": "WiSe23"
         }
 
-        response = self.client.post(reverse('backend:admin_page'), data=data)
+        response = self.client.post(reverse('assignments:manage'), data=data)
         self.assertTrue(response.status_code, 205)
 
         self.assertEqual(Term.objects.all().count(), 4)
@@ -1852,7 +2335,7 @@ class AdminPageTest(TestCase):
 
         self.client.force_login(self.superUser1)
 
-        response = self.client.post(reverse('backend:admin_page'), data=data)
+        response = self.client.post(reverse('assignments:manage'), data=data)
         self.assertEqual(response.status_code, 501)
         self.assertEqual(response.content,
                          b"POST request didn't specify an action. Please report this and the actions you"
@@ -1862,7 +2345,7 @@ class AdminPageTest(TestCase):
             "action": "nice"
         }
 
-        response = self.client.post(reverse('backend:admin_page'), data=data)
+        response = self.client.post(reverse('assignments:manage'), data=data)
         self.assertEqual(response.status_code, 501)
         self.assertEqual(response.content,
                          b"invalid request action: nice. Please report this and the actions you took to "
@@ -1983,34 +2466,34 @@ class HomePageTest(TestCase):
 
     def test_admin_page_template(self):
         self.client.force_login(self.superUser1)
-        response = self.client.get(reverse('backend:home_page'))
+        response = self.client.get(reverse('assignments:overview'))
         self.assertEqual(response.status_code, 200)
-        self.assertTemplateUsed(response, 'backend/home.html')
+        self.assertTemplateUsed(response, 'backend/overview.html')
 
     def test_view_url_exists_at_correct_location(self):
         """
         Tests if the URL of the assignment view exists at the correct location.
         """
         self.client.force_login(self.superUser1)
-        response = self.client.get(reverse('backend:home_page'))
+        response = self.client.get(reverse('assignments:overview'))
         self.assertEqual(response.status_code, 200)
 
     def test_redirect_for_anonymous_user(self):
         """
         Tests if an anonymous user is redirected to the admin login page when trying to access the assignment page.
         """
-        response = self.client.get(reverse('backend:home_page'), follow=True)
+        response = self.client.get(reverse('assignments:overview'), follow=True)
         self.assertEqual(response.status_code, 200)
-        self.assertRedirects(response, reverse('admin:login') + '?next=' + reverse('backend:home_page'))
+        self.assertRedirects(response, reverse('admin:login') + '?next=' + reverse('assignments:overview'))
 
     def test_redirect_for_default_user(self):
         """
         Tests if an anonymous user is redirected to the admin login page when trying to access the assignment page.
         """
         self.client.force_login(self.user1)
-        response = self.client.get(reverse('backend:home_page'), follow=True)
+        response = self.client.get(reverse('assignments:overview'), follow=True)
         self.assertEqual(response.status_code, 200)
-        self.assertRedirects(response, reverse('admin:login') + '?next=' + reverse('backend:home_page'))
+        self.assertRedirects(response, reverse('admin:login') + '?next=' + reverse('assignments:overview'))
 
     def test_handle_get_problems_listing(self):
         """
@@ -2021,12 +2504,46 @@ class HomePageTest(TestCase):
         }
 
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:home_page'), data=data)
+        response = self.client.post(reverse('assignments:overview'), data=data)
         self.assertJSONEqual(str(response.content, encoding='utf8'),
                              '{"brokenSlots": [[[1, 1, "Slot 2 of topic \\"topic1A\\" [3/5]", "Less than minimal '
                              'amount of student in this slot"]], []], "unfulfilledCollections": [["group 3", 1, 3], '
                              '["group 4", 1, 4], ["group 5", 1, 5]]}')
 
+    def test_handle_get_score(self):
+        """
+        Tests if the response of a getScore action is correct
+        """
+
+        self.client.force_login(self.superUser1)
+        response = self.client.post(reverse('assignments:overview'), data={"action": "getScore"})
+        self.assertJSONEqual(str(response.content, encoding='utf8'), {
+            'score': -23,
+            'maxScore': 128,
+            'minScore': -150,
+            'assignedApplications': 2,
+            'notAssignedCollections': 3,
+        })
+        self.assertEqual(get_database_score(self.term), -23)
+        self.assertEqual(get_max_score(self.term), 128)
+        with self.assertNumQueries(2):
+            get_score_data(self.term)
+
+    def test_term_statistics(self):
+        """
+        Tests if the chart data of every filter is summed up from the statistics that are read once per request
+        """
+
+        request_cache.start()
+        self.addCleanup(request_cache.stop)
+        statistics = TermStatistics.get(self.term)
+        with self.assertNumQueries(0):
+            self.assertIs(TermStatistics.get(self.term.id), statistics)
+            self.assertEqual(statistics.get_chart_data(0, 6, {self.seminar_type.id}, {"FB20"}),
+                             ([1, 1, 0, 0, 0, 0, 1], [2, 1, 0, 0, 0, 0, 1], "80.38 %", 1))
+            self.assertEqual(statistics.get_chart_data(0, 6, set(), set()),
+                             ([0] * 7, [0] * 7, "No Topics with current Filter", 0))
+
     def test_handle_get_chart_data(self):
         """
         Tests if the response of a getProblemsListing action is correct
@@ -2045,7 +2562,7 @@ class HomePageTest(TestCase):
         }
 
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:home_page'), data=data)
+        response = self.client.post(reverse('assignments:overview'), data=data)
         self.assertJSONEqual(str(response.content, encoding='utf8'),
                              {"groups": [1, 1, 0, 0, 0, 0, 1], "students": [2, 1, 0, 0, 0, 0, 1], "score": "80.38 %"})
 
@@ -2061,7 +2578,7 @@ class HomePageTest(TestCase):
             ]
         }
 
-        response = self.client.post(reverse('backend:home_page'), data=data)
+        response = self.client.post(reverse('assignments:overview'), data=data)
         self.assertJSONEqual(str(response.content, encoding='utf8'), {
             'groups': [
                 1,
@@ -2098,7 +2615,7 @@ class HomePageTest(TestCase):
             ]
         }
 
-        response = self.client.post(reverse('backend:home_page'), data=data)
+        response = self.client.post(reverse('assignments:overview'), data=data)
         self.assertJSONEqual(str(response.content, encoding='utf8'), {
             'groups': [
                 1,
@@ -2133,11 +2650,12 @@ class HomePageTest(TestCase):
         }
 
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:home_page'), data=data)
+        response = self.client.post(reverse('assignments:overview'), data=data)
 
         self.assertJSONEqual(str(response.content, encoding='utf8'), {
-            "status": "done"
+            "status": "queued"
         })
+        self.assertTrue(AssignmentJob.objects.get(term=self.term).override)
 
     def test_handle_clear_slot(self):
         """
@@ -2153,7 +2671,7 @@ class HomePageTest(TestCase):
         }
 
         self.client.force_login(self.superUser1)
-        response = self.client.post(reverse('backend:home_page'), data=data)
+        response = self.client.post(reverse('assignments:overview'), data=data)
         self.assertEqual(response.status_code, 200)
 
         self.assertFalse(Assignment.objects.filter(id=assignment.id).exists())
@@ -2169,7 +2687,7 @@ class HomePageTest(TestCase):
 
         self.client.force_login(self.superUser1)
 
-        response = self.client.post(reverse('backend:home_page'), data=data)
+        response = self.client.post(reverse('assignments:overview'), data=data)
         self.assertEqual(response.status_code, 501)
         self.assertEqual(response.content,
                          b"POST request didn't specify an action. Please report this and the actions you"
@@ -2179,7 +2697,7 @@ class HomePageTest(TestCase):
             "action": "nice"
         }
 
-        response = self.client.post(reverse('backend:home_page'), data=data)
+        response = self.client.post(reverse('assignments:overview'), data=data)
         self.assertEqual(response.status_code, 501)
         self.assertEqual(response.content,
                          b"invalid request action: nice. Please report this and the actions you took to "
@@ -2189,3 +2707,359 @@ class HomePageTest(TestCase):
         self.assertEqual(response.status_code, 500)
 
         self.assertTrue(response.content.startswith(b"request  caused an exception: \n "))
+
+
+class TermStatusCacheTest(TransactionTestCase):
+    """
+    The shared cache is only used outside of transactions, so these tests do not run in one.
+    """
+
+    def setUp(self):
+        cache.delete(TERM_STATUS_CACHE_KEY)
+        self.addCleanup(cache.delete, TERM_STATUS_CACHE_KEY)
+        self.term = Term.objects.create(name="WiSe22/23", active_term=True, registration_start=timezone.now(),
+                                        registration_deadline=timezone.now())
+
+    def test_term_status_cache(self):
+        """
+        tests if the state is cached with the term it belongs to and removed when the term is finalized
+        """
+
+        self.assertFalse(TermStatus.get().finalized)
+        self.assertEqual(cache.get(TERM_STATUS_CACHE_KEY), (self.term.pk, False, False))
+
+        TermFinalization.objects.create(term=self.term, finalized=True, mails_send=True)
+        status = TermStatus.get()
+        self.assertTrue(status.finalized)
+        self.assertTrue(status.mails_send)
+
+        # the state of another term is not used
+        cache.set(TERM_STATUS_CACHE_KEY, (self.term.pk + 1, False, False))
+        self.assertTrue(TermStatus.get().finalized)
+
+
+class StopPolicyTest(TestCase):
+
+    def test_max_iterations(self):
+        policy = StopPolicy(10)
+        self.assertFalse(policy.should_stop(9, 0))
+        self.assertTrue(policy.should_stop(10, 0))
+        self.assertEqual(policy.reason, "All iterations done")
+
+    def test_time_budget(self):
+        policy = StopPolicy(10, time_budget=60)
+        self.assertFalse(policy.should_stop(1, 0))
+        policy.start_time -= 60
+        self.assertTrue(policy.should_stop(1, 0))
+        self.assertEqual(policy.get_progress(1), 1.0)
+        self.assertEqual(policy.get_remaining_time(1, 1.0), 0)
+
+    def test_patience(self):
+        policy = StopPolicy(100, patience=2)
+        policy.update(1, 10)
+        policy.update(2, 20)
+        policy.update(3, 15)
+        self.assertFalse(policy.should_stop(3, 20))
+        policy.update(4, 20)
+        self.assertTrue(policy.should_stop(4, 20))
+
+        # the first iteration is always done
+        policy = StopPolicy(100, patience=0)
+        policy.start()
+        self.assertFalse(policy.should_stop(0, None))
+        policy.update(1, 10)
+        self.assertTrue(policy.should_stop(1, 10))
+
+    def test_time_to_best(self):
+        policy = StopPolicy(100)
+        policy.update(1, 10)
+        policy.start_time -= 5
+        policy.update(2, 10)
+        self.assertLess(policy.time_to_best, 5)
+        policy.update(3, 20)
+        self.assertGreaterEqual(policy.time_to_best, 5)
+
+    def test_upper_bound(self):
+        policy = StopPolicy(100, upper_bound=50)
+        self.assertFalse(policy.should_stop(1, 49))
+        self.assertTrue(policy.should_stop(1, 50))
+        self.assertEqual(policy.reason, "Perfect Scoring")
+
+
+class StrategyTest(TestCase):
+
+    def test_saved_order(self):
+        strategy = Strategy(0)
+        strategy.mutation_rate = 0
+        self.assertEqual(strategy.get_next_application(0, [4, 2]), 4)
+        self.assertEqual(strategy.get_next_application(0, [2]), 2)
+        strategy.next_iteration(True, 0)
+
+        # the application that comes first in the saved order is taken
+        self.assertEqual(strategy.get_next_application(0, [1, 2, 3]), 2)
+        self.assertEqual(strategy.get_next_application(0, [1, 3, 4]), 4)
+        # the saved order is not used anymore once none of its applications is given
+        self.assertIn(strategy.get_next_application(0, [1, 3]), [1, 3])
+        self.assertEqual(strategy.exhausted_topics, {0})
+        self.assertEqual(strategy.get_next_application(0, [2, 5]), [2, 5][(1 + strategy.seed) % 2])
+
+    def test_saved_order_cursor(self):
+        strategy = Strategy(0)
+        strategy.mutation_rate = 0
+        strategy.save_orders({0: [4, 2, 6]})
+        strategy.iteration = 1
+
+        # an application that is not given is not skipped for the next picks
+        self.assertEqual(strategy.get_next_application(0, [2, 6]), 2)
+        self.assertEqual(strategy.topic_cycle_cursors, {0: 0})
+        self.assertEqual(strategy.get_next_application(0, [4, 6]), 4)
+        # the picked applications are skipped once
+        self.assertEqual(strategy.get_next_application(0, [1, 6]), 6)
+        self.assertEqual(strategy.topic_cycle_cursors, {0: 2})
+        strategy.next_iteration(False, 0)
+        self.assertEqual(strategy.topic_cycle_cursors, {})
+        self.assertEqual(strategy.picked_applications, set())
+
+    def test_warm_start(self):
+        strategy = Strategy(0)
+        strategy.warm_start({0: [3, 1]})
+        # the first iteration takes the assignments in the database and the orders are saved as its orders
+        self.assertTrue(strategy.load_database)
+        strategy.next_iteration(False, 0)
+        self.assertFalse(strategy.load_database)
+        self.assertEqual(strategy.topic_cycle_order, {0: [3, 1]})
+
+    def test_only_current_topic_cycle(self):
+        strategy = Strategy(0)
+        for _ in range(strategy.topic_list_mutation_cycle - 1):
+            strategy.get_next_application(0, [1])
+            strategy.next_iteration(True, 0)
+        self.assertEqual(strategy.topic_cycle_order, {0: [1]})
+        strategy.get_next_application(0, [1])
+        strategy.next_iteration(True, 0)
+        self.assertEqual(strategy.topic_cycle, 1)
+        self.assertEqual(strategy.topic_cycle_order, {})
+        self.assertEqual(strategy.topic_cycle_cursors, {})
+
+
+class ExactSolverTest(TestCase):
+
+    @staticmethod
+    def create_problem(rnd, groups, max_topics=4, collections=5):
+        """returns a small random problem with 2 to max_topics topics and the given number of collections, with groups
+        of up to 3 students and minimum slot sizes above 1 if groups is True"""
+        problem = Problem()
+        topic_data = problem.topic_data
+        for topic in range(rnd.randint(2, max_topics)):
+            max_slot_size = rnd.randint(1, 4)
+            topic_data.topic_ids.append(topic + 1)
+            topic_data.slots.append(rnd.randint(1, 2))
+            topic_data.min_slot_size.append(rnd.randint(1, max_slot_size) if groups else 1)
+            topic_data.max_slot_size.append(max_slot_size)
+            topic_data.slot_offset.append(len(topic_data.slot_topic))
+            for slot_number in range(1, topic_data.slots[topic] + 1):
+                topic_data.slot_topic.append(topic)
+                topic_data.slot_number.append(slot_number)
+                topic_data.slot_sizes.append(0)
+                topic_data.slot_locked.append(int(rnd.random() < 0.1))
+                topic_data.slot_scores.append(0)
+        topic_data.topic_index = {topic_id: topic for topic, topic_id in enumerate(topic_data.topic_ids)}
+
+        data = problem.application_data
+        data.applications_for_topic = [[] for _ in topic_data.topic_ids]
+        for collection in range(collections):
+            size = rnd.randint(1, 3) if groups else 1
+            data.collection_keys.append((collection, 1))
+            data.applications_for_collection.append([])
+            topics = rnd.sample(range(len(topic_data.topic_ids)), rnd.randint(1, 2))
+            for priority, topic in enumerate(topics, 1):
+                application = len(data.ids)
+                data.ids.append(application + 1)
+                data.sizes.append(size)
+                data.priorities.append(priority)
+                data.scores.append(get_score_for_assigned(size, priority))
+                data.topics.append(topic)
+                data.collections.append(collection)
+                data.applications_for_topic[topic].append(application)
+                data.applications_for_collection[collection].append(application)
+        data.index_topics()
+        return problem
+
+    @staticmethod
+    def get_brute_force_score(problem):
+        """returns the best score of all assignments of the problem by trying every choice of every collection"""
+        data = problem.application_data
+        topic_data = problem.topic_data
+        options = []
+        for applications in data.applications_for_collection:
+            options.append([None] + [(application, slot) for application in applications
+                                     for slot in range(topic_data.slot_offset[data.topics[application]],
+                                                       topic_data.slot_offset[data.topics[application]]
+                                                       + topic_data.slots[data.topics[application]])])
+        best_score = None
+        for choices in itertools.product(*options):
+            applications = Applications(problem)
+            assignments = Assignments(problem)
+            used_slots = set()
+            for choice in choices:
+                if choice is not None:
+                    application, slot = choice
+                    if assignments.get_remaining_space_in_slot(slot) < data.sizes[application]:
+                        break
+                    applications.accept(application)
+                    assignments.add_application(application, slot)
+                    used_slots.add(slot)
+            else:
+                if all(assignments.slot_sizes[slot] >= topic_data.min_slot_size[topic_data.slot_topic[slot]]
+                       for slot in used_slots):
+                    score = assignments.score(applications)
+                    best_score = score if best_score is None else max(best_score, score)
+        return best_score
+
+    def assert_valid(self, problem, assignments):
+        topic_data = problem.topic_data
+        for slot, size in enumerate(assignments.slot_sizes):
+            topic = topic_data.slot_topic[slot]
+            self.assertLessEqual(size, topic_data.max_slot_size[topic])
+            if size > 0:
+                self.assertFalse(topic_data.slot_locked[slot])
+                self.assertGreaterEqual(size, topic_data.min_slot_size[topic])
+
+    def test_optimal(self):
+        """
+        tests if the min-cost flow and the branch and bound find the best assignment of small random problems and if
+        get_upper_bound is an upper bound for it
+        """
+        rnd = random.Random(0)
+        for groups in [False, True]:
+            for _ in range(30):
+                problem = self.create_problem(rnd, groups)
+                best_score = self.get_brute_force_score(problem)
+                assignments, applications, stats = exact.solve(problem)
+                self.assertTrue(stats['optimal'])
+                self.assertEqual(assignments.score(applications), best_score)
+                self.assert_valid(problem, assignments)
+                self.assertGreaterEqual(exact.get_upper_bound(problem), best_score)
+
+                search = exact.BranchAndBound(problem)
+                self.assertTrue(search.run())
+                self.assertEqual(search.best_score, best_score)
+
+                # nothing better than the optimum is found
+                search = exact.BranchAndBound(problem, best_score)
+                self.assertTrue(search.run())
+                self.assertEqual(search.get_best(), (None, None))
+
+    def test_stop(self):
+        """
+        tests if the branch and bound stops when it is told to and keeps the best assignment found so far
+        """
+        problem = self.create_problem(random.Random(1), True)
+        search = exact.BranchAndBound(problem)
+        # stops as soon as the first assignment is found
+        self.assertFalse(search.run(lambda nodes, best_score: best_score > -math.inf))
+        self.assertLess(search.nodes, 20)
+        assignments, applications = search.get_best()
+        self.assertEqual(assignments.score(applications), search.best_score)
+
+
+class ParallelSearchTest(TestCase):
+
+    def test_search(self):
+        """
+        tests if a parallel search with a fixed seed always finds the same assignments and if it is at least as good as
+        the search of its first worker alone
+        """
+        problem = ExactSolverTest.create_problem(random.Random(2), True, max_topics=10, collections=40)
+        seeds = [3, 4]
+
+        def run_parallel():
+            return parallel.search(problem, automatic_assigment.do_iteration, seeds, [StopPolicy(20), StopPolicy(20)],
+                                   -1 << 62, lambda done_iterations, best_score: None, 0.1)
+
+        assignments, score, worker_iterations, _ = run_parallel()
+        self.assertEqual(worker_iterations, [20, 20])
+        repeated_assignments, repeated_score, _, _ = run_parallel()
+        self.assertEqual(repeated_score, score)
+        self.assertEqual(repeated_assignments.accepted_slot, assignments.accepted_slot)
+
+        _, single_score, _ = automatic_assigment.search(problem, -1 << 62, StopPolicy(20), True, None, seeds[0])
+        self.assertGreaterEqual(score, single_score)
+
+
+class AssignmentsTest(TestCase):
+
+    def test_score(self):
+        """
+        tests if the score that is kept up to date on every change is the score calculated from all accepted
+        applications after random sequences of adding and removing applications
+        """
+        rnd = random.Random(5)
+        problem = ExactSolverTest.create_problem(rnd, True, max_topics=8, collections=30)
+        data = problem.application_data
+        topic_data = problem.topic_data
+        topic_data.slot_sizes[0] = 1
+        topic_data.slot_scores[0] = topic_data.fixed_score = 20
+        applications = Applications(problem)
+        assignments = Assignments(problem)
+        for _ in range(500):
+            accepted = [application for application, slot in enumerate(assignments.accepted_slot) if slot >= 0]
+            if accepted and rnd.random() < 0.4:
+                application = rnd.choice(accepted)
+                applications.release(application)
+                assignments.remove_application(application)
+            else:
+                application = rnd.randrange(len(data.ids))
+                if not applications.open_collections[data.collections[application]]:
+                    continue
+                topic = data.topics[application]
+                applications.accept(application)
+                assignments.add_application(application, topic_data.slot_offset[topic]
+                                            + rnd.randrange(topic_data.slots[topic]))
+
+            slot_sizes = list(topic_data.slot_sizes)
+            slot_scores = list(topic_data.slot_scores)
+            assigned_collections = set()
+            for application, slot in enumerate(assignments.accepted_slot):
+                if slot >= 0:
+                    slot_sizes[slot] += data.sizes[application]
+                    slot_scores[slot] += data.scores[application]
+                    assigned_collections.add(data.collections[application])
+            self.assertEqual(list(assignments.slot_sizes), slot_sizes)
+            self.assertEqual(list(assignments.slot_scores), slot_scores)
+            self.assertEqual(assignments.score(applications),
+                             topic_data.fixed_score + sum(data.scores[application] for application, slot
+                                                          in enumerate(assignments.accepted_slot) if slot >= 0)
+                             + (len(data.collection_keys) - len(assigned_collections)) * get_score_for_not_assigned())
+
+
+class ApplicationsTest(TestCase):
+
+    def test_applications_for_topic(self):
+        """
+        tests if the open applications of every topic taken from the sets of applications are the applications of the
+        topic whose collection is open, after random sequences of accepting and releasing applications
+        """
+        rnd = random.Random(6)
+        problem = ExactSolverTest.create_problem(rnd, True, max_topics=8, collections=30)
+        data = problem.application_data
+        applications = Applications(problem)
+        accepted = []
+        for _ in range(300):
+            if accepted and rnd.random() < 0.4:
+                applications.release(accepted.pop(rnd.randrange(len(accepted))))
+            else:
+                application = rnd.randrange(len(data.ids))
+                if applications.open_collections[data.collections[application]]:
+                    applications.accept(application)
+                    accepted.append(application)
+
+            for topic, topic_applications in enumerate(data.applications_for_topic):
+                open_applications = [application for application in topic_applications
+                                     if applications.open_collections[data.collections[application]]]
+                self.assertEqual(applications.get_applications_for_topic(topic), open_applications)
+                for max_size in range(5):
+                    self.assertEqual(applications.get_applications_for_topic_with_max_size(topic, max_size),
+                                     [application for application in open_applications
+                                      if data.sizes[application] <= max_size])
+            self.assertEqual(applications.open_collection_count, sum(applications.open_collections))
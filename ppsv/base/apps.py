@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class CourseConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'base'
+
+    def ready(self):
+        # registers the receivers
+        from base import signals  # noqa: F401
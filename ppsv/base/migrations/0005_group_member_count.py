@@ -0,0 +1,26 @@
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def forwards_func(apps, schema_editor):
+    Group = apps.get_model("base", "Group")
+    groups = list(Group.objects.annotate(group_size=Count('students', distinct=True)))
+    for group in groups:
+        group.member_count = group.group_size
+    Group.objects.bulk_update(groups, ['member_count'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0004_normalize_priority'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='group',
+            name='member_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='number of students'),
+        ),
+        migrations.RunPython(forwards_func, migrations.RunPython.noop),
+    ]
@@ -7,13 +7,17 @@ of the platform and can be registered in admin.py.
 
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import connection, models
+from django.db.models import Count
 from django.db.models.functions import Now
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from base import request_cache
+
 
 class CourseType(models.Model):
     """CourseType
@@ -47,6 +51,11 @@ class CourseType(models.Model):
         return self.type
 
 
+# the key of the primary key of the active term in the cache framework. Term.get_active_term reads it once per request
+# through the request cache and the entry is deleted by base.signals whenever a term is saved or deleted
+ACTIVE_TERM_CACHE_KEY = 'base:active_term'
+
+
 class Term(models.Model):
     """A Term
     only on can be active"""
@@ -86,13 +95,32 @@ class Term(models.Model):
 
     @staticmethod
     def has_active_term():
-        return Term.objects.filter(active_term=True).exists()
+        return Term.get_active_term() is not None
 
     @staticmethod
     def get_active_term():
-        if not Term.has_active_term():
+        """returns the active term or None if there is none. It is read once per request and kept in the cache, which
+        is cleared by base.signals whenever a term is saved or deleted"""
+        return request_cache.get('active_term', Term._get_cached_active_term)
+
+    @staticmethod
+    def _get_cached_active_term():
+        # inside a transaction the term is read from the database, the cache may not match what the transaction sees
+        # and a term read in it may not be committed yet
+        use_cache = not connection.in_atomic_block
+        pk = cache.get(ACTIVE_TERM_CACHE_KEY) if use_cache else None
+        if pk is not None:
+            # an entry that is stale, e.g. after a restore of the database, is never returned
+            term = Term.objects.filter(pk=pk, active_term=True).first()
+            if term is not None:
+                return term
+        try:
+            term = Term.objects.get(active_term=True)
+        except Term.DoesNotExist:
             return None
-        return Term.objects.get(active_term=True)
+        if use_cache:
+            cache.set(ACTIVE_TERM_CACHE_KEY, term.pk)
+        return term
 
     @staticmethod
     def get_active_term_registration_start():
@@ -365,6 +393,15 @@ class Student(models.Model):
         return f"{self.firstname} {self.lastname} ({self.tucan_id})"
 
 
+class GroupQuerySet(models.QuerySet):
+    """QuerySet of groups"""
+
+    def with_size(self):
+        """annotates the number of students of every group as group_size in the same query, this counts the students
+        instead of using the denormalized member_count"""
+        return self.annotate(group_size=Count('students', distinct=True))
+
+
 class Group(models.Model):
     """Group
 
@@ -375,14 +412,19 @@ class Group(models.Model):
     :type Group.students: ManyToManyField - Student
     :attr Group.applications: The applications of a group
     :type Group.applications: ManyToManyField - Topic
+    :attr Group.member_count: The number of students in the group, kept up to date by base.signals
+    :type Group.member_count: PositiveIntegerField
     :property Group.size: The size of a group
     :type Group.size: int
 
     """
     students = models.ManyToManyField(Student, verbose_name=_("students"))
+    member_count = models.PositiveIntegerField(verbose_name=_("number of students"), default=0, editable=False)
     collection_count = models.IntegerField(verbose_name=_("number of collections"), default=1)
     term = models.ForeignKey(Term, verbose_name=_("term"), default=Term.get_active_term, on_delete=models.CASCADE)
 
+    objects = GroupQuerySet.as_manager()
+
     @property
     def members(self):
         """members of this group
@@ -393,14 +435,24 @@ class Group(models.Model):
 
     @property
     def size(self):
-        """size of the group
+        """size of the group, read from member_count so no query is needed
         :return: the number of students in the group
         :rtype: int
         """
-        if not hasattr(self, 'students'):
-            return 0
-        studs = self.students
-        return studs.count()
+        return self.member_count
+
+    def update_member_count(self):
+        """counts the students of the group again and saves the result as member_count"""
+        self.member_count = self.students.count()
+        Group.objects.filter(pk=self.pk).update(member_count=self.member_count)
+
+    def save(self, *args, **kwargs):
+        """saves the group. member_count is only written when the group is created or when it is named in
+        update_fields, otherwise a group that was loaded before its students changed would write back an old count"""
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [field.name for field in self._meta.concrete_fields
+                                       if not field.primary_key and field.name != 'member_count']
+        super().save(*args, **kwargs)
 
     size.fget.short_description = _("group Size")
 
@@ -464,6 +516,14 @@ class Group(models.Model):
         verbose_name_plural = _("groups")
 
 
+class TopicSelectionQuerySet(models.QuerySet):
+    """QuerySet of topic selections"""
+
+    def with_group_size(self):
+        """annotates the number of students of the group of every topic selection as group_size in the same query"""
+        return self.annotate(group_size=Count('group__students', distinct=True))
+
+
 class TopicSelection(models.Model):
     """Topic Selection
 
@@ -489,9 +549,11 @@ class TopicSelection(models.Model):
                                    validators=[MaxValueValidator(99), MinValueValidator(1)])
     collection_number = models.IntegerField(verbose_name=_("collection number"), default=1)
 
+    objects = TopicSelectionQuerySet.as_manager()
+
     @property
     def dict_key(self):
-        return self.group, self.collection_number
+        return self.group_id, self.collection_number
 
     @property
     def get_display(self):
@@ -517,15 +579,17 @@ class TopicSelection(models.Model):
     @classmethod
     def get_collection_dict(cls):
         """
-        :return: a dict with keys (group, collection_number) and values "list of all applications
-        :rtype: QuerySet
+        :return: a dict with keys (group id, collection_number) and values "list of all applications of the active term,
+        read with one query and cached for the request
+        :rtype: dict
          """
+        return request_cache.get('collections', cls._read_collection_dict)
+
+    @classmethod
+    def _read_collection_dict(cls):
         collection_dict = {}
-        for group in Group.objects.all():
-            for application in cls.objects.filter(group=group, topic__course__term=Term.get_active_term()):
-                if (group, application.collection_number) not in collection_dict:
-                    collection_dict[(group, application.collection_number)] = []
-                collection_dict[(group, application.collection_number)].append(application)
+        for application in cls.objects.filter(topic__course__term=Term.get_active_term()):
+            collection_dict.setdefault(application.dict_key, []).append(application)
         return collection_dict
 
     get_display.fget.short_description = _("group")
@@ -0,0 +1,40 @@
+import threading
+
+# the values cached for the request that is handled by this thread, None while no request is handled
+_state = threading.local()
+
+
+def start():
+    """caches values for this thread until stop is called, see base.signals"""
+    _state.values = {}
+
+
+def stop():
+    _state.values = None
+
+
+def is_active():
+    """returns if values are cached at the moment"""
+    return getattr(_state, 'values', None) is not None
+
+
+def get(key, compute):
+    """returns the value cached for key, it is computed with compute and cached if it is missing. Values are only cached
+    while a request is handled, otherwise compute is called every time because nothing would invalidate them. The
+    returned values must not be changed.
+
+    :param key: the key of the value
+    :param compute: computes the value without arguments
+    """
+    values = getattr(_state, 'values', None)
+    if values is None:
+        return compute()
+    if key not in values:
+        values[key] = compute()
+    return values[key]
+
+
+def clear():
+    """drops all values cached by this thread, called whenever data changes that they may be computed from"""
+    if is_active():
+        _state.values = {}
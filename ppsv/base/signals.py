@@ -0,0 +1,75 @@
+from django.core.cache import cache
+from django.core.signals import request_finished, request_started
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from base import request_cache
+from base.models import ACTIVE_TERM_CACHE_KEY, Group, Student, Term, TopicSelection
+
+
+@receiver(m2m_changed, sender=Group.students.through)
+def update_member_count(sender, instance, action, reverse, pk_set, **kwargs):
+    """keeps Group.member_count up to date whenever students are added to or removed from a group, from either side of
+    the relation"""
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            instance.update_member_count()
+        return
+    # the groups of a student changed, the groups are not known after a clear so they are remembered before
+    if action == 'pre_clear':
+        instance._cleared_groups = list(instance.group_set.values_list('pk', flat=True))
+        return
+    if action == 'post_clear':
+        pk_set = instance.__dict__.pop('_cleared_groups', [])
+    elif action not in ('post_add', 'post_remove'):
+        return
+    for pk, group_size in Group.objects.filter(pk__in=pk_set).with_size().values_list('pk', 'group_size'):
+        Group.objects.filter(pk=pk).update(member_count=group_size)
+
+
+@receiver(pre_delete, sender=Student)
+def remember_groups_of_student(sender, instance, **kwargs):
+    """deleting a student, also by deleting its user, removes it from its groups without sending m2m_changed, so the
+    groups are remembered to be counted again after the deletion"""
+    instance._deleted_groups = list(instance.group_set.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Student)
+def update_member_count_of_deleted_student(sender, instance, **kwargs):
+    """counts the members of the groups of a deleted student again, see remember_groups_of_student"""
+    pk_set = instance.__dict__.pop('_deleted_groups', [])
+    for pk, group_size in Group.objects.filter(pk__in=pk_set).with_size().values_list('pk', 'group_size'):
+        Group.objects.filter(pk=pk).update(member_count=group_size)
+
+
+@receiver(request_started)
+def start_request_cache(sender, **kwargs):
+    """values are cached for one request, so changes of other processes like the automatic assignment are seen by the
+    next request"""
+    request_cache.start()
+
+
+@receiver(request_finished)
+def stop_request_cache(sender, **kwargs):
+    request_cache.stop()
+
+
+@receiver(post_save, sender=Term)
+@receiver(post_delete, sender=Term)
+@receiver(post_save, sender=TopicSelection)
+@receiver(post_delete, sender=TopicSelection)
+@receiver(m2m_changed, sender=Group.students.through)
+@receiver(post_delete, sender=Student)
+def clear_request_cache(sender, **kwargs):
+    """the cached values depend on the active term, the applications and the sizes of the groups"""
+    request_cache.clear()
+
+
+@receiver(post_save, sender=Term)
+@receiver(post_delete, sender=Term)
+def clear_active_term(sender, **kwargs):
+    """the active term is removed from the cache at once and again after the change is committed, because other
+    processes can read and cache the old term until then"""
+    cache.delete(ACTIVE_TERM_CACHE_KEY)
+    transaction.on_commit(lambda: cache.delete(ACTIVE_TERM_CACHE_KEY))
@@ -1,10 +1,12 @@
 import datetime
 
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase
 from django.utils import timezone
-from .models import Course, Student, Group, TopicSelection, Topic, CourseType, Term
+from . import request_cache
+from .models import ACTIVE_TERM_CACHE_KEY, Course, Student, Group, TopicSelection, Topic, CourseType, Term
 
 
 class test_ModelTests(TestCase):
@@ -77,6 +79,73 @@ class test_ModelTests(TestCase):
         self.assertEqual(self.group1.size, 3)
         self.assertEqual(self.group2.size, 1)
 
+    def test_group_size_annotation(self):
+        """
+        Tests if the group sizes are annotated in one query.
+        """
+        with self.assertNumQueries(1):
+            sizes = dict(Group.objects.with_size().values_list('pk', 'group_size'))
+        self.assertEqual(sizes, {self.group1.pk: 3, self.group2.pk: 1})
+        with self.assertNumQueries(1):
+            selection = TopicSelection.objects.with_group_size().get(pk=self.selection.pk)
+        self.assertEqual(selection.group_size, 1)
+
+    def test_group_member_count(self):
+        """
+        Tests if the member_count is kept up to date when students are added or removed on both sides.
+        """
+        self.group2.students.add(self.student2, self.student3)
+        self.assertEqual(Group.objects.get(pk=self.group2.pk).member_count, 3)
+        self.group2.students.remove(self.student3)
+        self.assertEqual(Group.objects.get(pk=self.group2.pk).member_count, 2)
+        self.student1.group_set.remove(self.group1)
+        self.assertEqual(Group.objects.get(pk=self.group1.pk).size, 2)
+        self.student1.group_set.clear()
+        self.assertEqual(Group.objects.get(pk=self.group2.pk).size, 1)
+        self.group2.students.clear()
+        self.assertEqual(self.group2.size, 0)
+        for group in Group.objects.with_size():
+            self.assertEqual(group.member_count, group.group_size)
+
+    def test_group_member_count_delete_student(self):
+        """
+        Tests if the member_count is kept up to date when a member is deleted, directly or with its user.
+        """
+        self.student2.delete()
+        self.assertEqual(Group.objects.get(pk=self.group1.pk).member_count, 2)
+        self.user1.delete()
+        self.assertEqual(Group.objects.get(pk=self.group1.pk).member_count, 1)
+        self.assertEqual(Group.objects.get(pk=self.group2.pk).member_count, 0)
+        for group in Group.objects.with_size():
+            self.assertEqual(group.member_count, group.group_size)
+
+    def test_group_member_count_stale_save(self):
+        """
+        Tests if saving a group that was loaded before its students changed keeps the member_count up to date.
+        """
+        group = Group.objects.get(pk=self.group2.pk)
+        self.group2.students.add(self.student2)
+        group.collection_count = 2
+        group.save()
+        group = Group.objects.get(pk=self.group2.pk)
+        self.assertEqual(group.collection_count, 2)
+        self.assertEqual(group.member_count, 2)
+
+    def test_active_term_request_cache(self):
+        """
+        The active term has to be read once per request and read again after a term was saved
+        """
+        request_cache.start()
+        self.addCleanup(request_cache.stop)
+        with self.assertNumQueries(1):
+            self.assertEqual(Term.get_active_term(), self.term)
+            self.assertEqual(Term.get_active_term(), self.term)
+            self.assertTrue(Term.has_active_term())
+
+        self.term.active_term = False
+        self.term.save()
+        self.assertIsNone(Term.get_active_term())
+
     def test_group_string_rep(self):
         """
         Tests the string representation of a group.
@@ -94,3 +163,54 @@ class test_ModelTests(TestCase):
         Tests the get_display method/property of a topic selection.
         """
         self.assertEqual(self.selection.get_display, 'ab12eeee')
+
+
+class ActiveTermCacheTests(TransactionTestCase):
+    """
+    The shared cache is only used outside of transactions, so these tests do not run in one.
+    """
+
+    def setUp(self):
+        cache.delete(ACTIVE_TERM_CACHE_KEY)
+        self.addCleanup(cache.delete, ACTIVE_TERM_CACHE_KEY)
+        self.term = Term.objects.create(name="WiSe22/23", active_term=True, registration_start=timezone.now(),
+                                        registration_deadline=timezone.now())
+
+    def test_cache_hit(self):
+        """
+        The primary key of the active term is cached and the term is read by it in the next request
+        """
+        self.assertEqual(Term.get_active_term(), self.term)
+        self.assertEqual(cache.get(ACTIVE_TERM_CACHE_KEY), self.term.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(Term.get_active_term(), self.term)
+
+    def test_stale_entry(self):
+        """
+        An entry of a term that is not active anymore is not returned, even if no signal removed it
+        """
+        Term.get_active_term()
+        Term.objects.filter(pk=self.term.pk).update(active_term=False)
+        self.assertIsNone(Term.get_active_term())
+
+    def test_invalidation_on_save(self):
+        """
+        Saving a term removes the entry, so the new active term is read
+        """
+        Term.get_active_term()
+        self.term.active_term = False
+        self.term.save()
+        self.assertIsNone(cache.get(ACTIVE_TERM_CACHE_KEY))
+        term = Term.objects.create(name="SoSe23", active_term=True, registration_start=timezone.now(),
+                                   registration_deadline=timezone.now())
+        self.assertEqual(Term.get_active_term(), term)
+        self.assertEqual(cache.get(ACTIVE_TERM_CACHE_KEY), term.pk)
+
+    def test_invalidation_on_delete(self):
+        """
+        Deleting a term removes the entry
+        """
+        Term.get_active_term()
+        self.term.delete()
+        self.assertIsNone(cache.get(ACTIVE_TERM_CACHE_KEY))
+        self.assertIsNone(Term.get_active_term())
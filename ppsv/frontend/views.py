@@ -18,8 +18,8 @@ from .forms.forms import NewUserForm, NewStudentForm, UserLoginForm
 def check_domain(func):
     def wrapper(request, *args, **kwargs):
         if apps.is_installed("django.contrib.admin"):
-            from backend.models import TermFinalization
-            if TermFinalization.is_finalized(Term.get_active_term()):
+            from backend.models import TermStatus
+            if TermStatus.get().finalized:
                 return redirect("backend:term_finalized")
         return func(request, *args, **kwargs)
 
@@ -107,6 +107,21 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+# shared by all processes of the server and the assignment job worker, so that they all see when the active term
+# changes. It lies in the project, so other checkouts and instances on the same host do not share it, and entries
+# that were not removed by a signal, e.g. after a restore of the database, expire after TIMEOUT seconds
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache'),
+        'KEY_PREFIX': 'ppsv',
+        'TIMEOUT': 300,
+    }
+}
+
 AUTHENTICATION_BACKENDS = [
   'django.contrib.auth.backends.ModelBackend',
   'lti_provider.auth.LTIBackend',
@@ -0,0 +1,237 @@
+import json
+import multiprocessing
+import random
+import time
+from array import array
+
+from backend.automatic_assignment import engines, exact, main
+from backend.automatic_assignment.dataclasses import Problem
+from backend.pages.functions import get_score_for_assigned
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Benchmarks the automatic assignment on generated problems. Nothing is read from or written to the database, the
+# problems are generated the same way as scripts/createTestDB.py does, scaled to the number of applications.
+# Usage: python manage.py runscript benchmarkAssignment --script-args sizes=1000,10000 modes=search,exact output=b.json
+#
+# arguments (all optional):
+#   sizes: the approximate numbers of applications of the problems
+#   variants: default (like createTestDB), groups (more groups of several students), collections (more collections per
+#             group) or single (only single students, the exact solver solves them as a min-cost flow)
+#   modes: the names of the engines that are run, see backend.automatic_assignment.engines
+#   iterations, time_budget: the limits of the engines that search
+#   workers: the number of processes of the engines that search in parallel
+#   seed: the seed of the problems and searches
+#   output: the file the JSON result is written to, printed if not given
+DEFAULTS = {
+    'sizes': '1000,5000,10000,50000',
+    'variants': 'default,groups,collections,single',
+    'modes': 'search,parallel,exact,local_search',
+    'iterations': '1000',
+    'time_budget': '60',
+    'workers': '4',
+    'seed': '0',
+    'output': '',
+}
+
+# the configuration of scripts/createTestDB.py for about 1200 applications
+VARIANTS = {
+    'default': {'collections': {1: 150, 2: 20, 3: 5}, 'group_collections': {1: 6, 2: 1}, 'max_group_size': 5},
+    'groups': {'collections': {1: 150, 2: 20, 3: 5}, 'group_collections': {1: 30, 2: 5}, 'max_group_size': 5},
+    'collections': {'collections': {1: 150, 2: 75, 3: 40}, 'group_collections': {1: 6, 2: 3}, 'max_group_size': 5},
+    'single': {'collections': {1: 150, 2: 20, 3: 5}, 'group_collections': {}, 'max_group_size': 1},
+}
+BASE_APPLICATIONS = 1200
+
+
+def run(*args):
+    options = dict(DEFAULTS)
+    for arg in args:
+        key, value = arg.split('=', 1)
+        if key not in options:
+            raise ValueError(f"Unknown argument {key}, possible are {', '.join(options)}")
+        options[key] = value
+    modes = options['modes'].split(',')
+    seed = int(options['seed'])
+
+    instances = []
+    for size in [int(size) for size in options['sizes'].split(',')]:
+        for variant in options['variants'].split(','):
+            problem = create_problem(size, VARIANTS[variant], seed)
+            instance = get_problem_stats(problem, size, variant)
+            print(f"Benchmarking {variant} problem with {instance['applications']} applications", flush=True)
+            bound_start = time.time()
+            instance['upper_bound'] = exact.get_upper_bound(problem)
+            instance['upper_bound_time'] = round(time.time() - bound_start, 3)
+            instance['results'] = {}
+            for mode in modes:
+                result = run_isolated(problem, mode, options, instance['upper_bound'])
+                if 'score' in result:
+                    result['gap'] = instance['upper_bound'] - result['score']
+                instance['results'][mode] = result
+                print(f"  {mode}: {result}", flush=True)
+            instances.append(instance)
+
+    output = json.dumps({'options': options, 'instances': instances}, indent=2)
+    if options['output']:
+        with open(options['output'], 'w') as file:
+            file.write(output)
+    else:
+        print(output)
+
+
+def create_problem(size, variant, seed):
+    """generates a problem like scripts/createTestDB.py with about size applications
+    :return: the problem
+    :rtype: Problem
+    """
+    rnd = random.Random(seed)
+    scale = max(size / BASE_APPLICATIONS, 1 / 150)
+    max_group_size = variant['max_group_size']
+
+    topics = []
+    # (max slots, min slot size, max slot size)
+    for _ in range(round(150 * scale)):
+        topics.append((1, 1, 1))
+    group_topics = {}
+    for _ in range(round(5 * scale)):
+        for j in range(3):
+            max_slot_size = rnd.randint(1, max_group_size)
+            min_slot_size = rnd.randint(1, max_slot_size)
+            for group_size in range(1, max_slot_size + 1):
+                group_topics.setdefault(group_size, []).append(len(topics))
+            topics.append((j + 1, min_slot_size, max_slot_size))
+
+    # (group id, group size, collection number, topics ordered by priority)
+    collections = []
+    groups = list(range(round(variant['collections'][1] * scale)))
+    for collection_number, amount in variant['collections'].items():
+        groups = rnd.sample(groups, min(len(groups), round(amount * scale)))
+        for group in groups:
+            collections.append((group, 1, collection_number,
+                                rnd.sample(range(len(topics)), rnd.randint(4, 9))))
+    # the single students have the first group ids
+    group_id = round(variant['collections'][1] * scale)
+    for group_size in range(2, max_group_size + 1):
+        groups = []
+        for _ in range(round(variant['group_collections'].get(1, 0) * scale)):
+            groups.append(group_id)
+            group_id += 1
+        for collection_number, amount in variant['group_collections'].items():
+            groups = rnd.sample(groups, min(len(groups), round(amount * scale)))
+            for group in groups:
+                possible_topics = group_topics.get(group_size, [])
+                collections.append((group, group_size, collection_number,
+                                    rnd.sample(possible_topics, min(len(possible_topics), rnd.randint(1, 4)))))
+
+    problem = Problem()
+    data = problem.topic_data
+    data.topic_ids = array('l', range(1, len(topics) + 1))
+    data.topic_index = {topic_id: index for index, topic_id in enumerate(data.topic_ids)}
+    data.slots = array('l', (max_slots for max_slots, _, _ in topics))
+    data.min_slot_size = array('l', (min_slot_size for _, min_slot_size, _ in topics))
+    data.max_slot_size = array('l', (max_slot_size for _, _, max_slot_size in topics))
+    for topic, count in enumerate(data.slots):
+        data.slot_offset.append(len(data.slot_topic))
+        data.slot_topic.extend([topic] * count)
+        data.slot_number.extend(range(1, count + 1))
+    data.slot_sizes = array('l', [0]) * len(data.slot_topic)
+    data.slot_locked = array('l', [0]) * len(data.slot_topic)
+    data.slot_scores = array('l', [0]) * len(data.slot_topic)
+
+    applications = problem.application_data
+    applications.applications_for_topic = [[] for _ in topics]
+    rows = sorted((priority, collection, topic)
+                  for collection, (_, _, _, collection_topics) in enumerate(collections)
+                  for priority, topic in enumerate(collection_topics, 1))
+    collection_index = {}
+    for priority, collection, topic in rows:
+        group, group_size, collection_number, _ = collections[collection]
+        if collection not in collection_index:
+            collection_index[collection] = len(applications.collection_keys)
+            applications.collection_keys.append((group, collection_number))
+            applications.applications_for_collection.append([])
+        index = len(applications.ids)
+        applications.ids.append(index + 1)
+        applications.sizes.append(group_size)
+        applications.priorities.append(priority)
+        applications.scores.append(get_score_for_assigned(group_size, priority))
+        applications.topics.append(topic)
+        applications.collections.append(collection_index[collection])
+        applications.applications_for_topic[topic].append(index)
+        applications.applications_for_collection[collection_index[collection]].append(index)
+    applications.index_topics()
+    return problem
+
+
+def get_problem_stats(problem, size, variant):
+    topic_data = problem.topic_data
+    application_data = problem.application_data
+    return {
+        'variant': variant,
+        'size': size,
+        'applications': len(application_data.ids),
+        'collections': len(application_data.collection_keys),
+        'topics': len(topic_data.topic_ids),
+        'slots': len(topic_data.slot_topic),
+        'places': sum(topic_data.max_slot_size[topic] for topic in topic_data.slot_topic),
+    }
+
+
+def run_isolated(problem, mode, options, upper_bound):
+    """runs the mode in its own process, so the peak memory is measured for this mode only"""
+    context = multiprocessing.get_context('fork')
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=run_mode, args=(problem, mode, options, upper_bound, sender))
+    process.start()
+    sender.close()
+    result = receiver.recv()
+    process.join()
+    return result
+
+
+def run_mode(problem, mode, options, upper_bound, connection):
+    try:
+        start = time.time()
+        result = run_engine(problem, engines.get_engine(mode), options, upper_bound)
+        result['time'] = round(time.time() - start, 3)
+        if result['iterations'] and result['engine_time']:
+            result['iterations_per_second'] = round(result['iterations'] / result['engine_time'], 2)
+        if resource is not None:
+            # kilobytes on linux
+            peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                       resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+            result['peak_memory_mb'] = round(peak / 1024, 1)
+    except Exception as e:
+        result = {'error': str(e)}
+    connection.send(result)
+    connection.close()
+
+
+def run_engine(problem, engine, options, upper_bound):
+    """solves the problem with the engine from scratch and improves the result like main.main does, all non-locked
+    assignments can be overwritten
+
+    :return: the final score, the score and time of the engine alone, the seconds until the engine found its best
+    assignments and the iterations of all search processes
+    :rtype: dict
+    """
+    context = engines.Context(True, -1 << 62, upper_bound, int(options['seed']), int(options['iterations']),
+                              float(options['time_budget']), workers=int(options['workers']))
+    start = time.time()
+    assignments, score, stats = engine.solve(problem, context)
+    result = {
+        'engine_score': score if assignments is not None else None,
+        'engine_time': round(time.time() - start, 3),
+        'iterations': sum(stats.get('iterations', [])),
+        'time_to_best': round(stats['time_to_best'], 3) if stats.get('time_to_best') is not None else None,
+    }
+    if 'optimal' in stats:
+        result['optimal'] = stats['optimal']
+    if engine.improve_result:
+        assignments, score = main.improve_assignments(problem, assignments, context.upper_bound, True, None)
+    result['score'] = score
+    return result
@@ -380,7 +380,7 @@ def overview_page(request):
         for course in Course.objects.filter(~Q(title__in=topics_of_courses), created_by=request.user):
             topics_of_courses.append({"course": course, "topics": []})
 
-    active_term = get_or_none(Term, active_term=True)
+    active_term = Term.get_active_term()
 
     course_types = []
     for course_type in CourseType.objects.all():